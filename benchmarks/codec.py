@@ -0,0 +1,50 @@
+"""
+Compare the JSON codecs on ChatHub messages.
+
+Run with `python -m benchmarks.codec` from the root of the repository.
+"""
+
+import timeit
+
+from benchmarks.frames import answer, final_frame, update_frame
+from sydney import SydneyClient
+from sydney.codec import available_codecs, get_codec
+
+REPEAT = 1_000
+
+
+def main() -> None:
+    client = SydneyClient()
+    client.conversation_id = "51D|BingProdUnAuthenticatedUsers|0000"
+    client.client_id = "1000000000000000"
+    client.invocation_id = 0
+    request = client._build_ask_arguments("When was Bing Chat released?", search=True)
+
+    messages = {
+        "update 1k": update_frame(answer(1_000)),
+        "update 16k": update_frame(answer(16_000)),
+        "final 4k": final_frame(answer(4_000)),
+        "final 32k": final_frame(answer(32_000)),
+    }
+
+    codecs = available_codecs()
+    print(f"{'operation':<20}" + "".join(f"{name:>12}" for name in codecs))
+
+    row = f"{'encode request':<20}"
+    for name in codecs:
+        codec = get_codec(name)
+        seconds = timeit.timeit(lambda: codec.encode(request), number=REPEAT)
+        row += f"{seconds / REPEAT * 1e6:>9.2f} us"
+    print(row)
+
+    for label, message in messages.items():
+        row = f"{'decode ' + label:<20}"
+        for name in codecs:
+            codec = get_codec(name)
+            seconds = timeit.timeit(lambda: codec.decode(message), number=REPEAT)
+            row += f"{seconds / REPEAT * 1e6:>9.2f} us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+End-to-end benchmark of the client against the fake Copilot server, without network
+access. Reports the latency of creating a conversation, connecting to ChatHub and
+uploading images, the time to first token, tokens per second and peak memory of `ask`,
+`ask_stream`, `compose` and image uploads.
+
+Run with `python -m benchmarks.e2e` from the root of the repository. Use `--help` to see
+the options of the simulated server and client.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Awaitable, Callable
+
+from sydney import SydneyClient
+from sydney.enums import Phase
+from sydney.testing import FakeCopilot
+from sydney.tracing import RequestTrace
+
+SCENARIOS = ["ask", "ask_stream", "compose", "upload"]
+
+
+class Sample:
+    def __init__(self) -> None:
+        self.connect: float | None = None
+        self.upload: float | None = None
+        self.total = 0.0
+        self.first_token: float | None = None
+        self.tokens = 0
+
+
+async def run(client: SydneyClient, scenario: str, image: str) -> Sample:
+    sample = Sample()
+    traces: list[RequestTrace] = []
+    client.on_trace = traces.append
+    start = perf_counter()
+
+    if scenario == "ask_stream":
+        async for token in client.ask_stream("Hello, Copilot!"):
+            if sample.first_token is None:
+                sample.first_token = perf_counter() - start
+            sample.tokens += 1
+    elif scenario == "compose":
+        await client.compose("Why Python is a great language")
+    elif scenario == "upload":
+        await client.ask("What is this?", attachment=image)
+    else:
+        await client.ask("Hello, Copilot!")
+
+    sample.total = perf_counter() - start
+    connect = traces[-1].duration(Phase.CONNECT)
+    if connect is not None:
+        sample.connect = connect + traces[-1].duration(Phase.HANDSHAKE)  # type: ignore
+    # Uploads overlap with connecting, so the total is less than the sum of both.
+    sample.upload = traces[-1].duration(Phase.UPLOAD)
+    return sample
+
+
+async def peak_memory(function: Callable[[], Awaitable[Sample]]) -> int:
+    tracemalloc.start()
+    try:
+        await function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def milliseconds(values: list[float]) -> str:
+    return f"{statistics.median(values) * 1000:>9.2f} ms" if values else f"{'-':>12}"
+
+
+async def main(args: argparse.Namespace) -> None:
+    server = FakeCopilot(
+        answer=" ".join(f"word{i}" for i in range(args.answer_words)),
+        latency=args.latency,
+        first_token_delay=args.first_token_delay,
+        token_delay=args.token_delay,
+        frame_padding=args.frame_padding,
+        max_messages=10**9,
+    )
+
+    with tempfile.NamedTemporaryFile(suffix=".png") as image:
+        image.write(os.urandom(args.image_size * 1024))
+        image.flush()
+
+        async with server:
+            with server.endpoints():
+                print(
+                    f"{'scenario':<12} {'create':>12} {'connect':>12} {'upload':>12}"
+                    f" {'first token':>12}"
+                    f" {'total':>12} {'tokens/s':>10} {'peak memory':>12}"
+                )
+                for scenario in args.scenarios:
+                    creates: list[float] = []
+                    samples: list[Sample] = []
+                    async with SydneyClient(
+                        persistent=args.persistent, json_codec=args.codec
+                    ) as client:
+                        for _ in range(args.iterations):
+                            start = perf_counter()
+                            await client.reset_conversation()
+                            creates.append(perf_counter() - start)
+
+                        for _ in range(args.iterations):
+                            samples.append(await run(client, scenario, image.name))
+
+                        memory = await peak_memory(
+                            lambda: run(client, scenario, image.name)
+                        )
+
+                    first_tokens = [
+                        sample.first_token
+                        for sample in samples
+                        if sample.first_token is not None
+                    ]
+                    rates = [
+                        sample.tokens / (sample.total - sample.first_token)
+                        for sample in samples
+                        if sample.first_token is not None
+                        and sample.total > sample.first_token
+                    ]
+                    rate = (
+                        f"{statistics.median(rates):>10.0f}" if rates else f"{'-':>10}"
+                    )
+                    connects = [
+                        sample.connect
+                        for sample in samples
+                        if sample.connect is not None
+                    ]
+                    uploads = [
+                        sample.upload for sample in samples if sample.upload is not None
+                    ]
+                    print(
+                        f"{scenario:<12} {milliseconds(creates)} {milliseconds(connects)}"
+                        f" {milliseconds(uploads)} {milliseconds(first_tokens)}"
+                        f" {milliseconds([sample.total for sample in samples])}"
+                        f" {rate} {memory / 1024:>9.0f} KiB"
+                    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument(
+        "--latency", type=float, default=0.02, help="round trip in seconds"
+    )
+    parser.add_argument("--first-token-delay", type=float, default=0.1)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--answer-words", type=int, default=500)
+    parser.add_argument("--frame-padding", type=int, default=2048)
+    parser.add_argument("--image-size", type=int, default=512, help="in KiB")
+    parser.add_argument("--persistent", action="store_true")
+    parser.add_argument("--codec", default=None)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,119 @@
+"""
+ChatHub messages with the same structure as the ones that Copilot sends, used as input
+for the benchmarks.
+"""
+
+import json
+
+WORD = 'lorem ipsum dolor sit amet, 😊 "quoted" '
+
+
+def answer(length: int) -> str:
+    """
+    Text of an answer with the given number of characters.
+    """
+    return (WORD * (length // len(WORD) + 1))[:length]
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def bot_message(
+    text: str, message_id: str = "a5d1b2c3-0000-4000-8000-000000000001"
+) -> dict:
+    return {
+        "text": text,
+        "author": "bot",
+        "createdAt": "2025-01-20T10:00:00.0000000+00:00",
+        "timestamp": "2025-01-20T10:00:00.0000000+00:00",
+        "messageId": message_id,
+        "requestId": "a5d1b2c3-0000-4000-8000-000000000000",
+        "offense": "None",
+        "adaptiveCards": [
+            {
+                "type": "AdaptiveCard",
+                "version": "1.0",
+                "body": [
+                    {"type": "TextBlock", "text": text, "wrap": True},
+                    {
+                        "type": "TextBlock",
+                        "size": "small",
+                        "text": "Learn more: [1. example.com](https://example.com)",
+                        "wrap": True,
+                    },
+                ],
+            }
+        ],
+        "sourceAttributions": [
+            {
+                "providerDisplayName": f"Source {i}",
+                "seeMoreUrl": f"https://example.com/articles/{i}",
+                "searchQuery": "example search query",
+            }
+            for i in range(8)
+        ],
+        "feedback": {"tag": None, "updatedOn": None, "type": "None"},
+        "contentOrigin": "DeepLeo",
+        "privacy": None,
+    }
+
+
+def update_frame(text: str) -> bytes:
+    """
+    Type 1 message with the whole text generated so far.
+    """
+    return encode(
+        {
+            "type": 1,
+            "target": "update",
+            "arguments": [
+                {
+                    "messages": [bot_message(text)],
+                    "requestId": "a5d1b2c3-0000-4000-8000-000000000000",
+                }
+            ],
+        }
+    )
+
+
+def final_frame(text: str, prompt: str = "Hello, Copilot!") -> bytes:
+    """
+    Type 2 message with the final answer.
+    """
+    message = bot_message(text)
+    message["suggestedResponses"] = [
+        {
+            "text": f"Suggested response {i}",
+            "author": "user",
+            "messageType": "Suggestion",
+        }
+        for i in range(3)
+    ]
+    return encode(
+        {
+            "type": 2,
+            "invocationId": "0",
+            "item": {
+                "messages": [
+                    {"text": prompt, "author": "user", "messageType": "Chat"},
+                    {
+                        "text": "Searching the web for: `example`",
+                        "author": "bot",
+                        "messageType": "InternalSearchQuery",
+                        "hiddenText": "example",
+                    },
+                    message,
+                ],
+                "firstNewMessageIndex": 1,
+                "conversationId": "51D|BingProdUnAuthenticatedUsers|0000",
+                "requestId": "a5d1b2c3-0000-4000-8000-000000000000",
+                "conversationExpiryTime": "2025-01-21T10:00:00.0000000Z",
+                "throttling": {
+                    "maxNumUserMessagesInConversation": 30,
+                    "numUserMessagesInConversation": 1,
+                },
+                "result": {"value": "Success", "message": text[:100]},
+            },
+        }
+    )
@@ -0,0 +1,51 @@
+"""
+Compare building and encoding requests as dictionaries with rendering cached request
+templates.
+
+Run with `python -m benchmarks.requests` from the root of the repository.
+"""
+
+import timeit
+
+from sydney import SydneyClient
+from sydney.codec import available_codecs
+from sydney.enums import ComposeFormat, ComposeLength, ComposeTone
+
+PROMPT = "When was Bing Chat released?"
+REPEAT = 20_000
+
+
+def main() -> None:
+    print(f"{'request':<10} {'codec':<10} {'dictionary':>12} {'template':>12}")
+    for codec in available_codecs():
+        client = SydneyClient(json_codec=codec)
+        client.conversation_id = "51D|BingProdUnAuthenticatedUsers|0000"
+        client.client_id = "1000000000000000"
+        client.conversation_signature = "signature"
+        client.invocation_id = 1
+
+        compose = (ComposeTone.PROFESSIONAL, ComposeFormat.IDEAS, ComposeLength.SHORT)
+        cases = {
+            "ask": (
+                lambda: client.codec.encode(client._build_ask_arguments(PROMPT, True)),
+                lambda: client._encode_ask_request(PROMPT, True),
+            ),
+            "compose": (
+                lambda: client.codec.encode(
+                    client._build_compose_arguments(PROMPT, *compose)
+                ),
+                lambda: client._encode_compose_request(PROMPT, *compose),
+            ),
+        }
+
+        for label, (dictionary, template) in cases.items():
+            dictionary_time = timeit.timeit(dictionary, number=REPEAT) / REPEAT
+            template_time = timeit.timeit(template, number=REPEAT) / REPEAT
+            print(
+                f"{label:<10} {codec:<10} {dictionary_time * 1e6:>9.2f} us"
+                f" {template_time * 1e6:>9.2f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
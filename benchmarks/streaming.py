@@ -0,0 +1,49 @@
+"""
+Benchmark the per-message cost of streaming text as the answer grows.
+
+Run with `python -m benchmarks.streaming` from the root of the repository.
+"""
+
+import json
+import timeit
+
+from benchmarks.frames import answer, update_frame
+from sydney.streaming import TextDelta
+
+LENGTHS = [1_000, 4_000, 16_000, 64_000]
+REPEAT = 2_000
+
+
+def decode_and_slice(previous: str, message: bytes) -> str:
+    text = json.loads(message)["arguments"][0]["messages"][0]["text"]
+    return text[len(previous) :]
+
+
+def main() -> None:
+    print(f"{'answer length':>14} {'decode + slice':>16} {'TextDelta':>12}")
+    for length in LENGTHS:
+        text = answer(length)
+        previous, current = update_frame(text), update_frame(text + " next")
+
+        slice_time = timeit.timeit(
+            lambda: decode_and_slice(text, current), number=REPEAT
+        )
+
+        delta = TextDelta()
+        delta.update(text, previous)
+
+        def update_raw() -> None:
+            delta._raw_end, delta._anchor, delta._chunks = raw_end, anchor, [text]
+            delta.update_raw(current)
+
+        raw_end, anchor = delta._raw_end, delta._anchor
+        delta_time = timeit.timeit(update_raw, number=REPEAT)
+
+        print(
+            f"{length:>14} {slice_time / REPEAT * 1e6:>13.2f} us"
+            f" {delta_time / REPEAT * 1e6:>9.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
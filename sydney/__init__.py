@@ -1 +1,11 @@
 from .sydney import SydneyClient  # noqa: F401
+from .pool import SydneyPool  # noqa: F401
+from .cache import MemoryResponseCache, ResponseCache  # noqa: F401
+from .tracing import RequestTrace  # noqa: F401
+from .ratelimit import AdaptiveRateLimiter  # noqa: F401
+from .retry import RetryPolicy  # noqa: F401
+from .blobs import BlobCache  # noqa: F401
+from .conversations import ConversationIndex  # noqa: F401
+from .response import SydneyResponse  # noqa: F401
+from .accounts import AccountManager  # noqa: F401
+from .sync import SyncSydneyClient  # noqa: F401
@@ -0,0 +1,96 @@
+"""
+Command line interface of Sydney.py.
+
+Run `python -m sydney batch --help` to see the options of the batch runner.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from sydney.batch import run_batch
+
+
+def _batch(args: argparse.Namespace) -> int:
+    cookies = None
+    if args.cookies_file:
+        with open(args.cookies_file, encoding="utf-8") as file:
+            cookies = [line.strip() for line in file if line.strip()]
+
+    input = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    # Appended to, so that a resumed run keeps the results of the previous one.
+    output = (
+        sys.stdout
+        if args.output == "-"
+        else open(args.output, "a" if args.checkpoint else "w", encoding="utf-8")
+    )
+    try:
+        answered, failed = run_batch(
+            input,
+            output,
+            checkpoint=args.checkpoint,
+            workers=args.workers,
+            size=args.size,
+            max_concurrency=args.max_concurrency,
+            cookies=cookies,
+            compose=args.compose,
+            style=args.style,
+            persona=args.persona,
+            use_proxy=args.use_proxy,
+            json_codec=args.json_codec,
+        )
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        if input is not sys.stdin:
+            input.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Answered {answered} prompts, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m sydney", description=__doc__)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch",
+        help="send the prompts of a JSONL file to Copilot",
+        description="Send the prompts of a JSONL file to Copilot using multiple worker "
+        "processes and write the results as JSONL as they complete. Each line is either "
+        'a JSON string or an object with a "prompt" and an optional "id".',
+    )
+    batch.add_argument("input", nargs="?", default="-", help="default is stdin")
+    batch.add_argument("-o", "--output", default="-", help="default is stdout")
+    batch.add_argument(
+        "-c",
+        "--checkpoint",
+        help="file of answered prompts, which are skipped when the run is resumed",
+    )
+    batch.add_argument("-w", "--workers", type=int, default=2)
+    batch.add_argument(
+        "-s", "--size", type=int, default=4, help="conversations per worker"
+    )
+    batch.add_argument(
+        "--max-concurrency", type=int, default=None, help="prompts per worker"
+    )
+    batch.add_argument(
+        "--cookies-file",
+        help="file with one set of cookies per line, split between the workers",
+    )
+    batch.add_argument("--compose", action="store_true")
+    batch.add_argument("--style", default="balanced")
+    batch.add_argument("--persona", default="copilot")
+    batch.add_argument("--use-proxy", action="store_true")
+    batch.add_argument("--json-codec", default=None)
+    batch.set_defaults(function=_batch)
+
+    args = parser.parse_args(argv)
+    return args.function(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+
+from sydney.exceptions import (
+    CaptchaChallengeException,
+    CreateConversationException,
+    ThrottledRequestException,
+)
+from sydney.utils import cookies_as_dict
+
+# Exceptions that lower the health score of the account that caused them.
+ACCOUNT_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    ThrottledRequestException,
+    CaptchaChallengeException,
+    CreateConversationException,
+)
+
+
+class Account:
+    """
+    Set of cookies of a Microsoft account, with its health score and statistics.
+    """
+
+    __slots__ = (
+        "name",
+        "cookies",
+        "cookie_dict",
+        "score",
+        "conversations",
+        "successes",
+        "throttled",
+        "captchas",
+        "create_failures",
+        "consecutive_failures",
+        "cooldown_until",
+        "last_used",
+        "recovered",
+    )
+
+    def __init__(self, name: str, cookies: str) -> None:
+        self.name = name
+        self.cookies = cookies
+        self.cookie_dict = cookies_as_dict(cookies)  # Parsed once for all requests.
+        self.score = 1.0
+        self.conversations = 0
+        self.successes = 0
+        self.throttled = 0
+        self.captchas = 0
+        self.create_failures = 0
+        self.consecutive_failures = 0
+        # The `time.monotonic` time until which the account is not used.
+        self.cooldown_until = 0.0
+        self.last_used = 0.0
+        # The `time.monotonic` time when the score last recovered.
+        self.recovered = monotonic()
+
+    def __repr__(self) -> str:
+        return f"<Account {self.name} score {self.score:.2f}>"
+
+    @property
+    def cooldown(self) -> float:
+        """
+        Number of seconds until the account can be used again.
+        """
+        return max(0.0, self.cooldown_until - monotonic())
+
+    @property
+    def failures(self) -> int:
+        """
+        Number of requests of the account that failed.
+        """
+        return self.throttled + self.captchas + self.create_failures
+
+    def stats(self) -> dict:
+        """
+        Get the health score and the statistics of the account.
+        """
+        return {
+            "name": self.name,
+            "score": self.score,
+            "cooldown": self.cooldown,
+            "conversations": self.conversations,
+            "successes": self.successes,
+            "failures": self.failures,
+            "throttled": self.throttled,
+            "captchas": self.captchas,
+            "create_failures": self.create_failures,
+        }
+
+
+class AccountManager:
+    """
+    Rotate conversations between many accounts, based on a health score per account.
+
+    Each new conversation uses the healthy account that was least recently used, so that
+    conversations are spread evenly between healthy accounts. The score of an account is
+    lowered when it is throttled, challenged with a CAPTCHA or fails to create a
+    conversation, in which case it also cools down for a while before it is used again.
+    It is raised again after every successful request, and also over time, so that
+    accounts that are no longer chosen recover.
+
+    The same manager should be shared by all clients of a process.
+    """
+
+    def __init__(
+        self,
+        cookies: list[str] | dict[str, str],
+        cooldown: float = 30.0,
+        max_cooldown: float = 1800.0,
+        recovery: float = 0.1,
+        healthy: float = 0.5,
+        recovery_time: float = 600.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        cookies : list[str] | dict[str, str]
+            The cookies of each account, optionally by the name of the account. Accounts of
+            a list are named by their index.
+        cooldown : float
+            The number of seconds that an account is not used after its first failure, which
+            is doubled after every consecutive failure. Default is 30.0.
+        max_cooldown : float
+            The maximum number of seconds that an account is not used after a failure, which
+            is also the time that an account is quarantined after a CAPTCHA challenge.
+            Default is 1800.0.
+        recovery : float
+            The amount that the score of an account is raised after a successful request, up
+            to 1.0. Default is 0.1.
+        healthy : float
+            The fraction of the highest score of all available accounts that the score of an
+            account must reach for it to be used. Default is 0.5.
+        recovery_time : float
+            The number of seconds in which the score of an account rises from 0.0 to 1.0,
+            in addition to the successful requests. If 0, scores only rise after successful
+            requests. Default is 600.0.
+        """
+        if not cookies:
+            raise ValueError("At least one account is required")
+
+        items = (
+            cookies.items()
+            if isinstance(cookies, dict)
+            else ((str(index), value) for index, value in enumerate(cookies))
+        )
+        self.accounts = [Account(name, value) for name, value in items]
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.recovery = recovery
+        self.healthy = healthy
+        self.recovery_time = recovery_time
+
+    def __len__(self) -> int:
+        return len(self.accounts)
+
+    def choose(self) -> Account | None:
+        """
+        Choose the account of a new conversation.
+
+        Returns
+        -------
+        Account | None
+            The account, or None if all accounts are cooling down.
+        """
+        now = monotonic()
+        for account in self.accounts:
+            self._recover(account, now)
+        available = [
+            account for account in self.accounts if account.cooldown_until <= now
+        ]
+        if not available:
+            return None
+
+        best = max(account.score for account in available)
+        account = min(
+            (account for account in available if account.score >= best * self.healthy),
+            key=lambda account: account.last_used,
+        )
+        account.last_used = now
+        account.conversations += 1
+        return account
+
+    async def acquire(self) -> Account:
+        """
+        Choose the account of a new conversation, waiting until an account has cooled
+        down if all of them are cooling down.
+
+        Returns
+        -------
+        Account
+            The account.
+        """
+        while True:
+            account = self.choose()
+            if account is not None:
+                return account
+
+            wait = min(account.cooldown_until for account in self.accounts)
+            await asyncio.sleep(max(0.0, wait - monotonic()))
+
+    def report_success(self, account: Account) -> None:
+        """
+        Raise the score of an account after a successful request.
+        """
+        self._recover(account, monotonic())
+        account.successes += 1
+        account.consecutive_failures = 0
+        account.score = min(1.0, account.score + self.recovery)
+
+    def report_failure(self, account: Account, exception: BaseException) -> None:
+        """
+        Lower the score of an account and let it cool down after a failed request.
+        Exceptions that are not listed in `ACCOUNT_EXCEPTIONS` are ignored, since they
+        are not caused by the account.
+
+        Parameters
+        ----------
+        account : Account
+            The account that sent the request.
+        exception : BaseException
+            The exception that was raised.
+        """
+        self._recover(account, monotonic())
+        if isinstance(exception, CaptchaChallengeException):
+            # Cannot be solved without the user, so quarantine the account.
+            account.captchas += 1
+            account.score *= 0.1
+            account.cooldown_until = monotonic() + self.max_cooldown
+            account.consecutive_failures += 1
+            return
+
+        if isinstance(exception, ThrottledRequestException):
+            account.throttled += 1
+            account.score *= 0.5
+        elif isinstance(exception, CreateConversationException):
+            account.create_failures += 1
+            account.score *= 0.7
+        else:
+            return
+
+        account.consecutive_failures += 1
+        cooldown = self.cooldown * 2 ** (account.consecutive_failures - 1)
+        account.cooldown_until = monotonic() + min(cooldown, self.max_cooldown)
+
+    def reset(self, account: Account) -> None:
+        """
+        Restore the score of an account and end its cooldown, for example after its
+        CAPTCHA challenge was solved.
+        """
+        account.score = 1.0
+        account.consecutive_failures = 0
+        account.cooldown_until = 0.0
+
+    def stats(self) -> list[dict]:
+        """
+        Get the health score and the statistics of every account.
+        """
+        now = monotonic()
+        for account in self.accounts:
+            self._recover(account, now)
+        return [account.stats() for account in self.accounts]
+
+    def _recover(self, account: Account, now: float) -> None:
+        if self.recovery_time > 0:
+            elapsed = now - account.recovered
+            account.score = min(1.0, account.score + elapsed / self.recovery_time)
+        account.recovered = now
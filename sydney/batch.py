@@ -0,0 +1,343 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import multiprocessing
+import queue
+import threading
+from itertools import count
+from typing import IO, Any, AsyncIterator, Iterable, Iterator
+
+from sydney.codec import get_codec
+from sydney.pool import SydneyPool
+
+
+class BatchItem:
+    """
+    A prompt of a batch file.
+    """
+
+    __slots__ = ("id", "prompt")
+
+    def __init__(self, id: Any, prompt: str) -> None:
+        self.id = id  # Identifier that is written to the results and the checkpoint.
+        self.prompt = prompt
+
+    def __repr__(self) -> str:
+        return f"<BatchItem {self.id!r}>"
+
+
+def read_items(lines: Iterable[str]) -> Iterator[BatchItem]:
+    """
+    Parse the prompts of a JSONL batch file.
+
+    Each line is either a JSON string with the prompt, or a JSON object with a `prompt`
+    and an optional `id`. Items without an `id` are identified by their line number,
+    starting from 0. Empty lines are skipped.
+
+    Parameters
+    ----------
+    lines : Iterable[str]
+        The lines of the file.
+
+    Returns
+    -------
+    BatchItem
+        The prompt of each line.
+    """
+    for number, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+
+        data = json.loads(line)
+        if isinstance(data, str):
+            yield BatchItem(number, data)
+        elif isinstance(data, dict) and isinstance(data.get("prompt"), str):
+            yield BatchItem(data.get("id", number), data["prompt"])
+        else:
+            raise ValueError(f"Line {number} must be a string or contain a prompt")
+
+
+def load_checkpoint(path: str) -> set[str]:
+    """
+    Load the identifiers of the items that were completed by a previous run.
+
+    Parameters
+    ----------
+    path : str
+        The path of the checkpoint file. A missing file is treated as empty.
+
+    Returns
+    -------
+    set[str]
+        The JSON encoded identifier of each completed item.
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            return {line.strip() for line in file if line.strip()}
+    except FileNotFoundError:
+        return set()
+
+
+def shard_cookies(cookies: list[str], workers: int, index: int) -> list[str] | None:
+    """
+    Get the cookies of a worker, so that every set of cookies is used by one worker when
+    there are at least as many sets as workers.
+
+    Parameters
+    ----------
+    cookies : list[str]
+        All sets of cookies. If empty, the `BING_COOKIES` environment variable is used.
+    workers : int
+        The number of workers.
+    index : int
+        The index of the worker.
+
+    Returns
+    -------
+    list[str] | None
+        The sets of cookies of the worker, or None if no cookies were given.
+    """
+    if not cookies:
+        return None
+    if len(cookies) < workers:
+        return [cookies[index % len(cookies)]]
+    return cookies[index::workers]
+
+
+def run_batch(
+    input: IO[str],
+    output: IO[str],
+    checkpoint: str | None = None,
+    workers: int = 2,
+    size: int = 4,
+    max_concurrency: int | None = None,
+    cookies: list[str] | None = None,
+    compose: bool = False,
+    **client_options: Any,
+) -> tuple[int, int]:
+    """
+    Send the prompts of a JSONL batch file to Copilot, using multiple worker processes,
+    each one with its own `SydneyPool`, and write the results as JSONL as they complete.
+
+    Each result is a JSON object with the `id` of the item and either its `response`, or
+    the `error` that was raised.
+
+    Parameters
+    ----------
+    input : IO[str]
+        The batch file. See `read_items` for its format.
+    output : IO[str]
+        The file where the results are written.
+    checkpoint : str | None
+        The path of the file where the identifiers of the answered items are written. Items
+        that are listed in it are skipped, so that an interrupted run can be resumed. Failed
+        items are not listed, so they are sent again. If None, all items are sent. Default
+        is None.
+    workers : int
+        The number of worker processes. Default is 2.
+    size : int
+        The number of conversations of the pool of each worker. Default is 4.
+    max_concurrency : int | None
+        The number of prompts that each worker sends at the same time. If None, it is
+        equal to `size`. Default is None.
+    cookies : list[str] | None
+        Sets of cookies that are split between the workers. If None, the `BING_COOKIES`
+        environment variable is used by all workers. Default is None.
+    compose : bool
+        Whether to compose text based on the prompts instead of asking them. Default is
+        False.
+    client_options
+        Additional keyword arguments that are passed to every `SydneyClient`.
+
+    Returns
+    -------
+    tuple[int, int]
+        The number of answered and failed items.
+    """
+    if workers < 1:
+        raise ValueError("Number of workers must be at least 1")
+
+    completed = load_checkpoint(checkpoint) if checkpoint else set()
+    concurrency = max_concurrency if max_concurrency else size
+
+    # Bounded, so that large files are read as the workers need more prompts.
+    tasks: multiprocessing.Queue = multiprocessing.Queue(2 * workers * concurrency)
+    results: multiprocessing.Queue = multiprocessing.Queue()
+    stop = threading.Event()
+
+    processes = [
+        multiprocessing.Process(
+            target=_worker,
+            args=(
+                tasks,
+                results,
+                shard_cookies(cookies or [], workers, index),
+                size,
+                max_concurrency,
+                compose,
+                client_options,
+            ),
+            name=f"sydney-batch-{index}",
+            daemon=True,
+        )
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+
+    feeder = threading.Thread(
+        target=_feed,
+        args=(input, tasks, completed, workers, stop),
+        name="sydney-batch-feeder",
+        daemon=True,
+    )
+    feeder.start()
+
+    checkpoint_file = open(checkpoint, "a", encoding="utf-8") if checkpoint else None
+    answered = failed = 0
+    try:
+        running = workers
+        while running:
+            try:
+                message = results.get(timeout=1.0)
+            except queue.Empty:
+                for process in processes:
+                    if process.exitcode not in (None, 0):
+                        raise RuntimeError(
+                            f"Worker {process.name} exited with code {process.exitcode}"
+                        ) from None
+                continue
+
+            if message is None:
+                running -= 1
+                continue
+            if isinstance(message, BaseException):
+                raise message
+
+            key, line, ok = message
+            output.write(line)
+            output.write("\n")
+            output.flush()
+            if not ok:
+                failed += 1
+                continue
+
+            answered += 1
+            # Written after the result, so that a crash never skips an unwritten result.
+            if checkpoint_file:
+                checkpoint_file.write(key)
+                checkpoint_file.write("\n")
+                checkpoint_file.flush()
+    finally:
+        stop.set()
+        tasks.cancel_join_thread()
+        if checkpoint_file:
+            checkpoint_file.close()
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    return answered, failed
+
+
+def _feed(
+    input: IO[str],
+    tasks: multiprocessing.Queue,
+    completed: set[str],
+    workers: int,
+    stop: threading.Event,
+) -> None:
+    def put(item: tuple[str, Any, str] | None) -> bool:
+        while not stop.is_set():
+            try:
+                tasks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        for item in read_items(input):
+            key = json.dumps(item.id)
+            if key in completed:
+                continue
+            if not put((key, item.id, item.prompt)):
+                return
+    finally:
+        # One for each worker, which stops when it receives it.
+        for _ in range(workers):
+            put(None)
+
+
+def _worker(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    cookies: list[str] | None,
+    size: int,
+    max_concurrency: int | None,
+    compose: bool,
+    client_options: dict,
+) -> None:
+    try:
+        asyncio.run(
+            _serve(
+                tasks,
+                results,
+                cookies,
+                size,
+                max_concurrency,
+                compose,
+                client_options,
+            )
+        )
+    except KeyboardInterrupt:
+        return
+    except Exception as exception:
+        results.put(exception)
+    results.put(None)
+
+
+async def _serve(
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+    cookies: list[str] | None,
+    size: int,
+    max_concurrency: int | None,
+    compose: bool,
+    client_options: dict,
+) -> None:
+    codec = get_codec(client_options.get("json_codec"))
+    loop = asyncio.get_running_loop()
+    # Key and id of each item that is being sent, by its index in the batch of the pool.
+    pending: dict[int, tuple[str, Any]] = {}
+    indexes = count()
+
+    async def prompts() -> AsyncIterator[str]:
+        while True:
+            task = await loop.run_in_executor(None, tasks.get)
+            if task is None:
+                return
+            key, id, prompt = task
+            pending[next(indexes)] = (key, id)
+            yield prompt
+
+    async with SydneyPool(
+        size,
+        bing_cookies=cookies,
+        max_concurrency=max_concurrency,
+        **client_options,
+    ) as pool:
+        run_many = pool.compose_many if compose else pool.ask_many
+        async for result in run_many(prompts()):
+            key, id = pending.pop(result.index)
+            if result.ok:
+                record = {"id": id, "response": result.response}
+            else:
+                exception = result.exception
+                record = {"id": id, "error": f"{type(exception).__name__}: {exception}"}
+            # Encoded here, so that JSON is encoded and decoded by all workers in parallel.
+            line = codec.encode(record).decode()
+            results.put((key, line, result.ok))
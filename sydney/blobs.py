@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from time import time
+from typing import Awaitable, Callable
+
+from sydney.payload import CHUNK_SIZE
+from sydney.utils import check_if_url
+
+
+def blob_key(attachment: str) -> str:
+    """
+    Build the cache key of an attachment. Files are identified by their content, so that
+    the same image is uploaded once regardless of its path, and are read in chunks. URLs
+    are identified by the URL itself.
+
+    Parameters
+    ----------
+    attachment : str
+        The URL or file path of the attachment.
+
+    Returns
+    -------
+    str
+        The cache key, a SHA-256 hex digest that is safe to use as a file name.
+    """
+    if check_if_url(attachment):
+        return hashlib.sha256(b"url:" + attachment.encode()).hexdigest()
+
+    digest = hashlib.sha256()
+    with open(attachment, "rb") as file:
+        while chunk := file.read(CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BlobCache:
+    """
+    Cache of the blobs of the images that were uploaded to Copilot, so that an image that
+    is attached to many prompts is uploaded only once.
+
+    Concurrent uploads of the same image share a single request. If a directory is given,
+    blobs are also stored on disk, so that they survive restarts.
+    """
+
+    def __init__(self, ttl: float | None = 86400.0, path: str | None = None) -> None:
+        """
+        Parameters
+        ----------
+        ttl : float | None
+            The number of seconds that a blob is reused. If None, blobs never expire.
+            Default is 86400.0.
+        path : str | None
+            The directory where blobs are stored, which is created if it does not exist.
+            If None, blobs are only kept in memory. Default is None.
+        """
+        self.ttl = ttl
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._blobs: dict[str, tuple[dict, float | None]] = {}
+        self._uploads: dict[str, asyncio.Task] = {}
+
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._blobs)
+
+    async def get_or_upload(
+        self, key: str, upload: Callable[[], Awaitable[dict]]
+    ) -> dict:
+        """
+        Get a cached blob, or upload the image if it is not cached.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by `blob_key`.
+        upload : Callable[[], Awaitable[dict]]
+            Function that uploads the image and returns the response of Copilot.
+
+        Returns
+        -------
+        dict
+            The response of Copilot with the "blobId" and "processedBlobId" of the image.
+        """
+        blob = self.get(key)
+        if blob is not None:
+            self.hits += 1
+            return blob
+
+        task = self._uploads.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._upload(key, upload))
+            self._uploads[key] = task
+            task.add_done_callback(lambda _: self._uploads.pop(key, None))
+        else:
+            self.hits += 1
+
+        # The upload continues if one of the callers that wait for it is cancelled, since
+        # other callers may still need it and its blob is cached either way.
+        return await asyncio.shield(task)
+
+    def get(self, key: str) -> dict | None:
+        """
+        Get a cached blob.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by `blob_key`.
+
+        Returns
+        -------
+        dict | None
+            The cached blob, or None if there is no blob or it has expired.
+        """
+        entry = self._blobs.get(key)
+        if entry is None and self.path is not None:
+            entry = self._read(key)
+            if entry is not None:
+                self._blobs[key] = entry
+
+        if entry is None:
+            return None
+
+        blob, expires = entry
+        if expires is not None and time() >= expires:
+            self.delete(key)
+            return None
+
+        return blob
+
+    def set(self, key: str, blob: dict) -> None:
+        """
+        Cache a blob.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by `blob_key`.
+        blob : dict
+            The response of Copilot to the upload of the image.
+        """
+        expires = time() + self.ttl if self.ttl is not None else None
+        blob = {"blobId": blob["blobId"], "processedBlobId": blob["processedBlobId"]}
+        self._blobs[key] = blob, expires
+        if self.path is not None:
+            self._write(key, blob, expires)
+
+    def delete(self, key: str) -> None:
+        """
+        Remove a blob from the cache.
+        """
+        self._blobs.pop(key, None)
+        if self.path is not None:
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """
+        Remove all blobs from the cache, including the ones stored on disk.
+        """
+        self._blobs.clear()
+        if self.path is not None:
+            for name in os.listdir(self.path):
+                if name.endswith(".json"):
+                    os.remove(os.path.join(self.path, name))
+
+    async def _upload(self, key: str, upload: Callable[[], Awaitable[dict]]) -> dict:
+        blob = await upload()
+        self.set(key, blob)
+        return blob
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")  # type: ignore
+
+    def _read(self, key: str) -> tuple[dict, float | None] | None:
+        try:
+            with open(self._file(key), encoding="utf-8") as file:
+                entry = json.load(file)
+            return entry["blob"], entry["expires"]
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write(self, key: str, blob: dict, expires: float | None) -> None:
+        # Write to a temporary file first, so that readers never see a partial file.
+        temporary = f"{self._file(key)}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump({"blob": blob, "expires": expires}, file)
+        os.replace(temporary, self._file(key))
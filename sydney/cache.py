@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import unicodedata
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import time
+from typing import Iterator
+
+# Split text after whitespace, so that replayed chunks look like streamed tokens.
+CHUNK_PATTERN = re.compile(r"(?<=\s)(?=\S)")
+
+
+class CachedResponse:
+    """
+    Answer of Copilot that is stored in a response cache.
+    """
+
+    __slots__ = ("text", "suggested_responses", "expires")
+
+    def __init__(
+        self,
+        text: str,
+        suggested_responses: list | None = None,
+        expires: float | None = None,
+    ) -> None:
+        self.text = text
+        self.suggested_responses = suggested_responses
+        self.expires = expires  # Unix time after which the answer is stale, if any.
+
+    @property
+    def expired(self) -> bool:
+        return self.expires is not None and time() >= self.expires
+
+    def replay(self, stream: bool) -> Iterator[tuple[str, list | None]]:
+        """
+        Return the answer in the same form as a live answer of Copilot.
+
+        Parameters
+        ----------
+        stream : bool
+            Whether to split the answer in chunks, like a streamed answer. Only the last
+            item contains the suggested responses.
+
+        Returns
+        -------
+        Iterator
+            The text of the answer and the suggested responses.
+        """
+        if stream:
+            for chunk in CHUNK_PATTERN.split(self.text):
+                if chunk:
+                    yield chunk, None
+            yield "", self.suggested_responses
+        else:
+            yield self.text, self.suggested_responses
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalize a prompt so that prompts that differ only in whitespace or Unicode
+    representation share the same cache entry.
+    """
+    return " ".join(unicodedata.normalize("NFC", prompt).split())
+
+
+def cache_key(prompt: str, **options: str | bool | None) -> str:
+    """
+    Build the cache key of a prompt.
+
+    Parameters
+    ----------
+    prompt : str
+        The prompt that is sent to Copilot.
+    options
+        All other options that affect the answer, such as the conversation style.
+
+    Returns
+    -------
+    str
+        The cache key, a SHA-256 hex digest that is safe to use as a file name.
+    """
+    key = json.dumps(
+        [normalize_prompt(prompt), sorted(options.items())], ensure_ascii=False
+    )
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+class ResponseCache(ABC):
+    """
+    Base class for caches of the answers of Copilot to repeated prompts.
+
+    Backends only need to implement `load`, `store`, `delete` and `clear`. Expiration
+    and the hit and miss counters are handled by this class.
+    """
+
+    def __init__(self, ttl: float | None = 3600.0) -> None:
+        """
+        Parameters
+        ----------
+        ttl : float | None
+            The number of seconds that an answer is kept. If None, answers never expire.
+            Default is 3600.0.
+        """
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> CachedResponse | None:
+        """
+        Get a cached answer.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by `cache_key`.
+
+        Returns
+        -------
+        CachedResponse | None
+            The cached answer, or None if there is no answer or it has expired.
+        """
+        response = await self.load(key)
+        if response is not None and response.expired:
+            await self.delete(key)
+            response = None
+
+        if response is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+        return response
+
+    async def set(
+        self, key: str, text: str, suggested_responses: list | None = None
+    ) -> None:
+        """
+        Cache an answer.
+
+        Parameters
+        ----------
+        key : str
+            The cache key, as returned by `cache_key`.
+        text : str
+            The text of the answer.
+        suggested_responses : list | None
+            The suggested user responses of the answer. Default is None.
+        """
+        expires = time() + self.ttl if self.ttl is not None else None
+        await self.store(key, CachedResponse(text, suggested_responses, expires))
+
+    @abstractmethod
+    async def load(self, key: str) -> CachedResponse | None:
+        """
+        Load a cached answer, even if it has expired, or None if there is no answer.
+        """
+
+    @abstractmethod
+    async def store(self, key: str, response: CachedResponse) -> None:
+        """
+        Store an answer, replacing any answer with the same key.
+        """
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """
+        Delete a cached answer, if there is one.
+        """
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """
+        Delete all cached answers.
+        """
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    Response cache that keeps answers in memory and evicts the least recently used
+    ones when full.
+
+    None of its operations await, so it can be shared by any number of clients and
+    tasks of the same event loop.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 3600.0) -> None:
+        """
+        Parameters
+        ----------
+        max_size : int
+            The maximum number of cached answers. Default is 1024.
+        ttl : float | None
+            The number of seconds that an answer is kept. If None, answers never expire.
+            Default is 3600.0.
+        """
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._responses: OrderedDict[str, CachedResponse] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    async def load(self, key: str) -> CachedResponse | None:
+        response = self._responses.get(key)
+        if response is not None:
+            self._responses.move_to_end(key)
+        return response
+
+    async def store(self, key: str, response: CachedResponse) -> None:
+        self._responses[key] = response
+        self._responses.move_to_end(key)
+        while len(self._responses) > self.max_size:
+            self._responses.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._responses.pop(key, None)
+
+    async def clear(self) -> None:
+        self._responses.clear()
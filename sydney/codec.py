@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore
+
+
+class JSONCodec(ABC):
+    """
+    Base class for the JSON codecs that are used to encode requests to and decode
+    responses from Copilot. All codecs encode to and decode from UTF-8 bytes.
+    """
+
+    name = ""
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        """
+        Encode an object as UTF-8 JSON.
+        """
+
+    @abstractmethod
+    def decode(self, data: bytes | str) -> Any:
+        """
+        Decode UTF-8 JSON, given as bytes or as a string.
+        """
+
+
+class StdlibJSONCodec(JSONCodec):
+    """
+    JSON codec based on the `json` module of the standard library.
+    """
+
+    name = "json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode()
+
+    def decode(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec based on `orjson`.
+    """
+
+    name = "orjson"
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+    def decode(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """
+    JSON codec based on `msgspec`.
+    """
+
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+
+    def encode(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def decode(self, data: bytes | str) -> Any:
+        return self._decoder.decode(data)
+
+
+# Supported codecs and their modules, in order of preference.
+CODECS: dict[str, tuple[type[JSONCodec], Any]] = {
+    MsgspecCodec.name: (MsgspecCodec, msgspec),
+    OrjsonCodec.name: (OrjsonCodec, orjson),
+    StdlibJSONCodec.name: (StdlibJSONCodec, json),
+}
+
+_instances: dict[str, JSONCodec] = {}
+
+
+def available_codecs() -> list[str]:
+    """
+    Get the names of the JSON codecs that can be used, in order of preference.
+    """
+    return [name for name, (_, module) in CODECS.items() if module is not None]
+
+
+def get_codec(name: str | None = None) -> JSONCodec:
+    """
+    Get a JSON codec.
+
+    Parameters
+    ----------
+    name : str | None
+        The name of the codec. Must be one of the keys of `CODECS`. If None, the fastest
+        installed codec is used. Default is None.
+
+    Returns
+    -------
+    JSONCodec
+        The JSON codec.
+    """
+    if name is None:
+        name = available_codecs()[0]
+
+    if name not in _instances:
+        if name not in CODECS:
+            raise ValueError(
+                f"Unknown JSON codec: {name}, supported codecs are: {', '.join(CODECS)}"
+            )
+
+        codec_class, module = CODECS[name]
+        if module is None:
+            raise ValueError(f"JSON codec {name} requires the {name} package")
+
+        _instances[name] = codec_class()
+
+    return _instances[name]
@@ -29,7 +29,6 @@ KBLOB_HEADERS = {
     "Accept": "*/*",
     "Accept-Encoding": "gzip, deflate, br",
     "Accept-Language": "en-US,en;q=0.9",
-    "Content-Type": "multipart/form-data",
     "Referer": "https://copilot.microsoft.com/",
     "Sec-Ch-Ua": '"Microsoft Edge";v="131", "Chromium";v="132", "Not?A_Brand";v="8"',
     "Sec-Ch-Ua-Mobile": "?0",
@@ -50,3 +49,7 @@ BING_KBLOB_URL = "https://edgeservices.bing.com/images/kblob"
 BING_BLOB_URL = "https://edgeservices.bing.com/images/blob?bcid="
 
 DELIMETER = "\x1e"  # Record separator character.
+DELIMETER_BYTES = DELIMETER.encode()
+
+# Seconds to wait for an abandoned answer to be cancelled before the connection is aborted.
+CANCEL_TIMEOUT = 1.0
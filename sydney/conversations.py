@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable, Mapping
+
+from sydney.exceptions import GetConversationsException
+
+
+class ConversationChanges:
+    """
+    Conversations that were created, changed or deleted since a given version of a
+    `ConversationIndex`.
+    """
+
+    __slots__ = ("chats", "removed", "version")
+
+    def __init__(self, chats: list[dict], removed: list[str], version: int) -> None:
+        self.chats = chats  # New and changed conversations.
+        self.removed = removed  # IDs of the deleted conversations.
+        self.version = version  # Version of the index, to get the next changes.
+
+    def __repr__(self) -> str:
+        return (
+            f"<ConversationChanges {len(self.chats)} changed, "
+            f"{len(self.removed)} removed, version {self.version}>"
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.chats or self.removed)
+
+
+class ConversationIndex:
+    """
+    Local index of the conversations of an account, keyed by conversation ID, so that
+    callers can get only the conversations that changed since they last asked.
+
+    Conversations are requested with `If-None-Match` and `If-Modified-Since` headers, so
+    that servers that support them do not send them again if they did not change. Otherwise,
+    they are compared with the ones in the index. Concurrent refreshes share a single
+    request, and refreshes within `max_age` seconds of the last request reuse it.
+    """
+
+    def __init__(self, max_age: float = 0.0) -> None:
+        """
+        Parameters
+        ----------
+        max_age : float
+            The number of seconds that the conversations are reused after a request,
+            instead of requesting them again. Default is 0.0.
+        """
+        self.max_age = max_age
+        self.version = 0
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.response: dict | None = None  # Last response with all conversations.
+        # Statistics of the requests that were sent.
+        self.requests = 0
+        self.not_modified = 0
+        self._chats: dict[str, tuple[dict, int]] = {}  # Chat and version it changed.
+        self._removed: dict[str, int] = {}  # Version each chat was removed.
+        self._fetched: float | None = None
+        self._request: asyncio.Future[dict] | None = None
+
+    def __len__(self) -> int:
+        return len(self._chats)
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._chats
+
+    async def refresh(
+        self,
+        fetch: Callable[[dict], Awaitable[tuple[Mapping[str, str], dict | None]]],
+    ) -> dict:
+        """
+        Update the index, unless it was updated within `max_age` seconds.
+
+        Parameters
+        ----------
+        fetch : Callable[[dict], Awaitable[tuple[Mapping[str, str], dict | None]]]
+            Function that requests the conversations with the given conditional headers
+            and returns the headers and the decoded body of the response, or None as the
+            body if the conversations were not modified.
+
+        Returns
+        -------
+        dict
+            The last response with all conversations, which is shared with other callers
+            and must not be modified.
+        """
+        if self._request is None:
+            if (
+                self._fetched is not None
+                and self.response is not None
+                and monotonic() - self._fetched < self.max_age
+            ):
+                return self.response
+
+            request = asyncio.ensure_future(self._refresh(fetch))
+            self._request = request
+            request.add_done_callback(lambda _: setattr(self, "_request", None))
+
+        # The request continues if one of the callers that wait for it is cancelled, since
+        # other callers may still need it and the index is updated either way.
+        return await asyncio.shield(self._request)
+
+    def update(self, response: dict) -> None:
+        """
+        Update the index with a response that contains all conversations.
+
+        Parameters
+        ----------
+        response : dict
+            Dictionary containing `chats`, `result` and `clientId` fields, as returned by
+            Copilot.
+        """
+        version = self.version + 1
+        changed = False
+
+        seen = set()
+        for chat in response.get("chats") or []:
+            conversation_id = chat.get("conversationId")
+            if conversation_id is None:
+                continue
+            seen.add(conversation_id)
+
+            entry = self._chats.get(conversation_id)
+            if entry is None or entry[0] != chat:
+                self._chats[conversation_id] = chat, version
+                self._removed.pop(conversation_id, None)
+                changed = True
+
+        for conversation_id in self._chats.keys() - seen:
+            del self._chats[conversation_id]
+            self._removed[conversation_id] = version
+            changed = True
+
+        if changed:
+            self.version = version
+        self.response = response
+
+    def changes(self, since: int = 0) -> ConversationChanges:
+        """
+        Get the conversations that changed after a version of the index.
+
+        Parameters
+        ----------
+        since : int
+            The `version` of the last changes that the caller received. If 0, all
+            conversations are returned. Default is 0.
+
+        Returns
+        -------
+        ConversationChanges
+            The new, changed and removed conversations.
+        """
+        return ConversationChanges(
+            [chat for chat, version in self._chats.values() if version > since],
+            [id for id, version in self._removed.items() if version > since],
+            self.version,
+        )
+
+    def clear(self) -> None:
+        """
+        Remove all conversations from the index, so that the next refresh requests them
+        all again.
+        """
+        self.version = 0
+        self.etag = None
+        self.last_modified = None
+        self.response = None
+        self._chats.clear()
+        self._removed.clear()
+        self._fetched = None
+
+    async def _refresh(
+        self,
+        fetch: Callable[[dict], Awaitable[tuple[Mapping[str, str], dict | None]]],
+    ) -> dict:
+        headers = {}
+        if self.response is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+
+        self.requests += 1
+        response_headers, response = await fetch(headers)
+        self._fetched = monotonic()
+
+        if response is None:
+            if self.response is None:
+                raise GetConversationsException(
+                    "Conversations were not modified, but were never received"
+                )
+            self.not_modified += 1
+            return self.response
+
+        self.etag = response_headers.get("ETag")
+        self.last_modified = response_headers.get("Last-Modified")
+        self.update(response)
+        return response
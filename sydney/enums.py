@@ -196,3 +196,24 @@ class ResultValue(Enum):
     SUCCESS = "Success"
     THROTTLED = "Throttled"
     CAPTCHA_CHALLENGE = "CaptchaChallenge"
+
+
+class Phase(Enum):
+    """
+    Phases of a request to Copilot that are timed by `RequestTrace`. Supported options are:
+    - `start_conversation` for creating a new conversation
+    - `rate_limit` for waiting for the rate limiter
+    - `connect` for opening the websocket connection with Copilot
+    - `handshake` for the protocol handshake on a new websocket connection
+    - `upload` for uploading an attachment
+    - `first_frame` for the time from sending the prompt until the first answer frame
+    - `final_frame` for the time from sending the prompt until the final answer frame
+    """
+
+    START_CONVERSATION = "start_conversation"
+    RATE_LIMIT = "rate_limit"
+    CONNECT = "connect"
+    HANDSHAKE = "handshake"
+    UPLOAD = "upload"
+    FIRST_FRAME = "first_frame"
+    FINAL_FRAME = "final_frame"
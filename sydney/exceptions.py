@@ -26,6 +26,10 @@ class CreateConversationException(Exception):
     pass
 
 
+class AuthenticationException(CreateConversationException):
+    pass
+
+
 class GetConversationsException(Exception):
     pass
 
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+
+from sydney.constants import DELIMETER_BYTES
+
+# Start of the records of Copilot, up to the value of their `type` field.
+TYPE_PATTERN = re.compile(rb'\s*\{\s*"type"\s*:\s*(\d+)\s*[,}]')
+
+
+def peek_record_type(record: bytes) -> int | None:
+    """
+    Get the type of a record without decoding it.
+
+    Parameters
+    ----------
+    record : bytes
+        The record.
+
+    Returns
+    -------
+    int | None
+        The value of the `type` field, or None if it is not the first field of the record,
+        in which case the record must be decoded to get its type.
+    """
+    match = TYPE_PATTERN.match(record)
+    return int(match.group(1)) if match else None
+
+
+class RecordParser:
+    """
+    Incremental parser for the records of the ChatHub protocol, which are separated by
+    the record separator character.
+
+    Data is added with `feed` as it arrives, in any fragmentation, and the complete
+    records are returned by iterating over the parser. Data that was already scanned is
+    not scanned again, so records that arrive in many fragments are parsed in linear time.
+    """
+
+    __slots__ = ("_data", "_position", "_scanned")
+
+    def __init__(self) -> None:
+        self._data: bytes | bytearray = b""
+        self._position = 0  # Start of the data that was not returned as a record yet.
+        self._scanned = 0  # Position up to which the data contains no separator.
+
+    def __iter__(self) -> RecordParser:
+        return self
+
+    def __next__(self) -> bytes:
+        data = self._data
+        while True:
+            end = data.find(DELIMETER_BYTES, max(self._position, self._scanned))
+            if end == -1:
+                self._scanned = len(data)
+                raise StopIteration
+
+            start, self._position = self._position, end + 1
+            # Skip empty records.
+            if end > start:
+                if isinstance(data, bytes):
+                    return data[start:end]
+                return bytes(memoryview(data)[start:end])
+
+    @property
+    def pending(self) -> int:
+        """
+        Number of bytes of incomplete records, or of records that were not returned yet.
+        """
+        return len(self._data) - self._position
+
+    def feed(self, data: bytes | str) -> None:
+        """
+        Add data received from Copilot.
+
+        Parameters
+        ----------
+        data : bytes | str
+            The data, which may contain any number of complete or partial records.
+        """
+        if isinstance(data, str):
+            data = data.encode()
+
+        if self._position >= len(self._data):
+            # No pending data, use the new data as is.
+            self._data = data
+            self._position = self._scanned = 0
+            return
+
+        if self._position or not isinstance(self._data, bytearray):
+            # Keep only the pending data, in a buffer that new data can be appended to.
+            self._data = bytearray(memoryview(self._data)[self._position :])
+            self._scanned -= self._position
+            self._position = 0
+
+        self._data += data
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import os
+from base64 import b64encode
+
+from aiohttp.abc import AbstractStreamWriter
+from aiohttp.payload import Payload
+
+# Number of bytes of the file that are read and encoded at once. Must be a multiple of 3,
+# so that the base64 encoding of consecutive chunks can be concatenated without padding.
+CHUNK_SIZE = 3 * 64 * 1024
+
+
+class Base64FilePayload(Payload):
+    """
+    Multipart payload that streams a file as base64, reading and encoding it chunk by
+    chunk, so that the memory used by an upload does not depend on the size of the file.
+    """
+
+    def __init__(self, path: str, **kwargs) -> None:
+        """
+        Parameters
+        ----------
+        path : str
+            The path of the file.
+        """
+        super().__init__(path, **kwargs)
+        # Open the file, so that a missing or unreadable file fails before the request is
+        # sent instead of while its body is written.
+        with open(path, "rb") as file:
+            # Size of the base64 encoding, so that the request has a Content-Length header.
+            self._size = (os.fstat(file.fileno()).st_size + 2) // 3 * 4
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        loop = asyncio.get_running_loop()
+        # Read in the default executor, like aiohttp does for file payloads.
+        file = await loop.run_in_executor(None, open, self._value, "rb")
+        try:
+            while chunk := await loop.run_in_executor(None, file.read, CHUNK_SIZE):
+                await writer.write(b64encode(chunk))
+        finally:
+            file.close()
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        with open(self._value, "rb") as file:
+            return b64encode(file.read()).decode(encoding, errors)
@@ -0,0 +1,470 @@
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncGenerator,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+
+from aiohttp import ClientError
+from websockets.exceptions import ConnectionClosed
+
+from sydney.exceptions import (
+    ConnectionTimeoutException,
+    ConversationLimitException,
+    NoConnectionException,
+    ThrottledRequestException,
+)
+from sydney.sydney import SydneyClient
+
+# Exceptions after which a conversation is closed instead of being returned to the pool.
+EVICT_EXCEPTIONS = (
+    ConversationLimitException,
+    ThrottledRequestException,
+    NoConnectionException,
+    ConnectionTimeoutException,
+    ConnectionClosed,
+    ClientError,
+    OSError,
+)
+
+
+class BatchResult:
+    """
+    Result of a single prompt of a batch.
+    """
+
+    __slots__ = ("index", "prompt", "response", "exception")
+
+    def __init__(
+        self,
+        index: int,
+        prompt: str,
+        response: Any = None,
+        exception: Exception | None = None,
+    ) -> None:
+        self.index = index  # Position of the prompt in the batch.
+        self.prompt = prompt
+        self.response = response
+        self.exception = exception
+
+    def __repr__(self) -> str:
+        outcome = repr(self.exception) if self.exception else "ok"
+        return f"<BatchResult {self.index} {outcome}>"
+
+    @property
+    def ok(self) -> bool:
+        """
+        Whether the prompt was answered without an exception.
+        """
+        return self.exception is None
+
+
+class SydneyPool:
+    def __init__(
+        self,
+        size: int = 4,
+        style: str = "balanced",
+        persona: str = "copilot",
+        bing_cookies: str | list[str] | None = None,
+        use_proxy: bool = False,
+        max_concurrency: int | None = None,
+        **client_options: Any,
+    ) -> None:
+        """
+        Pool of Sydney clients, each one holding its own conversation with Copilot.
+
+        Parameters
+        ----------
+        size : int
+            The maximum number of conversations that the pool keeps open. Default is 4.
+        style : str
+            The conversation style of all conversations. Must be one of the options listed
+            in the `ConversationStyle` enum. Default is "balanced".
+        persona : str
+            The GPT persona of all conversations. Must be one of the options listed in the
+            `GPTPersonaID` enum. Default is "copilot".
+        bing_cookies: str | list[str] | None
+            The cookies from Bing required to connect and use Copilot. If a list is provided,
+            conversations are spread across the cookie sets in a round-robin fashion. If not
+            provided, the `BING_COOKIES` environment variable is loaded instead. Default is None.
+        use_proxy: bool
+            Flag to determine if an HTTP proxy will be used. Default is False.
+        max_concurrency: int | None
+            The maximum number of requests that run at the same time. If None, it is equal
+            to `size`. Default is None.
+        client_options
+            Additional keyword arguments that are passed to every `SydneyClient`.
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        self.size = size
+        self.style = style
+        self.persona = persona
+        self.bing_cookies = (
+            bing_cookies if isinstance(bing_cookies, list) else [bing_cookies]
+        )
+        self.use_proxy = use_proxy
+        self.max_concurrency = max_concurrency if max_concurrency else size
+        self.client_options = client_options
+        self.evictions = 0
+        self._clients: set[SydneyClient] = set()
+        # Idle conversations, and None for each conversation that was closed while callers
+        # were waiting, so that one of them opens a new conversation instead.
+        self._idle: asyncio.Queue[SydneyClient | None] = asyncio.Queue()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._open = 0  # Number of conversations that are open or being opened.
+        self._created = 0
+        self._waiting = 0  # Number of callers that wait for an idle conversation.
+        self._vacancies = 0  # Number of None items in `_idle`.
+
+    async def __aenter__(self) -> SydneyPool:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    @property
+    def idle(self) -> int:
+        """
+        Number of open conversations that are not in use.
+        """
+        return self._idle.qsize() - self._vacancies
+
+    @property
+    def in_use(self) -> int:
+        """
+        Number of open conversations that are currently in use.
+        """
+        return len(self._clients) - self.idle
+
+    async def _open_client(self) -> SydneyClient:
+        self._open += 1
+        bing_cookies = self.bing_cookies[self._created % len(self.bing_cookies)]
+        self._created += 1
+
+        client = SydneyClient(
+            style=self.style,
+            persona=self.persona,
+            bing_cookies=bing_cookies,
+            use_proxy=self.use_proxy,
+            **self.client_options,
+        )
+        try:
+            await client.start_conversation()
+        except BaseException:
+            self._vacate()
+            await client.close_conversation()
+            raise
+
+        self._clients.add(client)
+        return client
+
+    async def _close_client(self, client: SydneyClient) -> None:
+        if client in self._clients:
+            self._clients.remove(client)
+            self._vacate()
+        await client.close_conversation()
+
+    def _vacate(self) -> None:
+        self._open -= 1
+        # Callers that already wait for an idle conversation would otherwise keep waiting,
+        # although a new conversation can now be opened.
+        if self._waiting > self._idle.qsize():
+            self._vacancies += 1
+            self._idle.put_nowait(None)
+
+    async def start(self) -> None:
+        """
+        Open all conversations of the pool, so that they are ready to be used.
+        """
+        clients = await asyncio.gather(
+            *(self._open_client() for _ in range(self.size - self._open))
+        )
+        for client in clients:
+            self._idle.put_nowait(client)
+
+    async def close(self) -> None:
+        """
+        Close all conversations of the pool.
+        """
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        self._vacancies = 0
+
+        await asyncio.gather(
+            *(self._close_client(client) for client in list(self._clients))
+        )
+
+    async def acquire(self) -> SydneyClient:
+        """
+        Get a conversation from the pool, opening a new one if needed. Waits until a
+        conversation is available if all of them are in use.
+
+        Returns
+        -------
+        SydneyClient
+            A client with an open conversation. Must be given back with `release`.
+        """
+        await self._semaphore.acquire()
+        try:
+            if self._idle.empty() and self._open < self.size:
+                return await self._open_client()
+
+            self._waiting += 1
+            try:
+                client = await self._idle.get()
+            finally:
+                self._waiting -= 1
+            if client is None:
+                self._vacancies -= 1
+                return await self._open_client()
+            return client
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, client: SydneyClient, evict: bool = False) -> None:
+        """
+        Give a conversation back to the pool.
+
+        Parameters
+        ----------
+        client : SydneyClient
+            The client that was returned by `acquire`.
+        evict : bool, optional
+            Whether to close the conversation instead of reusing it. Conversations that
+            reached their message limit are always closed. Default is False.
+        """
+        try:
+            # Copilot rejects the message that reaches the limit, so a conversation that
+            # is one message away from it cannot be used anymore.
+            if (
+                client.max_messages is not None
+                and client.number_of_messages is not None
+                and client.number_of_messages + 1 >= client.max_messages
+            ):
+                evict = True
+
+            if client not in self._clients:
+                # Pool was closed while the conversation was in use.
+                await client.close_conversation()
+            elif evict:
+                self.evictions += 1
+                await self._close_client(client)
+            else:
+                self._idle.put_nowait(client)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def conversation(self) -> AsyncIterator[SydneyClient]:
+        """
+        Context manager that acquires a conversation and releases it on exit. The
+        conversation is evicted if any of the `EVICT_EXCEPTIONS` is raised.
+        """
+        client = await self.acquire()
+        try:
+            yield client
+        except EVICT_EXCEPTIONS:
+            await self.release(client, evict=True)
+            raise
+        except BaseException:
+            await self.release(client)
+            raise
+        else:
+            await self.release(client)
+
+    async def ask(self, prompt: str, **kwargs: Any) -> Any:
+        """
+        Send a prompt to Copilot using any free conversation of the pool and return the
+        answer. Accepts the same parameters as `SydneyClient.ask`.
+        """
+        async with self.conversation() as client:
+            return await client.ask(prompt, **kwargs)
+
+    async def ask_stream(self, prompt: str, **kwargs: Any) -> AsyncGenerator[Any, None]:
+        """
+        Send a prompt to Copilot using any free conversation of the pool and stream the
+        answer. Accepts the same parameters as `SydneyClient.ask_stream`.
+        """
+        async with self.conversation() as client:
+            responses = client.ask_stream(prompt, **kwargs)
+            try:
+                async for response in responses:
+                    yield response
+            finally:
+                await responses.aclose()
+
+    async def compose(self, prompt: str, **kwargs: Any) -> Any:
+        """
+        Compose text using any free conversation of the pool. Accepts the same parameters
+        as `SydneyClient.compose`.
+        """
+        async with self.conversation() as client:
+            return await client.compose(prompt, **kwargs)
+
+    async def compose_stream(
+        self, prompt: str, **kwargs: Any
+    ) -> AsyncGenerator[Any, None]:
+        """
+        Compose and stream text using any free conversation of the pool. Accepts the same
+        parameters as `SydneyClient.compose_stream`.
+        """
+        async with self.conversation() as client:
+            responses = client.compose_stream(prompt, **kwargs)
+            try:
+                async for response in responses:
+                    yield response
+            finally:
+                await responses.aclose()
+
+    async def ask_many(
+        self,
+        prompts: Iterable[str] | AsyncIterable[str],
+        ordered: bool = False,
+        progress: Callable[[int, int], Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[BatchResult, None]:
+        """
+        Send many independent prompts to Copilot, running up to `max_concurrency` of them
+        at the same time over the conversations of the pool. Accepts the same parameters
+        as `SydneyClient.ask`.
+
+        Parameters
+        ----------
+        prompts : Iterable[str] | AsyncIterable[str]
+            The prompts. They are consumed lazily, so they can be generated on the fly.
+        ordered : bool, optional
+            Whether to return the results in the order of the prompts, instead of as soon
+            as they complete. Default is False.
+        progress : Callable[[int, int], Any] | None, optional
+            Function that is called after each prompt with the number of completed and
+            failed prompts so far. Default is None.
+
+        Returns
+        -------
+        BatchResult
+            The result of each prompt, with either the response or the exception that
+            was raised.
+        """
+        async for result in self._run_many(
+            self.ask, prompts, ordered, progress, kwargs
+        ):
+            yield result
+
+    async def compose_many(
+        self,
+        prompts: Iterable[str] | AsyncIterable[str],
+        ordered: bool = False,
+        progress: Callable[[int, int], Any] | None = None,
+        **kwargs: Any,
+    ) -> AsyncGenerator[BatchResult, None]:
+        """
+        Compose text for many independent prompts, running up to `max_concurrency` of
+        them at the same time over the conversations of the pool. Accepts the same
+        parameters as `SydneyClient.compose` and `ask_many`.
+        """
+        async for result in self._run_many(
+            self.compose, prompts, ordered, progress, kwargs
+        ):
+            yield result
+
+    async def _run_many(
+        self,
+        function: Callable[..., Awaitable[Any]],
+        prompts: Iterable[str] | AsyncIterable[str],
+        ordered: bool,
+        progress: Callable[[int, int], Any] | None,
+        kwargs: dict,
+    ) -> AsyncGenerator[BatchResult, None]:
+        items = _enumerate(prompts)
+        lock = asyncio.Lock()
+        # Bounded, so that workers wait for slow consumers instead of piling up results.
+        results: asyncio.Queue[BatchResult | Exception | None] = asyncio.Queue(
+            self.max_concurrency
+        )
+
+        async def worker() -> None:
+            while True:
+                try:
+                    # Async generators cannot be advanced by many tasks at the same time.
+                    async with lock:
+                        index, prompt = await items.__anext__()
+                except StopAsyncIteration:
+                    await results.put(None)
+                    return
+                except Exception as exception:
+                    await results.put(exception)
+                    return
+
+                result = BatchResult(index, prompt)
+                try:
+                    result.response = await self._call(function, prompt, kwargs)
+                except Exception as exception:
+                    result.exception = exception
+                await results.put(result)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            running = len(workers)
+            completed = failed = 0
+            pending: dict[int, BatchResult] = {}
+            next_index = 0
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                if isinstance(result, Exception):
+                    raise result
+
+                completed += 1
+                failed += not result.ok
+                if progress:
+                    progress(completed, failed)
+
+                if not ordered:
+                    yield result
+                    continue
+
+                pending[result.index] = result
+                while next_index in pending:
+                    yield pending.pop(next_index)
+                    next_index += 1
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await items.aclose()  # type: ignore
+
+    async def _call(
+        self, function: Callable[..., Awaitable[Any]], prompt: str, kwargs: dict
+    ) -> Any:
+        try:
+            return await function(prompt, **kwargs)
+        except ConversationLimitException:
+            # Conversation was closed when it reached its limit, try again with another one.
+            return await function(prompt, **kwargs)
+
+
+async def _enumerate(
+    prompts: Iterable[str] | AsyncIterable[str],
+) -> AsyncIterator[tuple[int, str]]:
+    index = 0
+    if isinstance(prompts, AsyncIterable):
+        async for prompt in prompts:
+            yield index, prompt
+            index += 1
+    else:
+        for prompt in prompts:
+            yield index, prompt
+            index += 1
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from time import monotonic
+
+
+class TokenBucket:
+    """
+    Token bucket that allows `rate` requests per second on average, with bursts of up
+    to `capacity` requests.
+
+    Requests that arrive when the bucket is empty wait in order. Changes of the rate
+    apply immediately to the requests that are already waiting.
+    """
+
+    __slots__ = (
+        "rate",
+        "capacity",
+        "tokens",
+        "updated",
+        "decreased",
+        "_waiters",
+        "_timer",
+    )
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = monotonic()
+        self.decreased = float("-inf")  # When the rate was last lowered.
+        self._waiters: deque[asyncio.Future] = deque()
+        self._timer: asyncio.TimerHandle | None = None
+
+    @property
+    def waiting(self) -> int:
+        """
+        Number of requests that are waiting for a token.
+        """
+        return len(self._waiters)
+
+    def set_rate(self, rate: float) -> None:
+        """
+        Change the rate of the bucket.
+        """
+        self._refill()
+        self.rate = rate
+        self._schedule()
+
+    def try_acquire(self) -> bool:
+        """
+        Take a token from the bucket without waiting.
+
+        Returns
+        -------
+        bool
+            Whether a token was taken. Tokens are never taken ahead of waiting requests.
+        """
+        self._refill()
+        if self._waiters or self.tokens < 1:
+            return False
+
+        self.tokens -= 1
+        return True
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token can be taken from the bucket and take it.
+        """
+        if self.try_acquire():
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._schedule()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.cancelled():
+                # Already dropped if the timer fired before the request was cancelled.
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            else:
+                # Token was given right before the request was cancelled.
+                self.tokens += 1
+            self._schedule()
+            raise
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _schedule(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        if self._waiters:
+            self._refill()
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._timer = None
+        self._refill()
+        # Allow for rounding errors, so that the timer does not fire repeatedly.
+        while self._waiters and self.tokens >= 1 - 1e-9:
+            waiter = self._waiters.popleft()
+            # Skip requests that were cancelled, but did not remove themselves yet.
+            if waiter.done():
+                continue
+            self.tokens -= 1
+            waiter.set_result(None)
+        self._schedule()
+
+
+class AdaptiveRateLimiter:
+    """
+    Rate limiter with a token bucket per account, whose rate is lowered whenever Copilot
+    throttles a request and raised again after every successful request, in order to stay
+    just under the rate at which Copilot starts throttling.
+
+    The same limiter should be shared by all clients of a process, so that clients that use
+    the same account share its rate.
+    """
+
+    def __init__(
+        self,
+        rate: float = 1.0,
+        min_rate: float = 0.05,
+        max_rate: float = 5.0,
+        burst: float = 5.0,
+        increase: float = 0.05,
+        decrease: float = 0.5,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        rate : float
+            The initial number of requests per second of each account. Default is 1.0.
+        min_rate : float
+            The lowest rate that throttled requests can lower the rate to. Default is 0.05.
+        max_rate : float
+            The highest rate that successful requests can raise the rate to. Default is 5.0.
+        burst : float
+            The number of requests of an account that can be sent at once after it was idle.
+            Default is 5.0.
+        increase : float
+            The number of requests per second that are added to the rate after every
+            successful request. Default is 0.05.
+        decrease : float
+            The factor that the rate is multiplied with after a throttled request. Default
+            is 0.5.
+        """
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Rate must be between min_rate and max_rate")
+        if not 0 < decrease < 1:
+            raise ValueError("Decrease factor must be between 0 and 1")
+
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.initial_rate, self.burst)
+        return bucket
+
+    def rate(self, key: str = "") -> float:
+        """
+        Get the current number of requests per second of an account.
+        """
+        return self._bucket(key).rate
+
+    def queue_depth(self, key: str = "") -> int:
+        """
+        Get the number of requests of an account that are waiting to be sent.
+        """
+        return self._bucket(key).waiting
+
+    async def acquire(self, key: str = "") -> None:
+        """
+        Wait until a request of an account can be sent.
+
+        Parameters
+        ----------
+        key : str
+            The account that sends the request, such as its cookies. Default is "".
+        """
+        await self._bucket(key).acquire()
+
+    def on_success(self, key: str = "") -> None:
+        """
+        Raise the rate of an account after a request that was not throttled.
+        """
+        bucket = self._bucket(key)
+        bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+
+    def on_throttled(self, key: str = "", sent: float | None = None) -> None:
+        """
+        Lower the rate of an account after a request that was throttled.
+
+        Parameters
+        ----------
+        key : str
+            The account that sent the request. Default is "".
+        sent : float | None
+            The `time.monotonic` time at which the request started waiting for the limiter.
+            Requests that started waiting before the rate was last lowered do not lower it
+            again, since they may have been sent at the previous rate. If None, the rate is
+            always lowered. Default is None.
+        """
+        self.throttled += 1
+        bucket = self._bucket(key)
+        if sent is not None and sent < bucket.decreased:
+            return
+
+        bucket.decreased = monotonic()
+        bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease))
+        # Do not allow bursts until the account has recovered.
+        bucket.tokens = min(bucket.tokens, 0)
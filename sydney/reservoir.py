@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from time import monotonic
+from typing import TYPE_CHECKING, Awaitable, Callable
+
+if TYPE_CHECKING:
+    from sydney.accounts import Account
+
+
+class Conversation:
+    """
+    Information of a conversation that was created with Copilot.
+    """
+
+    __slots__ = (
+        "conversation_id",
+        "client_id",
+        "conversation_signature",
+        "encrypted_conversation_signature",
+        "created",
+        "account",
+    )
+
+    def __init__(
+        self,
+        conversation_id: str,
+        client_id: str,
+        conversation_signature: str,
+        encrypted_conversation_signature: str,
+    ) -> None:
+        self.conversation_id = conversation_id
+        self.client_id = client_id
+        self.conversation_signature = conversation_signature
+        self.encrypted_conversation_signature = encrypted_conversation_signature
+        self.created = monotonic()
+        self.account: Account | None = None  # Account it was created with, if any.
+
+
+class ConversationReservoir:
+    """
+    Keep a number of new conversations ready, so that a conversation can be started
+    without waiting for Copilot to create it. Conversations that were taken are replaced
+    in the background.
+    """
+
+    def __init__(
+        self,
+        create: Callable[[], Awaitable[Conversation]],
+        size: int = 2,
+        max_age: float = 300.0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        create : Callable[[], Awaitable[Conversation]]
+            Function that creates a new conversation with Copilot.
+        size : int
+            The number of conversations that are kept ready. Default is 2.
+        max_age : float
+            The number of seconds after which a conversation that was not used is dropped.
+            Default is 300.0.
+        """
+        if size < 1:
+            raise ValueError("Reservoir size must be at least 1")
+
+        self.create = create
+        self.size = size
+        self.max_age = max_age
+        self._conversations: deque[Conversation] = deque()
+        self._refill_task: asyncio.Task | None = None
+
+    @property
+    def available(self) -> int:
+        """
+        Number of conversations that are ready to be taken, including stale ones that
+        have not been dropped yet.
+        """
+        return len(self._conversations)
+
+    async def take(self) -> Conversation:
+        """
+        Take a conversation, creating one if none is ready. Starts refilling the
+        reservoir in the background.
+
+        Returns
+        -------
+        Conversation
+            A new conversation.
+        """
+        self._drop_stale()
+
+        if self._conversations:
+            conversation = self._conversations.popleft()
+        else:
+            conversation = await self.create()
+
+        self.refill()
+        return conversation
+
+    def refill(self) -> None:
+        """
+        Start creating conversations in the background until the reservoir is full,
+        unless it is already being refilled.
+        """
+        if self._refill_task is None or self._refill_task.done():
+            self._refill_task = asyncio.create_task(self._refill())
+
+    async def close(self) -> None:
+        """
+        Stop refilling the reservoir and drop all conversations.
+        """
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+
+        self._conversations.clear()
+
+    async def _refill(self) -> None:
+        self._drop_stale()
+
+        missing = self.size - len(self._conversations)
+        results = await asyncio.gather(
+            *(self.create() for _ in range(missing)), return_exceptions=True
+        )
+        for result in results:
+            # Failures are ignored, `take` creates conversations directly when empty.
+            if isinstance(result, Conversation):
+                self._conversations.append(result)
+
+    def _drop_stale(self) -> None:
+        now = monotonic()
+        while self._conversations and (
+            now - self._conversations[0].created >= self.max_age
+        ):
+            self._conversations.popleft()
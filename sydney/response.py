@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from typing import Any
+
+_UNSET: Any = object()
+
+
+class Source:
+    """
+    Web page that was used as a source of an answer.
+    """
+
+    __slots__ = ("title", "url")
+
+    def __init__(self, title: str, url: str) -> None:
+        self.title = title
+        self.url = url
+
+    def __repr__(self) -> str:
+        return f"<Source {self.title!r} {self.url!r}>"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Source):
+            return NotImplemented
+        return self.title == other.title and self.url == other.url
+
+
+class SydneyResponse:
+    """
+    Answer of Copilot to a prompt, built from the final message of ChatHub.
+
+    The text and search queries are extracted when the response is created. The cited
+    text, suggested responses and sources are extracted when they are first accessed. The
+    message of the answer is kept only until all of them were extracted, or until
+    `compact` is called.
+    """
+
+    __slots__ = (
+        "text",
+        "search_queries",
+        "throttling",
+        "result",
+        "_message",
+        "_cited_text",
+        "_suggestions",
+        "_sources",
+    )
+
+    def __init__(self, item: dict) -> None:
+        """
+        Parameters
+        ----------
+        item : dict
+            The `item` of the final message of ChatHub, with the `messages` of the
+            conversation turn, its `result` and `throttling` information.
+        """
+        messages = item.get("messages") or []
+        message = _find_answer(messages)
+
+        self.text: str = message.get("text", "") if message else ""
+        self.search_queries: list[str] = [
+            query
+            for query in (
+                message.get("hiddenText") or message.get("text")
+                for message in messages
+                if message.get("messageType") == "InternalSearchQuery"
+            )
+            if query
+        ]
+        self.throttling: dict | None = item.get("throttling")
+        self.result: str | None = (item.get("result") or {}).get("value")
+        self._message: dict | None = message
+        self._cited_text: str | None = _UNSET
+        self._suggestions: list[str] = _UNSET
+        self._sources: list[Source] = _UNSET
+
+    def __repr__(self) -> str:
+        text = self.text if len(self.text) <= 40 else f"{self.text[:37]}..."
+        return f"<SydneyResponse {text!r}>"
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def cited_text(self) -> str | None:
+        """
+        Text of the answer with references to its sources, or None if there is none.
+        """
+        if self._cited_text is _UNSET:
+            self._cited_text = _cited_text(self._message)
+            self._release()
+        return self._cited_text
+
+    @property
+    def suggestions(self) -> list[str]:
+        """
+        Suggested user responses to the answer.
+        """
+        if self._suggestions is _UNSET:
+            self._suggestions = [
+                suggestion["text"]
+                for suggestion in (self._message or {}).get("suggestedResponses") or []
+            ]
+            self._release()
+        return self._suggestions
+
+    @property
+    def sources(self) -> list[Source]:
+        """
+        Web pages that were used as sources of the answer.
+        """
+        if self._sources is _UNSET:
+            self._sources = [
+                Source(
+                    attribution.get("providerDisplayName", ""),
+                    attribution.get("seeMoreUrl", ""),
+                )
+                for attribution in (self._message or {}).get("sourceAttributions") or []
+            ]
+            self._release()
+        return self._sources
+
+    @property
+    def number_of_messages(self) -> int | None:
+        """
+        Number of messages of the conversation, including this one.
+        """
+        if self.throttling is None:
+            return None
+        return self.throttling.get("numUserMessagesInConversation")
+
+    @property
+    def max_messages(self) -> int | None:
+        """
+        Maximum number of messages of the conversation.
+        """
+        if self.throttling is None:
+            return None
+        return self.throttling.get("maxNumUserMessagesInConversation")
+
+    def compact(self) -> SydneyResponse:
+        """
+        Extract all fields and release the message of the answer, to reduce the memory
+        of responses that are kept for a long time.
+
+        Returns
+        -------
+        SydneyResponse
+            The same response.
+        """
+        _ = self.cited_text, self.suggestions, self.sources
+        return self
+
+    def _release(self) -> None:
+        if (
+            self._cited_text is not _UNSET
+            and self._suggestions is not _UNSET
+            and self._sources is not _UNSET
+        ):
+            self._message = None
+
+
+def _find_answer(messages: list[dict]) -> dict | None:
+    # The answer is the last message, unless it is an inline message, which typically
+    # follows the answer when an attachment is provided.
+    for message in reversed(messages):
+        adaptive_cards = message.get("adaptiveCards")
+        if adaptive_cards and adaptive_cards[-1]["body"][0].get("inlines"):
+            continue
+        return message
+    return None
+
+
+def _cited_text(message: dict | None) -> str | None:
+    adaptive_cards = (message or {}).get("adaptiveCards")
+    if not adaptive_cards:
+        return None
+
+    # The first body item may have an `altText` field instead of `text`.
+    for body in adaptive_cards[0]["body"][:2]:
+        if body.get("text"):
+            return body["text"]
+    return None
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import asyncio
+from random import random
+from time import monotonic
+
+from aiohttp import ClientError
+from websockets.exceptions import ConnectionClosed
+
+from sydney.exceptions import (
+    AuthenticationException,
+    ConnectionTimeoutException,
+    CreateConversationException,
+    NoResponseException,
+)
+
+# Failures of the network or of Copilot that usually succeed when the request is sent again.
+# Throttled requests, CAPTCHA challenges, full conversations and local errors, such as a
+# missing attachment, are not retried, since sending the request again does not help.
+RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (
+    ConnectionTimeoutException,
+    CreateConversationException,
+    NoResponseException,
+    ConnectionClosed,
+    ClientError,
+    asyncio.TimeoutError,
+    ConnectionError,
+)
+
+# Subclasses of retryable exceptions that are never retried, such as failed authentication,
+# which fails again until the cookies are replaced.
+NON_RETRYABLE_EXCEPTIONS: tuple[type[BaseException], ...] = (AuthenticationException,)
+
+
+class RetryPolicy:
+    """
+    Policy that decides whether and when a request to Copilot that failed is sent again,
+    with exponential backoff and jitter between attempts.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        multiplier: float = 2.0,
+        jitter: float = 1.0,
+        deadline: float | None = None,
+        retry_on: tuple[type[BaseException], ...] = RETRYABLE_EXCEPTIONS,
+        restart_streams: bool = False,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_attempts : int
+            The maximum number of times that a request is sent, including the first attempt.
+            Default is 3.
+        base_delay : float
+            The number of seconds that are waited before the first retry. Default is 0.5.
+        max_delay : float
+            The maximum number of seconds that are waited between two attempts. Default is 10.0.
+        multiplier : float
+            The factor that the delay is multiplied with after every retry. Default is 2.0.
+        jitter : float
+            The fraction of each delay that is randomized, so that clients that failed at the
+            same time do not retry at the same time. If 0, delays are not randomized. Default
+            is 1.0.
+        deadline : float | None
+            The maximum number of seconds since the first attempt after which a request is
+            no longer retried. If None, only `max_attempts` limits the retries. Default is None.
+        retry_on : tuple[type[BaseException], ...]
+            The exceptions that are retried. Default is `RETRYABLE_EXCEPTIONS`.
+        restart_streams : bool
+            Whether a streamed answer that failed after some of its text was already returned
+            is restarted from the beginning. If False, such failures are never retried, since
+            the text would be returned twice. Default is False.
+        """
+        if max_attempts < 1:
+            raise ValueError("Maximum number of attempts must be at least 1")
+        if not 0 <= jitter <= 1:
+            raise ValueError("Jitter must be between 0 and 1")
+
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = retry_on
+        self.restart_streams = restart_streams
+
+    def is_retryable(self, exception: BaseException) -> bool:
+        """
+        Check whether an exception is one of the exceptions that are retried, and not one
+        of the `NON_RETRYABLE_EXCEPTIONS`.
+        """
+        return isinstance(exception, self.retry_on) and not isinstance(
+            exception, NON_RETRYABLE_EXCEPTIONS
+        )
+
+    def delay(self, attempt: int, started: float) -> float | None:
+        """
+        Get the number of seconds to wait before the next attempt.
+
+        Parameters
+        ----------
+        attempt : int
+            The number of attempts that failed so far, starting from 1.
+        started : float
+            The `time.monotonic` time of the first attempt.
+
+        Returns
+        -------
+        float | None
+            The number of seconds to wait, or None if the request must not be retried.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        backoff = min(
+            self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)
+        )
+        delay = backoff * (1 - self.jitter * random())
+        if self.deadline is not None and monotonic() + delay - started > self.deadline:
+            return None
+
+        return delay
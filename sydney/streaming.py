@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from collections import deque
+from typing import AsyncGenerator
+
+from sydney.framing import peek_record_type
+
+# Start of the type 1 messages of Copilot, up to the value of the `text` field of the first message.
+UPDATE_PREFIX = b'{"type":1,"target":"update","arguments":[{"messages":[{"text":"'
+
+# Number of bytes before the end of the already streamed text that must be unchanged
+# in a new message for it to be treated as a continuation of the same text.
+ANCHOR_SIZE = 32
+
+BACKSLASH = ord("\\")
+
+
+class TextDelta:
+    """
+    Track the text that Copilot has streamed so far and compute only the newly appended
+    text from each message.
+
+    Copilot sends the whole text generated so far in every type 1 message. Instead of
+    decoding each message as a whole, the appended text is decoded directly from the raw
+    message whenever it continues the previous one, so that the cost of each message
+    depends only on the size of the new text and not on the size of the whole answer.
+    """
+
+    __slots__ = ("_chunks", "_length", "_raw_end", "_anchor")
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []  # Streamed text, joined only when needed.
+        self._length = 0
+        # Position of the closing quote of the text in the previous raw message.
+        self._raw_end = -1
+        self._anchor = b""
+
+    @property
+    def text(self) -> str:
+        """
+        The text that was streamed so far.
+        """
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def update(self, text: str, raw_message: bytes | None = None) -> str:
+        """
+        Compute the new text from the whole text generated so far.
+
+        If Copilot rewrites text that was already streamed, that text cannot be taken back,
+        so streaming continues after the length of the text that was already returned and
+        nothing is returned twice.
+
+        Parameters
+        ----------
+        text : str
+            The whole text generated so far.
+        raw_message : bytes | None
+            The raw message that contains `text` as the `text` field of its first message.
+            If provided, the following messages can be handled with `update_raw`.
+
+        Returns
+        -------
+        str
+            The newly appended text.
+        """
+        delta = text[self._length :]
+        if delta:
+            self._chunks = [text]
+            self._length = len(text)
+        self._raw_end = -1
+
+        if raw_message is not None and raw_message.startswith(UPDATE_PREFIX):
+            raw_end = _find_string_end(raw_message, len(UPDATE_PREFIX))
+            raw_text = raw_message[len(UPDATE_PREFIX) : raw_end]
+            if raw_end != -1 and json.loads(b'"' + raw_text + b'"') == self.text:
+                self._set_raw_end(raw_message, raw_end)
+
+        return delta
+
+    def update_raw(self, raw_message: bytes) -> str | None:
+        """
+        Compute the new text from a raw type 1 message without decoding all of it.
+
+        Parameters
+        ----------
+        raw_message : bytes
+            The raw message.
+
+        Returns
+        -------
+        str | None
+            The newly appended text, or None if the message does not continue the
+            previous one and must be decoded and passed to `update` instead.
+        """
+        raw_end = self._raw_end
+        if (
+            raw_end == -1
+            or not raw_message.startswith(UPDATE_PREFIX)
+            or not raw_message.startswith(self._anchor, raw_end - len(self._anchor))
+        ):
+            return None
+
+        new_raw_end = _find_string_end(raw_message, raw_end)
+        if new_raw_end == -1:
+            return None
+
+        # Keep an unpaired high surrogate for the next message, since it cannot be decoded alone.
+        end = new_raw_end
+        if _ends_with_high_surrogate(raw_message, raw_end, end):
+            end -= 6
+
+        delta = json.loads(b'"' + raw_message[raw_end:end] + b'"')
+        self._chunks.append(delta)
+        self._length += len(delta)
+        self._set_raw_end(raw_message, end)
+
+        return delta
+
+    def _set_raw_end(self, raw_message: bytes, raw_end: int) -> None:
+        self._raw_end = raw_end
+        self._anchor = raw_message[
+            max(len(UPDATE_PREFIX), raw_end - ANCHOR_SIZE) : raw_end
+        ]
+
+
+def _find_string_end(raw_message: bytes, start: int) -> int:
+    """
+    Find the position of the closing quote of a JSON string, starting inside the string.
+    """
+    position = raw_message.find(b'"', start)
+    while position != -1:
+        # The quote is escaped if it follows an odd number of backslashes.
+        backslashes = 0
+        while raw_message[position - backslashes - 1] == BACKSLASH:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return position
+        position = raw_message.find(b'"', position + 1)
+
+    return -1
+
+
+def _ends_with_high_surrogate(raw_message: bytes, start: int, end: int) -> bool:
+    if end - start < 6 or raw_message[end - 6 : end - 2].lower() not in (
+        b"\\ud8",
+        b"\\ud9",
+        b"\\uda",
+        b"\\udb",
+    ):
+        return False
+
+    # Make sure that the backslash itself is not escaped.
+    backslashes = 0
+    while raw_message[end - 7 - backslashes] == BACKSLASH:
+        backslashes += 1
+    return backslashes % 2 == 0
+
+
+class StreamBuffer:
+    """
+    Bounded buffer between a task that reads an answer from Copilot and a consumer that
+    may be slower than Copilot.
+
+    Items are the `(response, suggested_responses)` tuples of a stream. When the buffer is
+    full, a new item is merged into the last pending one instead of waiting for the
+    consumer: new text is appended to the pending text, and a new type 1 message replaces
+    the pending one, since each type 1 message contains the whole answer so far. The reader
+    only waits for the consumer when items cannot be merged.
+    """
+
+    __slots__ = (
+        "size",
+        "coalesced",
+        "_items",
+        "_readable",
+        "_writable",
+        "_done",
+        "_exception",
+    )
+
+    def __init__(self, size: int) -> None:
+        """
+        Parameters
+        ----------
+        size : int
+            The maximum number of pending items.
+        """
+        if size < 1:
+            raise ValueError("Buffer size must be at least 1")
+
+        self.size = size
+        self.coalesced = 0  # Number of items that were merged into pending ones.
+        self._items: deque[tuple] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._done = False
+        self._exception: BaseException | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    async def put(self, item: tuple) -> None:
+        """
+        Add an item, merging it into the last pending item if the buffer is full.
+        """
+        while len(self._items) >= self.size:
+            merged = _merge(self._items[-1], item)
+            if merged is not None:
+                self._items[-1] = merged
+                self.coalesced += 1
+                return
+            self._writable.clear()
+            await self._writable.wait()
+
+        self._items.append(item)
+        self._readable.set()
+
+    def close(self, exception: BaseException | None = None) -> None:
+        """
+        Mark the end of the stream. The exception, if any, is raised by `get` after all
+        pending items were returned.
+        """
+        self._done = True
+        self._exception = exception
+        self._readable.set()
+
+    async def get(self) -> tuple:
+        """
+        Get the next item, waiting until one is available.
+
+        Raises
+        ------
+        StopAsyncIteration
+            If the stream ended and all items were returned.
+        """
+        while not self._items:
+            if self._done:
+                if self._exception is not None:
+                    raise self._exception
+                raise StopAsyncIteration
+            self._readable.clear()
+            await self._readable.wait()
+
+        item = self._items.popleft()
+        self._writable.set()
+        return item
+
+
+async def buffered(
+    generator: AsyncGenerator[tuple, None], size: int
+) -> AsyncGenerator[tuple, None]:
+    """
+    Read a stream in a background task into a `StreamBuffer`, so that the stream is read
+    as fast as Copilot sends it regardless of how fast the returned stream is consumed.
+
+    Parameters
+    ----------
+    generator : AsyncGenerator[tuple, None]
+        The stream.
+    size : int
+        The maximum number of pending items of the buffer.
+
+    Returns
+    -------
+    tuple
+        The items of the stream, where consecutive items may have been merged.
+    """
+    buffer = StreamBuffer(size)
+
+    async def read() -> None:
+        try:
+            async for item in generator:
+                await buffer.put(item)
+        except Exception as exception:
+            buffer.close(exception)
+        else:
+            buffer.close()
+
+    reader = asyncio.ensure_future(read())
+    try:
+        while True:
+            try:
+                item = await buffer.get()
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+        await generator.aclose()
+
+
+def _merge(pending: tuple, item: tuple) -> tuple | None:
+    response, suggested_responses = item
+    pending_response, pending_suggested_responses = pending
+    # The final response is never merged, so that it is returned as is.
+    if pending_suggested_responses is not None:
+        return None
+
+    if isinstance(pending_response, str) and isinstance(response, str):
+        return pending_response + response, suggested_responses
+    if (
+        isinstance(pending_response, dict)
+        and isinstance(response, dict)
+        and pending_response.get("type") == response.get("type") == 1
+    ):
+        return item
+    if (
+        isinstance(pending_response, bytes)
+        and isinstance(response, bytes)
+        and peek_record_type(pending_response) == peek_record_type(response) == 1
+    ):
+        return item
+    return None
@@ -1,45 +1,45 @@
 from __future__ import annotations
 
-import json
+import asyncio
 from asyncio import TimeoutError
-from base64 import b64encode
+from copy import deepcopy
 from os import getenv
-from typing import AsyncGenerator
+from time import monotonic, perf_counter
+from typing import AsyncGenerator, Awaitable, Callable, Mapping, TypeVar, cast
 from urllib import parse
 
 import websockets.asyncio.client as websockets
-from aiohttp import ClientSession, FormData, TCPConnector
+from aiohttp import ClientSession, DummyCookieJar, FormData, TCPConnector
+from aiohttp.abc import AbstractCookieJar
 from websockets.asyncio.client import ClientConnection
-
+from websockets.exceptions import ConnectionClosed
+from websockets.protocol import State
+
+from sydney import constants
+from sydney.accounts import ACCOUNT_EXCEPTIONS, Account, AccountManager
+from sydney.blobs import BlobCache, blob_key
+from sydney.cache import ResponseCache, cache_key
+from sydney.codec import get_codec
 from sydney.constants import (
-    BING_BLOB_URL,
-    BING_CHATHUB_URL,
-    BING_CREATE_CONVERSATION_URL,
-    BING_GET_CONVERSATIONS_URL,
-    BING_KBLOB_URL,
+    CANCEL_TIMEOUT,
     CHATHUB_HEADERS,
     CREATE_HEADERS,
-    DELIMETER,
     KBLOB_HEADERS,
 )
+from sydney.conversations import ConversationChanges, ConversationIndex
 from sydney.enums import (
     ComposeFormat,
     ComposeLength,
     ComposeTone,
-    ConversationHistoryOptionsSets,
     ConversationStyle,
     ConversationStyleOptionSets,
-    CookieOptions,
     CustomComposeTone,
-    DefaultComposeOptions,
-    DefaultOptions,
     GPTPersonaID,
-    MessageType,
-    NoSearchOptions,
-    PersonaOptions,
+    Phase,
     ResultValue,
 )
 from sydney.exceptions import (
+    AuthenticationException,
     CaptchaChallengeException,
     ConnectionTimeoutException,
     ConversationLimitException,
@@ -50,8 +50,24 @@ from sydney.exceptions import (
     NoResponseException,
     ThrottledRequestException,
 )
+from sydney.framing import RecordParser, peek_record_type
+from sydney.payload import Base64FilePayload
+from sydney.ratelimit import AdaptiveRateLimiter
+from sydney.reservoir import Conversation, ConversationReservoir
+from sydney.response import SydneyResponse
+from sydney.retry import RetryPolicy
+from sydney.streaming import TextDelta, buffered
+from sydney.templates import (
+    ask_template,
+    build_ask_arguments,
+    build_compose_arguments,
+    compose_template,
+)
+from sydney.tracing import RequestTrace
 from sydney.utils import as_json, check_if_url, cookies_as_dict, get_iso_timestamp
 
+T = TypeVar("T")
+
 
 class SydneyClient:
     def __init__(
@@ -60,6 +76,20 @@ class SydneyClient:
         persona: str = "copilot",
         bing_cookies: str | None = None,
         use_proxy: bool = False,
+        persistent: bool = False,
+        keepalive_interval: float = 15.0,
+        connection_limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        json_codec: str | None = None,
+        cache: ResponseCache | None = None,
+        on_trace: Callable[[RequestTrace], None] | None = None,
+        reservoir_size: int = 0,
+        reservoir_max_age: float = 300.0,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        blob_cache: BlobCache | None = None,
+        conversation_index: ConversationIndex | None = None,
+        accounts: AccountManager | None = None,
     ) -> None:
         """
         Client for Copilot (formerly named Bing Chat), also known as Sydney.
@@ -79,9 +109,81 @@ class SydneyClient:
             Flag to determine if an HTTP proxy will be used to start a conversation with Copilot. If set to True,
             the `HTTP_PROXY` and `HTTPS_PROXY` environment variables must be set to the address of the proxy to be used.
             If not provided, no proxy will be used. Default is False.
+        persistent: bool
+            Flag to determine if the websocket connection with Copilot will be kept open and reused
+            across the prompts of the same conversation, instead of opening a new connection for each
+            prompt. Default is False.
+        keepalive_interval: float
+            The number of seconds between keep-alive pings that are sent to Copilot while a persistent
+            connection is idle. Only used when `persistent` is True. Default is 15.0.
+        connection_limit_per_host: int
+            The maximum number of simultaneous HTTP connections to each Copilot host, shared by
+            all HTTP requests of the client, such as image uploads. If 0, there is no limit.
+            Default is 0.
+        keepalive_timeout: float
+            The number of seconds that idle HTTP connections are kept open for reuse. Default is 15.0.
+        json_codec: str | None
+            The JSON codec that is used to encode requests to and decode responses from Copilot.
+            Must be one of `orjson`, `msgspec` or `json`. If None, the fastest installed codec is
+            used. Default is None.
+        cache: ResponseCache | None
+            The cache that is used to answer repeated prompts without contacting Copilot, such as
+            a `MemoryResponseCache`. Requests with attachments or in raw mode are never cached.
+            If None, no cache is used. Default is None.
+        on_trace: Callable[[RequestTrace], None] | None
+            Function that is called with a `RequestTrace` after every request to Copilot, with the
+            timing of each phase of the request. If None, requests are not traced. Default is None.
+        reservoir_size: int
+            The number of new conversations that are created in the background and kept ready, so
+            that starting or resetting a conversation does not wait for Copilot. If 0, conversations
+            are created when they are started. Default is 0.
+        reservoir_max_age: float
+            The number of seconds after which a conversation of the reservoir that was not used is
+            dropped. Default is 300.0.
+        rate_limiter: AdaptiveRateLimiter | None
+            The rate limiter that paces the prompts of the client based on whether Copilot throttles
+            them. Should be shared by all clients, so that clients with the same cookies share the
+            same rate. If None, prompts are not rate limited. Default is None.
+        retry_policy: RetryPolicy | None
+            The policy that decides whether prompts and new conversations that failed because of
+            transient errors are sent again. The number of retries is counted in `retries`. If None,
+            failed requests are not retried. Default is None.
+        blob_cache: BlobCache | None
+            The cache of the images that were uploaded to Copilot, so that the same image is not
+            uploaded again when it is attached to another prompt. Can be shared by all clients.
+            If None, images are uploaded with every prompt. Default is None.
+        conversation_index: ConversationIndex | None
+            The index of the conversations of the account, that is used by `get_conversations` and
+            `get_conversation_changes`. Can be shared by clients with the same cookies. If None, the
+            client uses its own index. Default is None.
+        accounts: AccountManager | None
+            The accounts that new conversations are spread across, based on their health. Should be
+            shared by all clients. The account of the current conversation is stored in `account`.
+            If None, `bing_cookies` is used. Default is None.
         """
         self.bing_cookies = bing_cookies if bing_cookies else getenv("BING_COOKIES")
+        # Parsed once, since they are sent with every new session and conversation.
+        self._cookies = cookies_as_dict(self.bing_cookies) if self.bing_cookies else {}
+        self.accounts = accounts
+        self.account: Account | None = None
         self.use_proxy = use_proxy
+        self.persistent = persistent
+        self.keepalive_interval = keepalive_interval
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.codec = get_codec(json_codec)
+        self.cache = cache
+        self.on_trace = on_trace
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self.retries = 0
+        self.blob_cache = blob_cache
+        self.conversation_index = (
+            conversation_index
+            if conversation_index is not None
+            else ConversationIndex()
+        )
+        self._conversations_version = 0
         self.conversation_style: ConversationStyle = ConversationStyle[style.upper()]
         self.conversation_style_option_sets: ConversationStyleOptionSets = (
             ConversationStyleOptionSets[style.upper()]
@@ -96,6 +198,17 @@ class SydneyClient:
         self.max_messages: int | None = None
         self.wss_client: ClientConnection | None = None
         self.session: ClientSession | None = None
+        self._keepalive_task: asyncio.Task | None = None
+        self._wss_idle = False
+        self._records = RecordParser()
+        self._reservoir = (
+            ConversationReservoir(
+                self._create_reserved_conversation, reservoir_size, reservoir_max_age
+            )
+            if reservoir_size
+            else None
+        )
+        self._reservoir_session: ClientSession | None = None
 
     async def __aenter__(self) -> SydneyClient:
         await self.start_conversation()
@@ -105,25 +218,195 @@ class SydneyClient:
         await self.close_conversation()
 
     async def _get_session(self, force_close: bool = False) -> ClientSession:
-        # Use _U cookie to create a conversation.
-        cookies = cookies_as_dict(self.bing_cookies) if self.bing_cookies else {}
-
+        """
+        Get the HTTP session of the client. The session and its pool of connections are
+        shared by all HTTP requests to Copilot.
+        """
         if self.session and not self.session.closed and force_close:
             await self.session.close()
             self.session = None
 
         if not self.session:
-            self.session = ClientSession(
-                headers=CREATE_HEADERS,
-                cookies=cookies,
-                trust_env=self.use_proxy,  # Use `HTTP_PROXY` and `HTTPS_PROXY` environment variables.
-                connector=(
-                    TCPConnector(verify_ssl=False) if self.use_proxy else None
-                ),  # Resolve HTTPS issue when proxy support is enabled.
-            )
+            # Use _U cookie to create a conversation.
+            self.session = self._new_session(cookies=self._cookies)
 
         return self.session
 
+    def _new_session(
+        self, cookies: dict | None = None, cookie_jar: AbstractCookieJar | None = None
+    ) -> ClientSession:
+        return ClientSession(
+            headers=CREATE_HEADERS,
+            cookies=cookies,
+            cookie_jar=cookie_jar,
+            trust_env=self.use_proxy,  # Use `HTTP_PROXY` and `HTTPS_PROXY` environment variables.
+            connector=TCPConnector(
+                limit_per_host=self.connection_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                verify_ssl=not self.use_proxy,  # Resolve HTTPS issue when proxy support is enabled.
+            ),
+        )
+
+    async def _connect(
+        self, trace: RequestTrace | None = None
+    ) -> tuple[ClientConnection, bool]:
+        """
+        Get a websocket connection with Copilot that has completed the protocol handshake.
+
+        Parameters
+        ----------
+        trace : RequestTrace | None
+            The trace of the request that the connection is used for, if any. Default is None.
+
+        Returns
+        -------
+        tuple
+            The websocket connection and a flag that is True if an already open persistent
+            connection was reused.
+        """
+        await self._stop_keepalive()
+
+        # Only reuse a connection whose previous response was fully received, otherwise
+        # leftover messages of that response would be mixed with the new one.
+        if (
+            self.persistent
+            and self._wss_idle
+            and self.wss_client
+            and self.wss_client.state is State.OPEN
+        ):
+            self._wss_idle = False
+            return self.wss_client, True
+        self._wss_idle = False
+
+        if self.wss_client:
+            await self.wss_client.close()
+            self.wss_client = None
+
+        bing_chathub_url = constants.BING_CHATHUB_URL
+        if self.encrypted_conversation_signature:
+            bing_chathub_url += f"?sec_access_token={parse.quote(self.encrypted_conversation_signature)}"
+
+        # Create a websocket connection with Copilot for sending and receiving messages.
+        connect_start = perf_counter()
+        try:
+            wss_client = await websockets.connect(
+                bing_chathub_url, additional_headers=CHATHUB_HEADERS, max_size=None
+            )
+        except TimeoutError:
+            raise ConnectionTimeoutException(
+                "Failed to connect to Copilot, connection timed out"
+            ) from None
+        self.wss_client = wss_client
+        self._records = RecordParser()
+        handshake_start = perf_counter()
+        await self._send(wss_client, {"protocol": "json", "version": 1})
+
+        # Skip the handshake response.
+        self._records.feed(await wss_client.recv(decode=False))
+        for _ in self._records:
+            pass
+
+        if trace is not None:
+            trace.phases[Phase.CONNECT] = (connect_start, handshake_start)
+            trace.phases[Phase.HANDSHAKE] = (handshake_start, perf_counter())
+
+        return wss_client, False
+
+    async def _keepalive(self, wss_client: ClientConnection) -> None:
+        """
+        Keep an idle persistent connection alive by answering the pings of Copilot and
+        sending pings when no message was received for `keepalive_interval` seconds.
+        """
+        try:
+            while True:
+                # Unlike `asyncio.wait_for`, `asyncio.wait` never ignores the cancellation
+                # of the task when a message arrives at the same time.
+                receive = asyncio.ensure_future(wss_client.recv(decode=False))
+                try:
+                    await asyncio.wait((receive,), timeout=self.keepalive_interval)
+                finally:
+                    if not receive.done():
+                        receive.cancel()
+                        await asyncio.gather(receive, return_exceptions=True)
+                if receive.cancelled():
+                    await self._send(wss_client, {"type": 6})
+                    continue
+
+                self._records.feed(receive.result())
+                for obj in self._records:
+                    if self.codec.decode(obj).get("type") == 6:
+                        await self._send(wss_client, {"type": 6})
+        except ConnectionClosed:
+            # Connection was dropped, it will be reopened on the next prompt.
+            pass
+
+    async def _send(self, wss_client: ClientConnection, message: dict) -> None:
+        # Send as a text frame, while avoiding to decode the encoded message.
+        await wss_client.send(as_json(message, self.codec), text=True)
+
+    def _start_keepalive(self) -> None:
+        self._wss_idle = True
+        if self.wss_client and self.wss_client.state is State.OPEN:
+            self._keepalive_task = asyncio.create_task(self._keepalive(self.wss_client))
+
+    async def _stop_keepalive(self) -> None:
+        if self._keepalive_task:
+            self._keepalive_task.cancel()
+            try:
+                await self._keepalive_task
+            except asyncio.CancelledError:
+                pass
+            self._keepalive_task = None
+
+    async def _release_connection(self, invocation_id: str | None = None) -> None:
+        """
+        Release the connection of a prompt that ended early, because of an error or because
+        the caller stopped reading the answer.
+
+        Parameters
+        ----------
+        invocation_id : str | None
+            The invocation of the prompt, if Copilot may still be answering it. If given,
+            Copilot is asked to stop answering and the connection is closed right away,
+            since the rest of the answer could still arrive on it. Default is None.
+        """
+        wss_client = self.wss_client
+        if wss_client is None:
+            return
+
+        if invocation_id is None:
+            if self.persistent:
+                self._start_keepalive()
+            else:
+                await wss_client.close()
+            return
+
+        self._wss_idle = False
+        try:
+            if wss_client.state is State.OPEN:
+                await asyncio.wait_for(
+                    self._send(wss_client, {"type": 5, "invocationId": invocation_id}),
+                    timeout=CANCEL_TIMEOUT,
+                )
+            await asyncio.wait_for(wss_client.close(), timeout=CANCEL_TIMEOUT)
+        except (ConnectionClosed, OSError, TimeoutError):
+            pass
+        finally:
+            # Never leave the connection open, even if the caller is cancelled again.
+            if wss_client.state is not State.CLOSED:
+                wss_client.transport.abort()
+
+    def _request_values(self, prompt: str) -> dict:
+        return {
+            "prompt": prompt,
+            "timestamp": get_iso_timestamp(),
+            "invocation_id": str(self.invocation_id),
+            "is_start_of_session": self.invocation_id == 0,
+            "conversation_signature": self.conversation_signature,
+            "client_id": self.client_id,
+            "conversation_id": self.conversation_id,
+        }
+
     def _build_ask_arguments(
         self,
         prompt: str,
@@ -131,136 +414,84 @@ class SydneyClient:
         attachment_info: dict | None = None,
         context: str | None = None,
     ) -> dict:
-        options_sets = [option.value for option in DefaultOptions]
+        image_url = None
+        if attachment_info:
+            image_url = constants.BING_BLOB_URL + attachment_info["blobId"]
 
-        # Add conversation style option values.
-        options_sets.extend(
-            style.strip()
-            for style in self.conversation_style_option_sets.value.split(",")
+        return build_ask_arguments(
+            **self._request_values(prompt),
+            conversation_style=str(self.conversation_style.value),
+            conversation_style_option_sets=self.conversation_style_option_sets.value,
+            persona=self.persona,
+            search=search,
+            cookies=bool(self.bing_cookies),
+            image_url=image_url,
+            context=context,
         )
 
-        # Build option sets based on whether cookies are used or not.
-        if self.bing_cookies:
-            options_sets.extend(option.value for option in CookieOptions)
-
-        # Build option sets based on whether search is allowed or not.
-        if not search:
-            options_sets.extend(option.value for option in NoSearchOptions)
+    def _build_compose_arguments(
+        self,
+        prompt: str,
+        tone: ComposeTone | CustomComposeTone,
+        format: ComposeFormat,
+        length: ComposeLength,
+    ) -> dict:
+        return build_compose_arguments(
+            **self._request_values(prompt),
+            tone=tone.value,
+            format=format.value,
+            length=length.value,
+        )
 
-        # Build option sets based on whether a non default GPT persona is used or not.
-        if self.persona != GPTPersonaID.COPILOT:
-            options_sets.append(PersonaOptions[self.persona.value.upper()].value)
+    def _encode_ask_request(
+        self,
+        prompt: str,
+        search: bool,
+        attachment_info: dict | None = None,
+        context: str | None = None,
+    ) -> bytes:
+        """
+        Encode the same request as `_build_ask_arguments`, using a cached request template.
+        """
+        template = ask_template(
+            self.codec.name,
+            str(self.conversation_style.value),
+            self.conversation_style_option_sets.value,
+            self.persona,
+            search,
+            bool(self.bing_cookies),
+            bool(context),
+        )
 
-        image_url, original_image_url = None, None
+        image_url = None
         if attachment_info:
-            image_url = BING_BLOB_URL + attachment_info["blobId"]
-            original_image_url = BING_BLOB_URL + attachment_info["blobId"]
-
-        arguments: dict = {
-            "arguments": [
-                {
-                    "source": "cib",
-                    "optionsSets": options_sets,
-                    "allowedMessageTypes": [message.value for message in MessageType],
-                    "sliceIds": [],
-                    "verbosity": "verbose",
-                    "scenario": "CopilotMicrosoftCom",
-                    "plugins": [],
-                    "conversationHistoryOptionsSets": [
-                        option.value for option in ConversationHistoryOptionsSets
-                    ],
-                    "gptId": self.persona.value,
-                    "isStartOfSession": self.invocation_id == 0,
-                    "message": {
-                        "author": "user",
-                        "inputMethod": "Keyboard",
-                        "timestamp": get_iso_timestamp(),
-                        "text": prompt,
-                        "messageType": MessageType.CHAT.value,
-                        "imageUrl": image_url,
-                        "originalImageUrl": original_image_url,
-                    },
-                    "conversationSignature": self.conversation_signature,
-                    "participant": {
-                        "id": self.client_id,
-                    },
-                    "tone": str(self.conversation_style.value),
-                    "extraExtensionParameters": {
-                        "gpt-creator-persona": {"personaId": self.persona.value}
-                    },
-                    "spokenTextMode": "None",
-                    "conversationId": self.conversation_id,
-                }
-            ],
-            "invocationId": str(self.invocation_id),
-            "target": "chat",
-            "type": 4,
-        }
+            image_url = constants.BING_BLOB_URL + attachment_info["blobId"]
 
-        # Include previous message field if context is provided.
-        if context:
-            arguments["arguments"][0]["previousMessages"] = [
-                {
-                    "author": "user",
-                    "description": context,
-                    "contextType": "WebPage",
-                    "messageType": "Context",
-                }
-            ]
-
-        return arguments
+        return template.render(
+            **self._request_values(prompt), image_url=image_url, context=context
+        )
 
-    def _build_compose_arguments(
+    def _encode_compose_request(
         self,
         prompt: str,
         tone: ComposeTone | CustomComposeTone,
         format: ComposeFormat,
         length: ComposeLength,
-    ) -> dict:
-        return {
-            "arguments": [
-                {
-                    "source": "edge_coauthor_prod",
-                    "optionsSets": [option.value for option in DefaultComposeOptions],
-                    "allowedMessageTypes": [message.value for message in MessageType],
-                    "sliceIds": [],
-                    "verbosity": "verbose",
-                    "scenario": "",
-                    "plugins": [],
-                    "spokenTextMode": "None",
-                    "extraExtensionParameters": {
-                        "edge_compose_generate": {
-                            "Action": "generate",
-                            "Format": format.value,
-                            "Length": length.value,
-                            "Tone": tone.value,
-                        }
-                    },
-                    "isStartOfSession": self.invocation_id == 0,
-                    "message": {
-                        "author": "user",
-                        "inputMethod": "Keyboard",
-                        "timestamp": get_iso_timestamp(),
-                        "text": prompt,
-                        "messageType": MessageType.CHAT.value,
-                    },
-                    "conversationSignature": self.conversation_signature,
-                    "participant": {"id": self.client_id},
-                    "conversationId": self.conversation_id,
-                }
-            ],
-            "invocationId": str(self.invocation_id),
-            "target": "chat",
-            "type": 4,
-        }
+    ) -> bytes:
+        """
+        Encode the same request as `_build_compose_arguments`, using a cached request template.
+        """
+        template = compose_template(
+            self.codec.name, tone.value, format.value, length.value
+        )
+        return template.render(**self._request_values(prompt))
 
-    def _build_upload_arguments(
-        self, attachment: str, image_base64: bytes | None = None
-    ) -> FormData:
+    def _build_upload_arguments(self, attachment: str) -> FormData:
         data = FormData()
+        is_url = check_if_url(attachment)
 
         payload = {
-            "imageInfo": {} if image_base64 else {"url": attachment},
+            "imageInfo": {"url": attachment} if is_url else {},
             "knowledgeRequest": {
                 "invokedSkills": ["ImageById"],
                 "subscriptionId": "Bing.Chat.Multimodal",
@@ -271,18 +502,28 @@ class SydneyClient:
                 },
             },
         }
+        # Added as text, since aiohttp sends bytes values as files.
         data.add_field(
-            "knowledgeRequest", json.dumps(payload), content_type="application/json"
+            "knowledgeRequest",
+            self.codec.encode(payload).decode(),
+            content_type="application/json",
         )
 
-        if image_base64:
+        if not is_url:
+            # Local files are streamed as base64 while the request is sent, instead of
+            # being read and encoded in memory.
             data.add_field(
-                "imageBase64", image_base64, content_type="application/octet-stream"
+                "imageBase64",
+                Base64FilePayload(attachment),
+                content_type="application/octet-stream",
+                filename="imageBase64",
             )
 
         return data
 
-    async def _upload_attachment(self, attachment: str) -> dict:
+    async def _upload_attachment(
+        self, attachment: str, trace: RequestTrace | None = None
+    ) -> dict:
         """
         Upload an image to Copilot from a URL or file.
 
@@ -290,6 +531,8 @@ class SydneyClient:
         ----------
         attachment : str
             The URL or file path to the attachment image to be uploaded.
+        trace : RequestTrace | None
+            The trace of the request that the image is attached to, if any. Default is None.
 
         Returns
         -------
@@ -297,31 +540,35 @@ class SydneyClient:
             The response from Copilot. "blobId" and "processedBlobId" are parameters that can be passed
             to https://www.bing.com/images/blob?bcid=[ID] and can obtain the uploaded image from Copilot.
         """
-        cookies = cookies_as_dict(self.bing_cookies) if self.bing_cookies else {}
+        upload_start = perf_counter()
+        if self.blob_cache is None:
+            attachment_info = await self._post_attachment(attachment)
+        else:
+            # Hash files outside of the event loop, since they can be large.
+            key = await asyncio.to_thread(blob_key, attachment)
+            attachment_info = await self.blob_cache.get_or_upload(
+                key, lambda: self._post_attachment(attachment)
+            )
 
-        image_base64 = None
-        if not check_if_url(attachment):
-            with open(attachment, "rb") as file:
-                image_base64 = b64encode(file.read())
+        if trace is not None:
+            trace.phases[Phase.UPLOAD] = (upload_start, perf_counter())
 
-        session = ClientSession(
-            headers=KBLOB_HEADERS,
-            cookies=cookies,
-            trust_env=self.use_proxy,  # Use `HTTP_PROXY` and `HTTPS_PROXY` environment variables.
-            connector=(
-                TCPConnector(verify_ssl=False) if self.use_proxy else None
-            ),  # Resolve HTTPS issue when proxy support is enabled.
-        )
+        return attachment_info
+
+    async def _post_attachment(self, attachment: str) -> dict:
+        session = await self._get_session()
 
-        data = self._build_upload_arguments(attachment, image_base64)
+        data = self._build_upload_arguments(attachment)
 
-        async with session.post(BING_KBLOB_URL, data=data) as response:
+        async with session.post(
+            constants.BING_KBLOB_URL, data=data, headers=KBLOB_HEADERS
+        ) as response:
             if response.status != 200:
                 raise ImageUploadException(
                     f"Failed to upload image, received status: {response.status}"
                 )
 
-            response_dict = await response.json()
+            response_dict = await response.json(loads=self.codec.decode)
             if not response_dict["blobId"]:
                 raise ImageUploadException(
                     "Failed to upload image, Copilot rejected uploading it"
@@ -332,8 +579,6 @@ class SydneyClient:
                     "Failed to upload image, received empty image info from Copilot"
                 )
 
-        await session.close()
-
         return response_dict
 
     async def _ask(
@@ -345,12 +590,14 @@ class SydneyClient:
         suggestions: bool = False,
         search: bool = True,
         raw: bool = False,
+        raw_bytes: bool = False,
+        typed: bool = False,
         stream: bool = False,
         compose: bool = False,
         tone: ComposeTone | CustomComposeTone | None = None,
         format: ComposeFormat | None = None,
         length: ComposeLength | None = None,
-    ) -> AsyncGenerator[tuple[str | dict, list | None], None]:
+    ) -> AsyncGenerator[tuple[str | dict | bytes | SydneyResponse, list | None], None]:
         if (
             self.conversation_id is None
             or self.client_id is None
@@ -358,157 +605,526 @@ class SydneyClient:
         ):
             raise NoConnectionException("No connection to Copilot was found")
 
-        bing_chathub_url = BING_CHATHUB_URL
-        if self.encrypted_conversation_signature:
-            bing_chathub_url += f"?sec_access_token={parse.quote(self.encrypted_conversation_signature)}"
+        trace = RequestTrace("compose" if compose else "ask") if self.on_trace else None
+        accounts = self.accounts
+        cache = self.cache
 
-        # Create a websocket connection with Copilot for sending and receiving messages.
+        key = None
+        if (
+            cache is not None
+            and not raw
+            and not raw_bytes
+            and not typed
+            and not attachment
+        ):
+            key = self._cache_key(
+                prompt, context, citations, search, compose, tone, format, length
+            )
+            cached = await cache.get(key)
+            if cached is not None:
+                if trace is not None:
+                    trace.cached = True
+                    self._finish_trace(trace)
+                for response in cached.replay(stream):
+                    yield response
+                return
+            # Always keep the suggested responses, so that they can be returned from the cache.
+            suggestions = True
+
+        # Whether the connection must be released if the prompt fails.
+        connected = False
+        # Invocation of the prompt while Copilot may still be answering it.
+        answering: str | None = None
         try:
-            self.wss_client = await websockets.connect(
-                bing_chathub_url, additional_headers=CHATHUB_HEADERS, max_size=None
+            if self.rate_limiter is not None:
+                rate_limit_start = perf_counter()
+                rate_limited = monotonic()
+                await self.rate_limiter.acquire(self.bing_cookies or "")
+                if trace is not None:
+                    trace.phases[Phase.RATE_LIMIT] = (rate_limit_start, perf_counter())
+
+            # Upload the attachment while connecting to ChatHub, since they are independent
+            # requests to different hosts.
+            upload = (
+                asyncio.ensure_future(self._upload_attachment(attachment, trace))
+                if attachment
+                else None
             )
-        except TimeoutError:
-            raise ConnectionTimeoutException(
-                "Failed to connect to Copilot, connection timed out"
-            ) from None
-        await self.wss_client.send(as_json({"protocol": "json", "version": 1}))
-        await self.wss_client.recv()
-
-        attachment_info = None
-        if attachment:
-            attachment_info = await self._upload_attachment(attachment)
+            connected = True
+            try:
+                wss_client, reused = await self._connect(trace)
+            except BaseException:
+                if upload is not None:
+                    upload.cancel()
+                    await asyncio.gather(upload, return_exceptions=True)
+                raise
+
+            attachment_info = None
+            if upload is not None:
+                attachment_info = await upload
+
+            if compose:
+                request = self._encode_compose_request(prompt, tone, format, length)  # type: ignore
+            else:
+                request = self._encode_ask_request(
+                    prompt, search, attachment_info, context
+                )
+            answering = str(self.invocation_id)
+            self.invocation_id += 1
 
-        if compose:
-            request = self._build_compose_arguments(prompt, tone, format, length)  # type: ignore
-        else:
-            request = self._build_ask_arguments(
-                prompt, search, attachment_info, context
+            wss_client, reused = await self._send_request(
+                wss_client, request, reused, trace
             )
-        self.invocation_id += 1
-
-        await self.wss_client.send(as_json(request))
-
-        streaming = True
-        while streaming:
-            objects = str(await self.wss_client.recv()).split(DELIMETER)
-            for obj in objects:
-                if not obj:
+            sent = perf_counter()
+
+            # When streaming text, only the newly generated text of each message is returned.
+            delta = TextDelta() if stream and not raw and not raw_bytes else None
+
+            final_response: (
+                tuple[str | dict | bytes | SydneyResponse, list | None] | None
+            ) = None
+            streaming = True
+            while streaming:
+                try:
+                    message = await wss_client.recv(decode=False)
+                except ConnectionClosed:
+                    if not reused:
+                        raise
+                    # Persistent connection was dropped before Copilot answered, reconnect and retry.
+                    wss_client, _ = await self._connect(trace)
+                    wss_client, reused = await self._send_request(
+                        wss_client, request, False, trace
+                    )
+                    sent = perf_counter()
                     continue
-                response = json.loads(obj)
-                # Handle type 1 messages when streaming is enabled.
-                if stream and response.get("type") == 1:
-                    messages = response["arguments"][0].get("messages")
-                    # Skip on empty response.
-                    if not messages:
-                        continue
-
-                    # Skip "Searching the web for..." message.
-                    adaptiveCards = messages[0].get("adaptiveCards")
-                    if adaptiveCards and adaptiveCards[0]["body"][0].get("inlines"):
-                        continue
-
-                    if raw:
-                        yield response, None
-                    elif citations:
-                        # Fix index in case where the first body item has an `altText` field instead of `text`.
-                        if adaptiveCards[0]["body"][0].get("text"):
-                            yield adaptiveCards[0]["body"][0]["text"], None
-                        else:
-                            yield adaptiveCards[0]["body"][1]["text"], None
-                    else:
-                        if messages[0].get("text"):
-                            yield messages[0]["text"], None
-                # Handle type 2 messages.
-                elif response.get("type") == 2:
-                    # Check if reached conversation limit.
-                    if response["item"].get("throttling"):
-                        self.number_of_messages = response["item"]["throttling"].get(
-                            "numUserMessagesInConversation", 0
-                        )
-                        self.max_messages = response["item"]["throttling"][
-                            "maxNumUserMessagesInConversation"
-                        ]
-                        if self.number_of_messages == self.max_messages:
-                            raise ConversationLimitException(
-                                f"Reached conversation limit of {self.max_messages} messages"
-                            )
-
-                    messages = response["item"].get("messages")
-                    if not messages:
-                        result_value = response["item"]["result"]["value"]
-                        # Throttled - raise error.
-                        if result_value == ResultValue.THROTTLED.value:
-                            raise ThrottledRequestException("Request is throttled")
-                        # Captcha chalennge - user needs to solve captcha manually.
-                        elif result_value == ResultValue.CAPTCHA_CHALLENGE.value:
-                            raise CaptchaChallengeException("Solve CAPTCHA to continue")
-                        return  # Return empty message.
-
-                    # Fix index in some cases where the last message in an inline message.
-                    # Typically occurs when an attachment is provided.
-                    i = -1
-                    adaptiveCards = messages[-1].get("adaptiveCards")
-                    if adaptiveCards and adaptiveCards[-1]["body"][0].get("inlines"):
-                        i = -2  # TODO: This feel hacky
-
-                    if raw:
-                        yield response, None
-                    else:
-                        suggested_responses = None
-                        # Include list of suggested user responses, if enabled.
-                        if suggestions and messages[i].get("suggestedResponses"):
-                            suggested_responses = [
-                                item["text"]
-                                for item in messages[i]["suggestedResponses"]
-                            ]
+                reused = False  # Copilot answered, do not retry from now on.
+                if trace is not None:
+                    trace.bytes_received += len(message)
+
+                self._records.feed(message)
+                for obj in self._records:
+                    if trace is not None:
+                        trace.frames_received += 1
+                    # Pass records through undecoded, except for the final type 2 message,
+                    # which is needed to check the result and the conversation limit.
+                    if raw_bytes:
+                        record_type = peek_record_type(obj)
+                        if record_type is None:
+                            record_type = self.codec.decode(obj).get("type")
+                        if record_type != 2:
+                            if (
+                                trace is not None
+                                and record_type == 1
+                                and Phase.FIRST_FRAME not in trace.phases
+                            ):
+                                trace.phases[Phase.FIRST_FRAME] = (sent, perf_counter())
+                            if record_type == 6:
+                                await self._send(wss_client, {"type": 6})
+                            yield obj, None
+                            continue
+                    # Decode only the new text of messages that continue the streamed text.
+                    if delta is not None and not citations:
+                        new_text = delta.update_raw(obj)
+                        if new_text is not None:
+                            if new_text:
+                                yield new_text, None
+                            continue
+                    response = self.codec.decode(obj)
+                    if (
+                        trace is not None
+                        and response.get("type") == 1
+                        and Phase.FIRST_FRAME not in trace.phases
+                    ):
+                        trace.phases[Phase.FIRST_FRAME] = (sent, perf_counter())
+                    # Answer keep-alive pings.
+                    if response.get("type") == 6:
+                        await self._send(wss_client, {"type": 6})
+                    # Handle type 1 messages when streaming is enabled.
+                    if stream and response.get("type") == 1:
+                        messages = response["arguments"][0].get("messages")
+                        # Skip on empty response.
+                        if not messages:
+                            continue
+
+                        # Skip "Searching the web for..." message.
+                        adaptiveCards = messages[0].get("adaptiveCards")
+                        if adaptiveCards and adaptiveCards[0]["body"][0].get("inlines"):
+                            continue
+
+                        if raw or delta is None:
+                            yield response, None
+                            continue
 
                         if citations:
                             # Fix index in case where the first body item has an `altText` field instead of `text`.
-                            if messages[i]["adaptiveCards"][0]["body"][0].get("text"):
-                                yield (
-                                    messages[i]["adaptiveCards"][0]["body"][0]["text"],
-                                    suggested_responses,
+                            if adaptiveCards[0]["body"][0].get("text"):
+                                new_text = delta.update(
+                                    adaptiveCards[0]["body"][0]["text"]
                                 )
                             else:
-                                yield (
-                                    messages[i]["adaptiveCards"][0]["body"][1]["text"],
-                                    suggested_responses,
+                                new_text = delta.update(
+                                    adaptiveCards[0]["body"][1]["text"]
                                 )
+                        elif messages[0].get("text"):
+                            new_text = delta.update(messages[0]["text"], obj)
                         else:
-                            yield messages[i]["text"], suggested_responses
+                            continue
+
+                        if new_text:
+                            yield new_text, None
+                    # Handle type 2 messages.
+                    elif response.get("type") == 2:
+                        answering = None
+                        if trace is not None:
+                            trace.phases[Phase.FINAL_FRAME] = (sent, perf_counter())
+                        if self.rate_limiter is not None:
+                            result_value = (
+                                response["item"].get("result", {}).get("value")
+                            )
+                            if result_value in (
+                                ResultValue.THROTTLED.value,
+                                ResultValue.CAPTCHA_CHALLENGE.value,
+                            ):
+                                self.rate_limiter.on_throttled(
+                                    self.bing_cookies or "", rate_limited
+                                )
+                            else:
+                                self.rate_limiter.on_success(self.bing_cookies or "")
+                        # Check if reached conversation limit.
+                        if response["item"].get("throttling"):
+                            self.number_of_messages = response["item"][
+                                "throttling"
+                            ].get("numUserMessagesInConversation", 0)
+                            self.max_messages = response["item"]["throttling"][
+                                "maxNumUserMessagesInConversation"
+                            ]
+                            if self.number_of_messages == self.max_messages:
+                                raise ConversationLimitException(
+                                    f"Reached conversation limit of {self.max_messages} messages"
+                                )
 
-                    # Exit, type 2 is the last message.
-                    streaming = False
+                        messages = response["item"].get("messages")
+                        if not messages:
+                            result_value = response["item"]["result"]["value"]
+                            # Throttled - raise error.
+                            if result_value == ResultValue.THROTTLED.value:
+                                raise ThrottledRequestException("Request is throttled")
+                            # Captcha chalennge - user needs to solve captcha manually.
+                            elif result_value == ResultValue.CAPTCHA_CHALLENGE.value:
+                                raise CaptchaChallengeException(
+                                    "Solve CAPTCHA to continue"
+                                )
+                            # Exit with empty message, type 2 is the last message.
+                            streaming = False
+                            continue
+
+                        if raw_bytes:
+                            final_response = obj, None
+                        elif raw:
+                            final_response = response, None
+                        else:
+                            answer = SydneyResponse(response["item"])
+                            if typed:
+                                final_response = answer, None
+                            else:
+                                # Include list of suggested user responses, if enabled.
+                                suggested_responses = (
+                                    answer.suggestions or None if suggestions else None
+                                )
+                                text = (
+                                    (answer.cited_text or answer.text)
+                                    if citations
+                                    else answer.text
+                                )
 
-        await self.wss_client.close()
+                                if cache is not None and key is not None:
+                                    await cache.set(key, text, suggested_responses)
 
-    async def start_conversation(self) -> None:
-        """
-        Connect to Copilot and create a new conversation.
+                                if delta is not None:
+                                    text = delta.update(text)
+                                final_response = text, suggested_responses
+
+                        # Exit, type 2 is the last message.
+                        streaming = False
+
+            # Release the connection before the final response is returned, since callers
+            # typically stop iterating after receiving it.
+            if self.persistent:
+                self._start_keepalive()
+            else:
+                await wss_client.close()
+            connected = False
+
+            if trace is not None:
+                self._finish_trace(trace)
+
+            if accounts is not None and self.account is not None:
+                accounts.report_success(self.account)
+
+            if final_response:
+                yield final_response
+        except BaseException as exception:
+            # Also reached when the caller stops reading the answer, since closing or
+            # cancelling the generator raises GeneratorExit or CancelledError here.
+            if connected:
+                await self._release_connection(answering)
+            if trace is not None and trace.end is None:
+                self._finish_trace(trace, exception)
+            if (
+                accounts is not None
+                and self.account is not None
+                and isinstance(exception, ACCOUNT_EXCEPTIONS)
+            ):
+                accounts.report_failure(self.account, exception)
+            raise
+
+    def _request(
+        self, prompt: str, **kwargs
+    ) -> AsyncGenerator[tuple[str | dict | bytes | SydneyResponse, list | None], None]:
+        if self.retry_policy is None:
+            return self._ask(prompt, **kwargs)
+        return self._retry_ask(self.retry_policy, prompt, **kwargs)
+
+    async def _retry_ask(
+        self, policy: RetryPolicy, prompt: str, **kwargs
+    ) -> AsyncGenerator[tuple[str | dict | bytes | SydneyResponse, list | None], None]:
+        started = monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            yielded = False
+            responses = self._ask(prompt, **kwargs)
+            try:
+                async for response in responses:
+                    yielded = True
+                    yield response
+                if yielded:
+                    return
+                exception: Exception = NoResponseException("No response was returned")
+            except Exception as error:
+                # Never send the prompt again after part of the answer reached the caller,
+                # unless the caller accepts that the answer starts over.
+                if yielded and not policy.restart_streams:
+                    raise
+                exception = error
+            finally:
+                # Cancel the answer if the caller stopped reading it.
+                await responses.aclose()
+
+            delay = (
+                policy.delay(attempt, started)
+                if policy.is_retryable(exception)
+                else None
+            )
+            if delay is None:
+                if isinstance(exception, NoResponseException) and not yielded:
+                    return  # Callers handle missing answers like without retries.
+                raise exception
+
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    async def _retry(self, function: Callable[[], Awaitable[T]]) -> T:
+        policy = self.retry_policy
+        if policy is None:
+            return await function()
+
+        started = monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return await function()
+            except Exception as exception:
+                delay = (
+                    policy.delay(attempt, started)
+                    if policy.is_retryable(exception)
+                    else None
+                )
+                if delay is None:
+                    raise
+
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+    def _finish_trace(
+        self, trace: RequestTrace, exception: BaseException | None = None
+    ) -> None:
+        trace.end = perf_counter()
+        trace.number_of_messages = self.number_of_messages
+        trace.max_messages = self.max_messages
+        if exception is not None:
+            trace.exception = type(exception)
+        if self.on_trace is not None:
+            self.on_trace(trace)
+
+    def _cache_key(
+        self,
+        prompt: str,
+        context: str | None,
+        citations: bool,
+        search: bool,
+        compose: bool,
+        tone: ComposeTone | CustomComposeTone | None,
+        format: ComposeFormat | None,
+        length: ComposeLength | None,
+    ) -> str:
+        # Keyed on the option sets, since `reset_conversation` changes only them.
+        return cache_key(
+            prompt,
+            style=self.conversation_style.value,
+            option_sets=self.conversation_style_option_sets.value,
+            persona=self.persona.value,
+            search=search,
+            citations=citations,
+            context=context,
+            compose=compose,
+            tone=tone.value if tone else None,
+            format=format.value if format else None,
+            length=length.value if length else None,
+        )
+
+    async def _send_request(
+        self,
+        wss_client: ClientConnection,
+        request: bytes,
+        reused: bool,
+        trace: RequestTrace | None = None,
+    ) -> tuple[ClientConnection, bool]:
         """
-        session = await self._get_session(force_close=True)
+        Send an encoded request to Copilot. If a reused persistent connection turns out to be closed,
+        reconnect and send the request again.
 
-        async with session.get(BING_CREATE_CONVERSATION_URL) as response:
+        Returns
+        -------
+        tuple
+            The websocket connection that the request was sent with and a flag that is True
+            if that connection was reused.
+        """
+        try:
+            await wss_client.send(request, text=True)
+        except ConnectionClosed:
+            if not reused:
+                raise
+            # Persistent connection was dropped while idle, reconnect and retry.
+            wss_client, _ = await self._connect(trace)
+            await wss_client.send(request, text=True)
+            reused = False
+
+        if trace is not None:
+            trace.bytes_sent += len(request)
+
+        return wss_client, reused
+
+    async def _create_conversation(
+        self, session: ClientSession, cookies: dict | None = None
+    ) -> Conversation:
+        async with session.get(
+            constants.BING_CREATE_CONVERSATION_URL, cookies=cookies
+        ) as response:
+            if response.status in (401, 403):
+                raise AuthenticationException(
+                    f"Failed to create conversation, received status: {response.status}"
+                )
             if response.status != 200:
                 raise CreateConversationException(
                     f"Failed to create conversation, received status: {response.status}"
                 )
 
-            response_dict = await response.json()
+            response_dict = await response.json(loads=self.codec.decode)
             if response_dict["result"]["value"] != "Success":
-                raise CreateConversationException(
+                raise AuthenticationException(
                     f"Failed to authenticate, received message: {response_dict['result']['message']}"
                 )
 
-            self.conversation_id = response_dict["conversationId"]
-            self.client_id = response_dict["clientId"]
-            self.conversation_signature = response.headers[
-                "X-Sydney-Conversationsignature"
-            ]
-            self.encrypted_conversation_signature = response.headers[
-                "X-Sydney-Encryptedconversationsignature"
-            ]
-            self.invocation_id = 0
+            return Conversation(
+                response_dict["conversationId"],
+                response_dict["clientId"],
+                response.headers["X-Sydney-Conversationsignature"],
+                response.headers["X-Sydney-Encryptedconversationsignature"],
+            )
+
+    async def _create_reserved_conversation(self) -> Conversation:
+        # Conversations of the reservoir are created with a separate session that sends the
+        # cookies with every request and ignores the cookies set by Copilot, so that each one
+        # is created like the ones of `start_conversation`, which uses a new session.
+        if not self._reservoir_session or self._reservoir_session.closed:
+            self._reservoir_session = self._new_session(cookie_jar=DummyCookieJar())
+
+        if self.accounts is None:
+            return await self._create_conversation(
+                self._reservoir_session, self._cookies
+            )
+
+        account = await self.accounts.acquire()
+        try:
+            conversation = await self._create_conversation(
+                self._reservoir_session, account.cookie_dict
+            )
+        except CreateConversationException as exception:
+            self.accounts.report_failure(account, exception)
+            raise
+        conversation.account = account
+        return conversation
+
+    async def _create_account_conversation(
+        self, accounts: AccountManager
+    ) -> Conversation:
+        # Choose the account for every attempt, so that retries use a healthy account.
+        account = await accounts.acquire()
+        self._use_account(account)
+        session = await self._get_session(force_close=True)
+        try:
+            return await self._create_conversation(session)
+        except CreateConversationException as exception:
+            accounts.report_failure(account, exception)
+            raise
+
+    def _use_account(self, account: Account) -> None:
+        self.account = account
+        self.bing_cookies = account.cookies
+        self._cookies = account.cookie_dict
+
+    async def start_conversation(self) -> None:
+        """
+        Connect to Copilot and create a new conversation.
+        """
+        trace = RequestTrace("start_conversation") if self.on_trace else None
+        try:
+            if self._reservoir:
+                conversation = await self._retry(self._reservoir.take)
+                if conversation.account is not None:
+                    self._use_account(conversation.account)
+                # Only close the session, a new one is created when it is needed.
+                if self.session and not self.session.closed:
+                    await self.session.close()
+                self.session = None
+            elif self.accounts is not None:
+                accounts = self.accounts
+                conversation = await self._retry(
+                    lambda: self._create_account_conversation(accounts)
+                )
+            else:
+                session = await self._get_session(force_close=True)
+                conversation = await self._retry(
+                    lambda: self._create_conversation(session)
+                )
+        except BaseException as exception:
+            if trace is not None:
+                self._finish_trace(trace, exception)
+            raise
+
+        self.conversation_id = conversation.conversation_id
+        self.client_id = conversation.client_id
+        self.conversation_signature = conversation.conversation_signature
+        self.encrypted_conversation_signature = (
+            conversation.encrypted_conversation_signature
+        )
+        self.invocation_id = 0
+
+        if trace is not None:
+            trace.phases[Phase.START_CONVERSATION] = (trace.start, perf_counter())
+            self._finish_trace(trace)
 
     async def ask(
         self,
@@ -519,7 +1135,8 @@ class SydneyClient:
         suggestions: bool = False,
         search: bool = True,
         raw: bool = False,
-    ) -> str | dict | tuple[str | dict, list | None]:
+        typed: bool = False,
+    ) -> str | dict | SydneyResponse | tuple[str | dict, list | None]:
         """
         Send a prompt to Copilot using the current conversation and return the answer.
 
@@ -539,15 +1156,19 @@ class SydneyClient:
             Whether to allow searching the web. Default is True.
         raw : bool, optional
             Whether to return the entire response object in raw JSON format. Default is False.
+        typed : bool, optional
+            Whether to return a `SydneyResponse` with the text, cited text, suggested responses,
+            sources and search queries of the answer. Default is False.
 
         Returns
         -------
-        str | dict | tuple
+        str | dict | SydneyResponse | tuple
             The text response from Copilot. If citations is True, the function returns the cited text.
             If raw is True, the function returns the entire response object in raw JSON format.
+            If typed is True, the function returns a `SydneyResponse`.
             If suggestions is True, the function returns a list with the suggested responses.
         """
-        async for response, suggested_responses in self._ask(
+        async for response, suggested_responses in self._request(
             prompt,
             attachment=attachment,
             context=context,
@@ -555,13 +1176,15 @@ class SydneyClient:
             suggestions=suggestions,
             search=search,
             raw=raw,
+            typed=typed,
             stream=False,
             compose=False,
         ):
-            if suggestions:
-                return response, suggested_responses
+            # Answers are only bytes with `raw_bytes`, which is never set here.
+            if suggestions and not typed:
+                return cast("str | dict", response), suggested_responses
             else:
-                return response
+                return cast("str | dict | SydneyResponse", response)
 
         raise NoResponseException("No response was returned")
 
@@ -573,7 +1196,9 @@ class SydneyClient:
         citations: bool = False,
         suggestions: bool = False,
         raw: bool = False,
-    ) -> AsyncGenerator[str | dict | tuple[str | dict, list | None], None]:
+        raw_bytes: bool = False,
+        buffer_size: int = 0,
+    ) -> AsyncGenerator[str | dict | bytes | tuple[str | dict, list | None], None]:
         """
         Send a prompt to Copilot using the current conversation and stream the answer.
 
@@ -594,17 +1219,26 @@ class SydneyClient:
             Whether to return any suggested user responses. Default is False.
         raw : bool, optional
             Whether to return the entire response object in raw JSON format. Default is False.
+        raw_bytes : bool, optional
+            Whether to return every message from Copilot as the original, undecoded JSON bytes,
+            for example to forward them to another service. Only the final message is decoded,
+            to detect the end of the answer and failed requests. Default is False.
+        buffer_size : int, optional
+            If not 0, the answer is read from Copilot by a background task into a buffer of up to
+            this many items, so that the connection is released as soon as Copilot finishes, even
+            if the caller is slower. When the buffer is full, new text is merged into the pending
+            text, and new raw messages replace the pending ones. Default is 0.
 
         Returns
         -------
         str | dict | tuple
             The text response from Copilot. If citations is True, the function returns the cited text.
             If raw is True, the function returns the entire response object in raw JSON format.
+            If raw_bytes is True, the function returns every message as undecoded JSON bytes.
             If suggestions is True, the function returns a list with the suggested responses. Only the final
             yielded result contains the suggested responses.
         """
-        previous_response: str | dict = ""
-        async for response, suggested_responses in self._ask(
+        responses = self._request(
             prompt,
             attachment=attachment,
             context=context,
@@ -612,19 +1246,23 @@ class SydneyClient:
             suggestions=suggestions,
             search=True,
             raw=raw,
+            raw_bytes=raw_bytes,
             stream=True,
             compose=False,
-        ):
-            if raw:
-                yield response
-            # For text-only responses, return only newly streamed tokens.
-            else:
-                new_response = response[len(previous_response) :]
-                previous_response = response
-                if suggestions:
-                    yield new_response, suggested_responses
+        )
+        if buffer_size:
+            responses = buffered(responses, buffer_size)
+
+        try:
+            async for response, suggested_responses in responses:
+                # Answers are never a `SydneyResponse`, since `typed` is not set here.
+                if suggestions and not raw and not raw_bytes:
+                    yield cast(str, response), suggested_responses
                 else:
-                    yield new_response
+                    yield cast("str | dict | bytes", response)
+        finally:
+            # Cancel the answer if the caller stopped reading it.
+            await responses.aclose()
 
     async def compose(
         self,
@@ -634,7 +1272,8 @@ class SydneyClient:
         length: str = "short",
         suggestions: bool = False,
         raw: bool = False,
-    ) -> str | dict | tuple[str | dict, list | None]:
+        typed: bool = False,
+    ) -> str | dict | SydneyResponse | tuple[str | dict, list | None]:
         """
         Send a prompt to Copilot and compose text based on the given prompt, tone,
         format, and length.
@@ -656,19 +1295,22 @@ class SydneyClient:
             Whether to return any suggested user responses. Default is False.
         raw : bool, optional
             Whether to return the entire response object in raw JSON format. Default is False.
+        typed : bool, optional
+            Whether to return a `SydneyResponse` with the text and suggested responses of the
+            answer. Default is False.
 
         Returns
         -------
-        str or dict
+        str or dict or SydneyResponse
             The response from Copilot. If raw is True, the function returns the entire response
-            object in raw JSON format.
+            object in raw JSON format. If typed is True, the function returns a `SydneyResponse`.
         """
         # Get the enum values corresponding to the given tone, format, and length.
         compose_tone = getattr(ComposeTone, tone.upper(), CustomComposeTone(tone))
         compose_format = ComposeFormat[format.upper()]
         compose_length = ComposeLength[length.upper()]
 
-        async for response, suggested_responses in self._ask(
+        async for response, suggested_responses in self._request(
             prompt,
             attachment=None,
             context=None,
@@ -676,16 +1318,18 @@ class SydneyClient:
             suggestions=suggestions,
             search=True,
             raw=raw,
+            typed=typed,
             stream=False,
             compose=True,
             tone=compose_tone,
             format=compose_format,
             length=compose_length,
         ):
-            if suggestions:
-                return response, suggested_responses
+            # Answers are only bytes with `raw_bytes`, which is never set here.
+            if suggestions and not typed:
+                return cast("str | dict", response), suggested_responses
             else:
-                return response
+                return cast("str | dict | SydneyResponse", response)
 
         raise NoResponseException("No response was returned")
 
@@ -697,7 +1341,9 @@ class SydneyClient:
         length: str = "short",
         suggestions: bool = False,
         raw: bool = False,
-    ) -> AsyncGenerator[str | dict | tuple[str | dict, list | None], None]:
+        raw_bytes: bool = False,
+        buffer_size: int = 0,
+    ) -> AsyncGenerator[str | dict | bytes | tuple[str | dict, list | None], None]:
         """
         Send a prompt to Copilot, compose and stream text based on the given prompt, tone,
         format, and length.
@@ -722,20 +1368,29 @@ class SydneyClient:
             Whether to return any suggested user responses. Default is False.
         raw : bool, optional
             Whether to return the entire response object in raw JSON format. Default is False.
+        raw_bytes : bool, optional
+            Whether to return every message from Copilot as the original, undecoded JSON bytes,
+            for example to forward them to another service. Only the final message is decoded,
+            to detect the end of the answer and failed requests. Default is False.
+        buffer_size : int, optional
+            If not 0, the answer is read from Copilot by a background task into a buffer of up to
+            this many items, so that the connection is released as soon as Copilot finishes, even
+            if the caller is slower. When the buffer is full, new text is merged into the pending
+            text, and new raw messages replace the pending ones. Default is 0.
 
         Returns
         -------
         str or dict
             The response from Copilot. If raw is True, the function returns the entire response
-            object in raw JSON format.
+            object in raw JSON format. If raw_bytes is True, the function returns every message
+            as undecoded JSON bytes.
         """
         # Get the enum values corresponding to the given tone, format, and length.
         compose_tone = getattr(ComposeTone, tone.upper(), CustomComposeTone(tone))
         compose_format = ComposeFormat[format.upper()]
         compose_length = ComposeLength[length.upper()]
 
-        previous_response: str | dict = ""
-        async for response, suggested_responses in self._ask(
+        responses = self._request(
             prompt,
             attachment=None,
             context=None,
@@ -743,22 +1398,26 @@ class SydneyClient:
             suggestions=suggestions,
             search=True,
             raw=raw,
+            raw_bytes=raw_bytes,
             stream=True,
             compose=True,
             tone=compose_tone,
             format=compose_format,
             length=compose_length,
-        ):
-            if raw:
-                yield response
-            # For text-only responses, return only newly streamed tokens.
-            else:
-                new_response = response[len(previous_response) :]
-                previous_response = response
-                if suggestions:
-                    yield new_response, suggested_responses
+        )
+        if buffer_size:
+            responses = buffered(responses, buffer_size)
+
+        try:
+            async for response, suggested_responses in responses:
+                # Answers are never a `SydneyResponse`, since `typed` is not set here.
+                if suggestions and not raw and not raw_bytes:
+                    yield cast(str, response), suggested_responses
                 else:
-                    yield new_response
+                    yield cast("str | dict | bytes", response)
+        finally:
+            # Cancel the answer if the caller stopped reading it.
+            await responses.aclose()
 
     async def reset_conversation(self, style: str | None = None) -> None:
         """
@@ -775,7 +1434,7 @@ class SydneyClient:
             If None, the new conversation will use the same conversation style as the
             current conversation. Default is None.
         """
-        await self.close_conversation()
+        await self._close_conversation()
         if style:
             self.conversation_style_option_sets = ConversationStyleOptionSets[
                 style.upper()
@@ -786,6 +1445,18 @@ class SydneyClient:
         """
         Close all connections to Copilot. Clear conversation information.
         """
+        if self._reservoir:
+            await self._reservoir.close()
+
+        if self._reservoir_session and not self._reservoir_session.closed:
+            await self._reservoir_session.close()
+            self._reservoir_session = None
+
+        await self._close_conversation()
+
+    async def _close_conversation(self) -> None:
+        await self._stop_keepalive()
+
         if self.wss_client:
             await self.wss_client.close()
             self.wss_client = None
@@ -814,14 +1485,52 @@ class SydneyClient:
             those, `result` contains some metadata about the returned response and
             `clientId` is the ID that the current Sydney client is using.
         """
+        response = await self.conversation_index.refresh(self._fetch_conversations)
+        # Copied, since the index compares the next response with this one.
+        return deepcopy(response)
+
+    async def get_conversation_changes(
+        self, since: int | None = None
+    ) -> ConversationChanges:
+        """
+        Get the conversations that were created, changed or deleted since the previous call.
+
+        Parameters
+        ----------
+        since : int | None
+            The `version` of the changes that were last received, or 0 to get all
+            conversations. If None, the version of the previous call of this client is
+            used. Default is None.
+
+        Returns
+        -------
+        ConversationChanges
+            The new and changed conversations in `chats`, the IDs of the deleted
+            conversations in `removed`, and the `version` of the index.
+        """
+        await self.conversation_index.refresh(self._fetch_conversations)
+
+        changes = self.conversation_index.changes(
+            self._conversations_version if since is None else since
+        )
+        self._conversations_version = changes.version
+        return changes
+
+    async def _fetch_conversations(
+        self, headers: dict
+    ) -> tuple[Mapping[str, str], dict | None]:
         session = await self._get_session()
 
-        async with session.get(BING_GET_CONVERSATIONS_URL) as response:
+        async with session.get(
+            constants.BING_GET_CONVERSATIONS_URL, headers=headers
+        ) as response:
+            if response.status == 304:
+                return response.headers, None
             if response.status != 200:
                 raise GetConversationsException(
                     f"Failed to get conversations, received status: {response.status}"
                 )
 
-            response_dict = await response.json()
+            response_dict = await response.json(loads=self.codec.decode)
 
-        return response_dict
+        return response.headers, response_dict
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from time import monotonic
+from typing import Any, AsyncGenerator, Coroutine, Generic, Iterator, TypeVar
+
+from sydney.pool import SydneyPool
+
+T = TypeVar("T")
+
+
+class _Stream(Generic[T]):
+    """
+    Async generator whose items are read one at a time by calls from other threads.
+    """
+
+    __slots__ = ("generator", "_step")
+
+    def __init__(self, generator: AsyncGenerator[T, None]) -> None:
+        self.generator = generator
+        self._step: asyncio.Task | None = None
+
+    async def next(self, timeout: float | None, total: float | None) -> T:
+        self._step = asyncio.current_task()
+        try:
+            return await asyncio.wait_for(self.generator.__anext__(), timeout)
+        except asyncio.TimeoutError:
+            # The generator stopped running when `wait_for` returned, so it can be closed.
+            await self.generator.aclose()
+            raise TimeoutError(
+                f"Call did not complete within {total} seconds"
+            ) from None
+        finally:
+            self._step = None
+
+    async def close(self) -> None:
+        # A step that was cancelled from another thread may still be running, and a
+        # running generator cannot be closed.
+        if self._step is not None:
+            await asyncio.gather(self._step, return_exceptions=True)
+        await self.generator.aclose()
+
+
+class SyncSydneyClient:
+    """
+    Synchronous client for Copilot that can be shared by any number of threads.
+
+    Prompts are sent by a `SydneyPool` that runs on a single long-lived event loop in a
+    background thread, so that all threads share its connections and open conversations,
+    instead of creating new ones with `asyncio.run` for every prompt.
+    """
+
+    def __init__(
+        self, size: int = 4, timeout: float | None = None, **pool_options: Any
+    ) -> None:
+        """
+        Parameters
+        ----------
+        size : int
+            The maximum number of conversations that are open at the same time, which is
+            also the number of prompts that are sent at the same time. Default is 4.
+        timeout : float | None
+            The default number of seconds after which a call is cancelled and raises
+            `TimeoutError`. If None, calls wait until they complete. Default is None.
+        pool_options
+            Additional keyword arguments that are passed to the `SydneyPool`, such as
+            `style` and `bing_cookies`, and through it to every `SydneyClient`.
+        """
+        self.timeout = timeout
+        self._closed = False
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="sydney-event-loop", daemon=True
+        )
+        self._thread.start()
+        # Create the pool on its loop, since its queues must belong to that loop.
+        self.pool: SydneyPool = self._call(self._create_pool(size, pool_options), None)
+
+    def __enter__(self) -> SyncSydneyClient:
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the client was closed.
+        """
+        return self._closed
+
+    def start(self, timeout: float | None = None) -> None:
+        """
+        Open all conversations of the pool, so that the first prompts do not wait for
+        them. Otherwise, conversations are opened when they are first needed.
+        """
+        self._call(self.pool.start(), timeout)
+
+    def close(self, timeout: float | None = None) -> None:
+        """
+        Close all conversations and stop the event loop. Calls that are still running
+        in other threads are cancelled. Does nothing if the client is already closed.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            future.result(timeout)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+    def ask(self, prompt: str, timeout: float | None = None, **kwargs: Any) -> Any:
+        """
+        Send a prompt to Copilot and wait for the answer. Accepts the same parameters as
+        `SydneyClient.ask`.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt that needs to be sent to Copilot.
+        timeout : float | None
+            The number of seconds after which the prompt is cancelled and `TimeoutError` is
+            raised. If None, the `timeout` of the client is used. Default is None.
+        """
+        return self._call(self.pool.ask(prompt, **kwargs), timeout)
+
+    def compose(self, prompt: str, timeout: float | None = None, **kwargs: Any) -> Any:
+        """
+        Compose text based on the given prompt and wait for it. Accepts the same parameters
+        as `SydneyClient.compose`.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt that needs to be sent to Copilot.
+        timeout : float | None
+            The number of seconds after which the prompt is cancelled and `TimeoutError` is
+            raised. If None, the `timeout` of the client is used. Default is None.
+        """
+        return self._call(self.pool.compose(prompt, **kwargs), timeout)
+
+    def ask_stream(
+        self, prompt: str, timeout: float | None = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Send a prompt to Copilot and iterate over the answer as it is streamed. Accepts the
+        same parameters as `SydneyClient.ask_stream`.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt that needs to be sent to Copilot.
+        timeout : float | None
+            The number of seconds after which the whole answer must have been received,
+            otherwise the prompt is cancelled and `TimeoutError` is raised. If None, the
+            `timeout` of the client is used. Default is None.
+        """
+        return self._iterate(self.pool.ask_stream(prompt, **kwargs), timeout)
+
+    def compose_stream(
+        self, prompt: str, timeout: float | None = None, **kwargs: Any
+    ) -> Iterator[Any]:
+        """
+        Compose text based on the given prompt and iterate over it as it is streamed.
+        Accepts the same parameters as `SydneyClient.compose_stream`.
+
+        Parameters
+        ----------
+        prompt : str
+            The prompt that needs to be sent to Copilot.
+        timeout : float | None
+            The number of seconds after which the whole text must have been received,
+            otherwise the prompt is cancelled and `TimeoutError` is raised. If None, the
+            `timeout` of the client is used. Default is None.
+        """
+        return self._iterate(self.pool.compose_stream(prompt, **kwargs), timeout)
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _create_pool(self, size: int, pool_options: dict) -> SydneyPool:
+        return SydneyPool(size, **pool_options)
+
+    async def _shutdown(self) -> None:
+        await self.pool.close()
+
+        # Cancel the calls of other threads that are still running.
+        tasks = [
+            task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._loop.shutdown_asyncgens()
+
+    def _submit(self, coroutine: Coroutine[Any, Any, T]) -> Future[T]:
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError(
+                "Cannot wait for a call from the thread of its event loop"
+            )
+
+        # Checked under the lock, so that no call is submitted after the loop stopped.
+        with self._lock:
+            if self._closed:
+                coroutine.close()
+                raise RuntimeError("Client is closed")
+            return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _wait(self, future: Future[T], timeout: float | None) -> T:
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError as error:
+            if future.done() and future.exception() is error:
+                raise  # Raised by the call itself.
+            future.cancel()
+            raise TimeoutError(
+                f"Call did not complete within {timeout} seconds"
+            ) from None
+        except BaseException:
+            # Interrupted, for example by KeyboardInterrupt, cancel the call.
+            future.cancel()
+            raise
+
+    def _call(self, coroutine: Coroutine[Any, Any, T], timeout: float | None) -> T:
+        if timeout is None:
+            timeout = self.timeout
+        return self._wait(self._submit(coroutine), timeout)
+
+    def _iterate(
+        self, generator: AsyncGenerator[T, None], timeout: float | None
+    ) -> Iterator[T]:
+        if timeout is None:
+            timeout = self.timeout
+        deadline = monotonic() + timeout if timeout is not None else None
+        stream = _Stream(generator)
+
+        try:
+            while True:
+                remaining = (
+                    max(0.0, deadline - monotonic()) if deadline is not None else None
+                )
+                # Timed out on the loop, which closes the stream before raising.
+                try:
+                    item = self._wait(
+                        self._submit(stream.next(remaining, timeout)), None
+                    )
+                except StopAsyncIteration:
+                    return
+                yield item
+        finally:
+            # Release the conversation if the caller stopped iterating early or failed.
+            if not self._closed:
+                self._wait(self._submit(stream.close()), None)
@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any
+
+from sydney.codec import JSONCodec, get_codec
+from sydney.constants import DELIMETER_BYTES
+from sydney.enums import (
+    ConversationHistoryOptionsSets,
+    CookieOptions,
+    DefaultComposeOptions,
+    DefaultOptions,
+    GPTPersonaID,
+    MessageType,
+    NoSearchOptions,
+    PersonaOptions,
+)
+
+SLOT_PATTERN = re.compile(rb'"__SYDNEY_SLOT_(\w+)__"')
+
+
+def slot(name: str) -> str:
+    """
+    Placeholder for a field of a request template that is filled in on every request.
+    """
+    return f"__SYDNEY_SLOT_{name}__"
+
+
+def build_ask_arguments(
+    *,
+    prompt: Any,
+    timestamp: Any,
+    invocation_id: Any,
+    is_start_of_session: Any,
+    conversation_signature: Any,
+    client_id: Any,
+    conversation_id: Any,
+    conversation_style: str,
+    conversation_style_option_sets: str,
+    persona: GPTPersonaID,
+    search: bool,
+    cookies: bool,
+    image_url: Any = None,
+    context: Any = None,
+) -> dict:
+    options_sets = [option.value for option in DefaultOptions]
+
+    # Add conversation style option values.
+    options_sets.extend(
+        style.strip() for style in conversation_style_option_sets.split(",")
+    )
+
+    # Build option sets based on whether cookies are used or not.
+    if cookies:
+        options_sets.extend(option.value for option in CookieOptions)
+
+    # Build option sets based on whether search is allowed or not.
+    if not search:
+        options_sets.extend(option.value for option in NoSearchOptions)
+
+    # Build option sets based on whether a non default GPT persona is used or not.
+    if persona != GPTPersonaID.COPILOT:
+        options_sets.append(PersonaOptions[persona.value.upper()].value)
+
+    arguments: dict = {
+        "arguments": [
+            {
+                "source": "cib",
+                "optionsSets": options_sets,
+                "allowedMessageTypes": [message.value for message in MessageType],
+                "sliceIds": [],
+                "verbosity": "verbose",
+                "scenario": "CopilotMicrosoftCom",
+                "plugins": [],
+                "conversationHistoryOptionsSets": [
+                    option.value for option in ConversationHistoryOptionsSets
+                ],
+                "gptId": persona.value,
+                "isStartOfSession": is_start_of_session,
+                "message": {
+                    "author": "user",
+                    "inputMethod": "Keyboard",
+                    "timestamp": timestamp,
+                    "text": prompt,
+                    "messageType": MessageType.CHAT.value,
+                    "imageUrl": image_url,
+                    "originalImageUrl": image_url,
+                },
+                "conversationSignature": conversation_signature,
+                "participant": {
+                    "id": client_id,
+                },
+                "tone": conversation_style,
+                "extraExtensionParameters": {
+                    "gpt-creator-persona": {"personaId": persona.value}
+                },
+                "spokenTextMode": "None",
+                "conversationId": conversation_id,
+            }
+        ],
+        "invocationId": invocation_id,
+        "target": "chat",
+        "type": 4,
+    }
+
+    # Include previous message field if context is provided.
+    if context:
+        arguments["arguments"][0]["previousMessages"] = [
+            {
+                "author": "user",
+                "description": context,
+                "contextType": "WebPage",
+                "messageType": "Context",
+            }
+        ]
+
+    return arguments
+
+
+def build_compose_arguments(
+    *,
+    prompt: Any,
+    timestamp: Any,
+    invocation_id: Any,
+    is_start_of_session: Any,
+    conversation_signature: Any,
+    client_id: Any,
+    conversation_id: Any,
+    tone: str,
+    format: str,
+    length: str,
+) -> dict:
+    return {
+        "arguments": [
+            {
+                "source": "edge_coauthor_prod",
+                "optionsSets": [option.value for option in DefaultComposeOptions],
+                "allowedMessageTypes": [message.value for message in MessageType],
+                "sliceIds": [],
+                "verbosity": "verbose",
+                "scenario": "",
+                "plugins": [],
+                "spokenTextMode": "None",
+                "extraExtensionParameters": {
+                    "edge_compose_generate": {
+                        "Action": "generate",
+                        "Format": format,
+                        "Length": length,
+                        "Tone": tone,
+                    }
+                },
+                "isStartOfSession": is_start_of_session,
+                "message": {
+                    "author": "user",
+                    "inputMethod": "Keyboard",
+                    "timestamp": timestamp,
+                    "text": prompt,
+                    "messageType": MessageType.CHAT.value,
+                },
+                "conversationSignature": conversation_signature,
+                "participant": {"id": client_id},
+                "conversationId": conversation_id,
+            }
+        ],
+        "invocationId": invocation_id,
+        "target": "chat",
+        "type": 4,
+    }
+
+
+# Fields of a request that change on every request.
+REQUEST_SLOTS = {
+    "prompt": slot("prompt"),
+    "timestamp": slot("timestamp"),
+    "invocation_id": slot("invocation_id"),
+    "is_start_of_session": slot("is_start_of_session"),
+    "conversation_signature": slot("conversation_signature"),
+    "client_id": slot("client_id"),
+    "conversation_id": slot("conversation_id"),
+}
+
+
+class RequestTemplate:
+    """
+    Request to Copilot that is encoded once, with slots for the fields that change on
+    every request. Rendering the template only encodes the values of the slots.
+    """
+
+    __slots__ = ("codec", "_head", "_slots")
+
+    def __init__(self, arguments: dict, codec: JSONCodec) -> None:
+        split = SLOT_PATTERN.split(codec.encode(arguments) + DELIMETER_BYTES)
+
+        self.codec = codec
+        self._head: bytes = split[0]
+        # Name of each slot, followed by the encoded part of the request after it.
+        self._slots: list[tuple[str, bytes]] = [
+            (name.decode(), part) for name, part in zip(split[1::2], split[2::2])
+        ]
+
+    def render(self, **values: Any) -> bytes:
+        """
+        Encode a request, including the delimeter character at the end.
+
+        Parameters
+        ----------
+        values
+            The values of all slots of the template.
+
+        Returns
+        -------
+        bytes
+            The encoded request.
+        """
+        encode = self.codec.encode
+
+        chunks = [self._head]
+        for name, part in self._slots:
+            chunks += (encode(values[name]), part)
+
+        return b"".join(chunks)
+
+
+@lru_cache(maxsize=256)
+def ask_template(
+    codec: str,
+    conversation_style: str,
+    conversation_style_option_sets: str,
+    persona: GPTPersonaID,
+    search: bool,
+    cookies: bool,
+    context: bool,
+) -> RequestTemplate:
+    """
+    Get the request template for asking Copilot with the given options.
+    """
+    arguments = build_ask_arguments(
+        **REQUEST_SLOTS,
+        conversation_style=conversation_style,
+        conversation_style_option_sets=conversation_style_option_sets,
+        persona=persona,
+        search=search,
+        cookies=cookies,
+        image_url=slot("image_url"),
+        context=slot("context") if context else None,
+    )
+    return RequestTemplate(arguments, get_codec(codec))
+
+
+@lru_cache(maxsize=256)
+def compose_template(
+    codec: str, tone: str, format: str, length: str
+) -> RequestTemplate:
+    """
+    Get the request template for composing with Copilot with the given options.
+    """
+    arguments = build_compose_arguments(
+        **REQUEST_SLOTS, tone=tone, format=format, length=length
+    )
+    return RequestTemplate(arguments, get_codec(codec))
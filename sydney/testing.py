@@ -0,0 +1,379 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+from uuid import uuid4
+
+from aiohttp import WSMsgType, web
+
+from sydney import constants
+from sydney.constants import DELIMETER
+from sydney.enums import ResultValue
+from sydney.ratelimit import TokenBucket
+
+# Split text after whitespace, so that each token is a word followed by its whitespace.
+TOKEN_PATTERN = re.compile(r"(?<=\s)(?=\S)")
+
+DEFAULT_ANSWER = (
+    "Hello, this is Copilot! I am a fake server that answers every prompt with the "
+    "same text, so that Sydney.py can be tested and benchmarked without network access."
+)
+
+
+class FakeCopilot:
+    """
+    Local server that imitates the endpoints of Copilot that are used by Sydney.py:
+    creating and listing conversations, uploading images and the ChatHub websocket.
+
+    Answers are streamed word by word, with configurable latency, token cadence, frame
+    sizes and results, so that the client can be tested and benchmarked offline.
+    """
+
+    def __init__(
+        self,
+        answer: str | Callable[[str], str] = DEFAULT_ANSWER,
+        latency: float = 0.0,
+        first_token_delay: float = 0.0,
+        token_delay: float = 0.0,
+        tokens_per_frame: int = 1,
+        frame_padding: int = 0,
+        result: str = ResultValue.SUCCESS.value,
+        throttle_rate: float | None = None,
+        max_messages: int = 30,
+        create_errors: int = 0,
+        create_error_status: int = 503,
+        dropped_streams: int = 0,
+        suggested_responses: list[str] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        answer : str | Callable[[str], str]
+            The answer to every prompt, or a function that returns the answer to a prompt.
+            Default is `DEFAULT_ANSWER`.
+        latency : float
+            The number of seconds that every HTTP request and websocket handshake is delayed,
+            to simulate the round trip to Copilot. Default is 0.0.
+        first_token_delay : float
+            The number of seconds between receiving a prompt and sending the first token.
+            Default is 0.0.
+        token_delay : float
+            The number of seconds between consecutive frames of an answer. Default is 0.0.
+        tokens_per_frame : int
+            The number of words of the answer that are added by each frame. Default is 1.
+        frame_padding : int
+            The number of bytes of extra metadata that are added to every frame, to simulate
+            the size of the frames of Copilot. Default is 0.
+        result : str
+            The result of every prompt. Must be one of the options listed in the
+            `ResultValue` enum. Default is "Success".
+        throttle_rate : float | None
+            The number of prompts per second above which prompts are throttled, with bursts
+            of up to one second of prompts. If None, prompts are never throttled. Default is None.
+        max_messages : int
+            The maximum number of messages per conversation. Default is 30.
+        create_errors : int
+            The number of the next requests to create a conversation that fail with status
+            `create_error_status`. Default is 0.
+        create_error_status : int
+            The HTTP status of the failed requests to create a conversation. Default is 503.
+        dropped_streams : int
+            The number of the next prompts whose websocket connection is closed after the
+            first frame of the answer. Default is 0.
+        suggested_responses : list[str] | None
+            The suggested user responses that are included with every answer. Default is None.
+        host : str
+            The host that the server listens on. Default is "127.0.0.1".
+        port : int
+            The port that the server listens on. If 0, a free port is used. Default is 0.
+        """
+        self.answer = answer
+        self.latency = latency
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tokens_per_frame = tokens_per_frame
+        self.frame_padding = frame_padding
+        self.result = result
+        self.throttle_rate = throttle_rate
+        self._bucket = (
+            TokenBucket(throttle_rate, max(1, throttle_rate)) if throttle_rate else None
+        )
+        self.max_messages = max_messages
+        self.create_errors = create_errors
+        self.create_error_status = create_error_status
+        self.dropped_streams = dropped_streams
+        self.suggested_responses = (
+            suggested_responses
+            if suggested_responses is not None
+            else ["Tell me a joke", "What can you do?"]
+        )
+        self.host = host
+        self.port = port
+        # Statistics of the requests that were received.
+        self.connections = 0
+        self.open_connections = 0
+        self.prompts = 0
+        self.cancelled = 0
+        self.throttled = 0
+        self.uploads = 0
+        self.upload_bytes = 0
+        self._messages: dict[str, int] = {}  # Number of messages of each conversation.
+        self._runner: web.AppRunner | None = None
+
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_get("/turing/conversation/create", self._create)
+        app.router.add_get("/turing/conversation/chats", self._chats)
+        app.router.add_post("/images/kblob", self._kblob)
+        app.router.add_get("/sydney/ChatHub", self._chathub)
+        self.app = app
+
+    async def __aenter__(self) -> FakeCopilot:
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """
+        Start listening for requests.
+        """
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+
+    async def close(self) -> None:
+        """
+        Stop the server and close all open connections.
+        """
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def urls(self) -> dict[str, str]:
+        """
+        The URLs of the server, keyed on the names of the constants of `sydney.constants`
+        that they replace.
+        """
+        http_url = f"http://{self.host}:{self.port}"
+        return {
+            "BING_CREATE_CONVERSATION_URL": f"{http_url}/turing/conversation/create",
+            "BING_GET_CONVERSATIONS_URL": f"{http_url}/turing/conversation/chats",
+            "BING_CHATHUB_URL": f"ws://{self.host}:{self.port}/sydney/ChatHub",
+            "BING_KBLOB_URL": f"{http_url}/images/kblob",
+            "BING_BLOB_URL": f"{http_url}/images/blob?bcid=",
+        }
+
+    @contextmanager
+    def endpoints(self) -> Iterator[FakeCopilot]:
+        """
+        Context manager that points all clients to the server, by overriding the URLs of
+        `sydney.constants`. The original URLs are restored on exit.
+        """
+        original = {name: getattr(constants, name) for name in self.urls}
+        try:
+            for name, url in self.urls.items():
+                setattr(constants, name, url)
+            yield self
+        finally:
+            for name, url in original.items():
+                setattr(constants, name, url)
+
+    async def _create(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+
+        if self.create_errors:
+            self.create_errors -= 1
+            return web.Response(status=self.create_error_status)
+
+        conversation_id = f"51D|BingProdUnAuthenticatedUsers|{uuid4().hex.upper()}"
+        self._messages[conversation_id] = 0
+        return web.json_response(
+            {
+                "conversationId": conversation_id,
+                "clientId": str(uuid4().int)[:16],
+                "result": {"value": "Success", "message": None},
+            },
+            headers={
+                "X-Sydney-Conversationsignature": uuid4().hex,
+                "X-Sydney-Encryptedconversationsignature": uuid4().hex,
+            },
+        )
+
+    async def _chats(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+
+        # Changes whenever a conversation is created, like the ETag of a real server.
+        etag = f'"{len(self._messages)}-{hash(tuple(self._messages)) & 0xFFFFFFFF:x}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        return web.json_response(
+            {
+                "chats": [
+                    {"conversationId": conversation_id, "chatName": "Fake chat"}
+                    for conversation_id in self._messages
+                ],
+                "result": {"value": "Success", "message": None},
+                "clientId": str(uuid4().int)[:16],
+            },
+            headers={"ETag": etag},
+        )
+
+    async def _kblob(self, request: web.Request) -> web.Response:
+        await asyncio.sleep(self.latency)
+
+        # Read the whole form, like Copilot does before answering.
+        size = 0
+        reader = await request.multipart()
+        async for part in reader:
+            while chunk := await part.read_chunk():  # type: ignore
+                size += len(chunk)
+
+        self.uploads += 1
+        self.upload_bytes += size
+        blob_id = uuid4().hex
+        return web.json_response({"blobId": blob_id, "processedBlobId": blob_id})
+
+    async def _chathub(self, request: web.Request) -> web.WebSocketResponse:
+        await asyncio.sleep(self.latency)
+
+        wss = web.WebSocketResponse()
+        await wss.prepare(request)
+        self.connections += 1
+        self.open_connections += 1
+
+        # Answers are sent in the background, so that they can be cancelled by the client.
+        answers: dict[str, asyncio.Task] = {}
+        try:
+            async for message in wss:
+                if message.type != WSMsgType.TEXT:
+                    break
+
+                for record in message.data.split(DELIMETER):
+                    if not record:
+                        continue
+
+                    request_dict = json.loads(record)
+                    if request_dict.get("protocol") == "json":
+                        await wss.send_str("{}" + DELIMETER)
+                    elif request_dict.get("type") == 6:
+                        await wss.send_str('{"type":6}' + DELIMETER)
+                    elif request_dict.get("type") == 4:
+                        invocation_id = request_dict["invocationId"]
+                        answers[invocation_id] = asyncio.ensure_future(
+                            self._answer(wss, request_dict)
+                        )
+                    elif request_dict.get("type") == 5:
+                        answer = answers.pop(request_dict["invocationId"], None)
+                        if answer is not None and not answer.done():
+                            answer.cancel()
+                            self.cancelled += 1
+        finally:
+            for answer in answers.values():
+                answer.cancel()
+            await asyncio.gather(*answers.values(), return_exceptions=True)
+            self.open_connections -= 1
+
+        return wss
+
+    async def _answer(self, wss: web.WebSocketResponse, request: dict) -> None:
+        self.prompts += 1
+        arguments = request["arguments"][0]
+        invocation_id = request["invocationId"]
+        prompt = arguments["message"]["text"]
+        conversation_id = arguments["conversationId"]
+
+        messages = self._messages.get(conversation_id, 0) + 1
+        self._messages[conversation_id] = messages
+        throttling = {
+            "numUserMessagesInConversation": messages,
+            "maxNumUserMessagesInConversation": self.max_messages,
+        }
+
+        result = self.result
+        if self._bucket is not None and not self._bucket.try_acquire():
+            result = ResultValue.THROTTLED.value
+
+        if result != ResultValue.SUCCESS.value:
+            self.throttled += result == ResultValue.THROTTLED.value
+            await self._send(
+                wss,
+                {
+                    "type": 2,
+                    "invocationId": invocation_id,
+                    "item": {
+                        "result": {"value": result, "message": result},
+                        "throttling": throttling,
+                    },
+                },
+            )
+            return
+
+        answer = self.answer(prompt) if callable(self.answer) else self.answer
+        tokens = [token for token in TOKEN_PATTERN.split(answer) if token]
+
+        await asyncio.sleep(self.first_token_delay)
+        for end in range(self.tokens_per_frame, len(tokens), self.tokens_per_frame):
+            await self._send(wss, self._update(invocation_id, "".join(tokens[:end])))
+            if self.dropped_streams:
+                self.dropped_streams -= 1
+                await wss.close()
+                return
+            await asyncio.sleep(self.token_delay)
+        await self._send(wss, self._update(invocation_id, answer))
+
+        user_message = {"text": prompt, "author": "user", "messageType": "Chat"}
+        bot_message = self._bot_message(answer)
+        bot_message["suggestedResponses"] = [
+            {"text": text, "author": "user", "messageType": "Suggestion"}
+            for text in self.suggested_responses
+        ]
+        await self._send(
+            wss,
+            {
+                "type": 2,
+                "invocationId": invocation_id,
+                "item": {
+                    "messages": [user_message, bot_message],
+                    "conversationId": conversation_id,
+                    "result": {"value": "Success", "message": answer},
+                    "throttling": throttling,
+                },
+            },
+        )
+        await self._send(wss, {"type": 3, "invocationId": invocation_id})
+
+    def _update(self, invocation_id: str, text: str) -> dict:
+        arguments: dict[str, Any] = {"messages": [self._bot_message(text)]}
+        if self.frame_padding:
+            arguments["padding"] = "x" * self.frame_padding
+        return {
+            "type": 1,
+            "target": "update",
+            "arguments": [arguments],
+            "invocationId": invocation_id,
+        }
+
+    def _bot_message(self, text: str) -> dict:
+        return {
+            "text": text,
+            "author": "bot",
+            "adaptiveCards": [
+                {"type": "AdaptiveCard", "body": [{"type": "TextBlock", "text": text}]}
+            ],
+            "messageType": "Chat",
+        }
+
+    async def _send(self, wss: web.WebSocketResponse, message: dict) -> None:
+        await wss.send_str(
+            json.dumps(message, separators=(",", ":"), ensure_ascii=False) + DELIMETER
+        )
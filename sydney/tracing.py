@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from time import perf_counter, time_ns
+
+from sydney.enums import Phase
+
+
+class RequestTrace:
+    """
+    Timing and size information of a single request to Copilot, such as a prompt or the
+    creation of a conversation.
+
+    All timestamps are in seconds and come from the monotonic `time.perf_counter` clock.
+    Use `wall_time` to convert them to Unix time, for example to export the phases as
+    OpenTelemetry spans.
+    """
+
+    __slots__ = (
+        "operation",
+        "start",
+        "end",
+        "phases",
+        "cached",
+        "bytes_sent",
+        "bytes_received",
+        "frames_received",
+        "number_of_messages",
+        "max_messages",
+        "exception",
+        "_wall_start",
+    )
+
+    def __init__(self, operation: str) -> None:
+        """
+        Parameters
+        ----------
+        operation : str
+            The name of the traced operation, such as `ask` or `compose`.
+        """
+        self.operation = operation
+        self._wall_start = time_ns()
+        self.start = perf_counter()
+        self.end: float | None = None
+        # Start and end timestamps of each phase that the request went through.
+        self.phases: dict[Phase, tuple[float, float]] = {}
+        self.cached = False
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.frames_received = 0
+        self.number_of_messages: int | None = None
+        self.max_messages: int | None = None
+        self.exception: type[BaseException] | None = None
+
+    def __repr__(self) -> str:
+        phases = ", ".join(
+            f"{phase.value}={(end - start) * 1000:.1f}ms"
+            for phase, (start, end) in self.phases.items()
+        )
+        return f"<RequestTrace {self.operation} {phases}>"
+
+    @property
+    def total(self) -> float | None:
+        """
+        The duration of the whole request in seconds, or None if it has not finished.
+        """
+        return self.end - self.start if self.end is not None else None
+
+    def duration(self, phase: Phase) -> float | None:
+        """
+        Get the duration of a phase in seconds.
+
+        Parameters
+        ----------
+        phase : Phase
+            The phase of the request.
+
+        Returns
+        -------
+        float | None
+            The duration of the phase, or None if the request did not go through it.
+        """
+        if phase not in self.phases:
+            return None
+        start, end = self.phases[phase]
+        return end - start
+
+    def wall_time(self, timestamp: float) -> int:
+        """
+        Convert a timestamp of the trace to Unix time in nanoseconds.
+
+        Parameters
+        ----------
+        timestamp : float
+            A timestamp of the trace, such as `start` or the start of a phase.
+
+        Returns
+        -------
+        int
+            The number of nanoseconds since the Unix epoch.
+        """
+        return self._wall_start + round((timestamp - self.start) * 1e9)
@@ -1,15 +1,20 @@
-import json
+from __future__ import annotations
+
 from datetime import datetime
+from time import time
 from urllib.parse import urlparse
 
-from sydney.constants import DELIMETER
+from sydney.codec import JSONCodec, get_codec
+from sydney.constants import DELIMETER_BYTES
 
 
-def as_json(message: dict) -> str:
+def as_json(message: dict, codec: JSONCodec | None = None) -> bytes:
     """
     Convert message to JSON, append delimeter character at the end.
     """
-    return json.dumps(message) + DELIMETER
+    if codec is None:
+        codec = get_codec()
+    return codec.encode(message) + DELIMETER_BYTES
 
 
 def cookies_as_dict(cookies: str) -> dict:
@@ -29,5 +34,18 @@ def check_if_url(string: str) -> bool:
     return False
 
 
+# Last formatted timestamp and the second it was created at.
+_timestamp: tuple[int, str] = (-1, "")
+
+
 def get_iso_timestamp() -> str:
-    return datetime.now().astimezone().replace(microsecond=0).isoformat()
+    global _timestamp
+
+    # Timestamps have a resolution of one second, so format each second only once.
+    second = int(time())
+    if _timestamp[0] != second:
+        _timestamp = (
+            second,
+            datetime.fromtimestamp(second).astimezone().isoformat(),
+        )
+    return _timestamp[1]
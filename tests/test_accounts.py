@@ -0,0 +1,130 @@
+import pytest
+
+import sydney.accounts
+from sydney import AccountManager, RetryPolicy, SydneyClient
+from sydney.enums import ResultValue
+from sydney.exceptions import (
+    CaptchaChallengeException,
+    CreateConversationException,
+    ThrottledRequestException,
+)
+from sydney.testing import FakeCopilot
+
+
+def test_accounts_rotate() -> None:
+    accounts = AccountManager({"a": "_U=a", "b": "_U=b", "c": "_U=c"})
+
+    names = [accounts.choose().name for _ in range(6)]  # type: ignore
+
+    assert names == ["a", "b", "c", "a", "b", "c"]
+    assert accounts.accounts[0].cookie_dict == {"_U": "a"}
+
+
+def test_accounts_failures() -> None:
+    accounts = AccountManager(["_U=a", "_U=b"], cooldown=10.0, max_cooldown=100.0)
+    first, second = accounts.accounts
+
+    accounts.report_failure(first, ThrottledRequestException())
+
+    assert first.score == 0.5
+    assert 9.0 < first.cooldown <= 10.0
+    assert [accounts.choose() for _ in range(2)] == [second, second]
+
+    accounts.report_failure(second, CreateConversationException())
+    accounts.report_failure(second, CreateConversationException())
+
+    assert 19.0 < second.cooldown <= 20.0
+    assert accounts.choose() is None
+
+    accounts.reset(first)
+    accounts.report_failure(first, CaptchaChallengeException())
+
+    assert 99.0 < first.cooldown <= 100.0
+    assert first.stats()["failures"] == 2
+
+    accounts.report_failure(first, ValueError())
+    assert first.failures == 2
+
+
+def test_accounts_prefer_healthy() -> None:
+    accounts = AccountManager(["_U=a", "_U=b"], cooldown=0.0)
+    first, second = accounts.accounts
+
+    accounts.report_failure(first, ThrottledRequestException())
+    accounts.report_failure(first, ThrottledRequestException())
+
+    assert [accounts.choose() for _ in range(3)] == [second] * 3
+
+    for _ in range(10):
+        accounts.report_success(first)
+
+    assert first.score == 1.0
+    assert accounts.choose() is first
+
+
+def test_accounts_recover_after_cooldown(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(sydney.accounts, "monotonic", lambda: now)
+    accounts = AccountManager(["_U=a", "_U=b"], cooldown=60.0, recovery_time=600.0)
+    first, second = accounts.accounts
+
+    accounts.report_failure(first, CaptchaChallengeException())
+    now += accounts.max_cooldown - 1
+
+    assert [accounts.choose() for _ in range(2)] == [second, second]
+
+    now += 1
+    # The score recovered during the quarantine, so the account is used again.
+    assert accounts.choose() is first
+    assert first.score == 1.0
+    accounts.report_success(first)
+
+    accounts.report_failure(first, ThrottledRequestException())
+    accounts.report_failure(first, ThrottledRequestException())
+    now += 120
+
+    assert first.cooldown == 0.0
+    assert accounts.choose() is second
+    assert first.score == pytest.approx(0.45)
+    now += 31
+
+    assert accounts.choose() is first
+
+
+@pytest.mark.asyncio
+async def test_client_accounts() -> None:
+    accounts = AccountManager(["_U=a", "_U=b"])
+
+    async with FakeCopilot(create_errors=1) as server:
+        with server.endpoints():
+            async with SydneyClient(
+                accounts=accounts, retry_policy=RetryPolicy(base_delay=0.0)
+            ) as sydney:
+                # The first account failed to create the conversation, so the second one
+                # was used instead.
+                assert sydney.account is accounts.accounts[1]
+                assert sydney.bing_cookies == "_U=b"
+
+                await sydney.ask("Hello, Copilot!")
+
+    stats = accounts.stats()
+    assert stats[0]["create_failures"] == 1 and stats[0]["cooldown"] > 0
+    assert stats[1]["successes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_accounts_throttled() -> None:
+    accounts = AccountManager(["_U=a", "_U=b"])
+
+    async with FakeCopilot(result=ResultValue.THROTTLED.value) as server:
+        with server.endpoints():
+            async with SydneyClient(accounts=accounts) as sydney:
+                with pytest.raises(ThrottledRequestException):
+                    await sydney.ask("Hello, Copilot!")
+
+                await sydney.reset_conversation()
+
+                assert sydney.account is accounts.accounts[1]
+
+    assert accounts.accounts[0].throttled == 1
+    assert accounts.accounts[0].score == pytest.approx(0.5, abs=1e-3)
@@ -245,6 +245,17 @@ async def test_ask_multiple_prompts() -> None:
         _ = await sydney.ask("Tell me another one.")
 
 
+@pytest.mark.asyncio
+async def test_ask_multiple_prompts_persistent() -> None:
+    async with SydneyClient(persistent=True) as sydney:
+        _ = await sydney.ask("Tell me a joke.")
+        wss_client = sydney.wss_client
+
+        _ = await sydney.ask("Tell me another one.")
+
+        assert sydney.wss_client is wss_client
+
+
 @pytest.mark.asyncio
 async def test_ask_logic_precise() -> bool:
     expected_responses = [
@@ -0,0 +1,128 @@
+import asyncio
+from typing import AsyncIterator
+
+import pytest
+
+from sydney import SydneyPool
+from sydney.exceptions import ThrottledRequestException
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+@pytest.mark.asyncio
+async def test_ask_many_ordered() -> None:
+    async with FakeCopilot(
+        answer=lambda prompt: prompt.upper(), max_messages=3
+    ) as server:
+        with server.endpoints():
+            async with SydneyPool(size=4) as pool:
+                results = [
+                    result
+                    async for result in pool.ask_many(
+                        (f"prompt {i}" for i in range(40)), ordered=True
+                    )
+                ]
+
+    assert [result.index for result in results] == list(range(40))
+    assert all(result.ok for result in results)
+    assert results[7].prompt == "prompt 7"
+    assert results[7].response == "PROMPT 7"
+    # Conversations are replaced before they reach their limit.
+    assert pool.evictions > 0
+
+
+@pytest.mark.asyncio
+async def test_ask_many_as_completed() -> None:
+    async def prompts() -> AsyncIterator[str]:
+        for i in range(20):
+            await asyncio.sleep(0)
+            yield f"prompt {i}"
+
+    progress: list[tuple[int, int]] = []
+    async with FakeCopilot(token_delay=0.001) as server:
+        with server.endpoints():
+            async with SydneyPool(size=4) as pool:
+                results = [
+                    result
+                    async for result in pool.ask_many(
+                        prompts(),
+                        progress=lambda completed, failed: progress.append(
+                            (completed, failed)
+                        ),
+                        suggestions=True,
+                    )
+                ]
+
+    assert sorted(result.index for result in results) == list(range(20))
+    assert all(isinstance(result.response, tuple) for result in results)
+    assert progress == [(i, 0) for i in range(1, 21)]
+
+
+@pytest.mark.asyncio
+async def test_compose_many_failures() -> None:
+    async with FakeCopilot(result="Throttled") as server:
+        with server.endpoints():
+            async with SydneyPool(size=2) as pool:
+                results = [
+                    result
+                    async for result in pool.compose_many(["a", "b", "c"], ordered=True)
+                ]
+
+    assert [result.prompt for result in results] == ["a", "b", "c"]
+    assert all(
+        isinstance(result.exception, ThrottledRequestException) for result in results
+    )
+
+
+@pytest.mark.asyncio
+async def test_ask_many_break() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyPool(size=2) as pool:
+                async for result in pool.ask_many(f"prompt {i}" for i in range(100)):
+                    break
+
+                # Remaining prompts are cancelled and their conversations released.
+                await asyncio.sleep(0.05)
+                assert pool.in_use == 0
+                assert server.prompts < 10
+
+
+@pytest.mark.asyncio
+async def test_eviction_wakes_waiting_callers() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyPool(size=1, max_concurrency=3) as pool:
+                client = await pool.acquire()
+                waiters = [asyncio.ensure_future(pool.acquire()) for _ in range(2)]
+                await asyncio.sleep(0.05)
+
+                await pool.release(client, evict=True)
+                replacement = await asyncio.wait_for(waiters[0], 1.0)
+                assert replacement is not client
+                assert not waiters[1].done()
+
+                await pool.release(replacement)
+                assert await asyncio.wait_for(waiters[1], 1.0) is replacement
+                await pool.release(replacement)
+
+                assert pool.idle == 1 and pool.in_use == 0
+                assert await pool.ask("Hello, Copilot!") == DEFAULT_ANSWER
+
+
+@pytest.mark.asyncio
+async def test_ask_many_after_evictions() -> None:
+    async with FakeCopilot(result="Throttled") as server:
+        with server.endpoints():
+            async with SydneyPool(size=2, max_concurrency=6) as pool:
+
+                async def ask_many() -> list:
+                    prompts = (f"prompt {i}" for i in range(12))
+                    return [result async for result in pool.ask_many(prompts)]
+
+                results = await asyncio.wait_for(ask_many(), 5.0)
+
+                server.result = "Success"
+                assert await asyncio.wait_for(pool.ask("Hello, Copilot!"), 1.0)
+
+    assert len(results) == 12
+    assert pool.evictions == 12
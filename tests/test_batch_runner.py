@@ -0,0 +1,68 @@
+import asyncio
+import io
+import json
+import multiprocessing
+
+import pytest
+
+from sydney.batch import load_checkpoint, read_items, run_batch, shard_cookies
+from sydney.testing import FakeCopilot
+
+
+def test_read_items() -> None:
+    lines = ['"first"', "", '{"id": "b", "prompt": "second"}', '{"prompt": "third"}']
+
+    items = list(read_items(lines))
+
+    assert [(item.id, item.prompt) for item in items] == [
+        (0, "first"),
+        ("b", "second"),
+        (3, "third"),
+    ]
+
+    with pytest.raises(ValueError):
+        list(read_items(['{"id": 1}']))
+
+
+def test_shard_cookies() -> None:
+    cookies = ["a", "b", "c", "d", "e"]
+
+    assert shard_cookies(cookies, 2, 0) == ["a", "c", "e"]
+    assert shard_cookies(cookies, 2, 1) == ["b", "d"]
+    assert shard_cookies(["a", "b"], 3, 2) == ["a"]
+    assert shard_cookies([], 2, 0) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="Workers must inherit the URLs of the fake server",
+)
+async def test_run_batch_resume(tmp_path) -> None:
+    checkpoint = tmp_path / "checkpoint"
+    checkpoint.write_text('"p0"\n"p1"\n')
+    prompts = "".join(
+        json.dumps({"id": f"p{i}", "prompt": f"prompt {i}"}) + "\n" for i in range(20)
+    )
+    output = io.StringIO()
+
+    async with FakeCopilot(answer=lambda prompt: prompt.upper()) as server:
+        with server.endpoints():
+            # The fake server runs on the loop of the test, so the batch runs in a thread.
+            answered, failed = await asyncio.to_thread(
+                run_batch,
+                io.StringIO(prompts),
+                output,
+                checkpoint=str(checkpoint),
+                workers=2,
+                size=2,
+            )
+
+    results = [json.loads(line) for line in output.getvalue().splitlines()]
+
+    assert (answered, failed) == (18, 0)
+    assert sorted(result["id"] for result in results) == sorted(
+        f"p{i}" for i in range(2, 20)
+    )
+    assert all(result["response"] == f"PROMPT {result['id'][1:]}" for result in results)
+    assert len(load_checkpoint(str(checkpoint))) == 20
@@ -0,0 +1,101 @@
+import asyncio
+import os
+from time import time
+
+import pytest
+
+from sydney import BlobCache, SydneyClient
+from sydney.blobs import blob_key
+from sydney.testing import FakeCopilot
+
+
+def test_blob_key(tmp_path) -> None:
+    first = tmp_path / "first.png"
+    first.write_bytes(b"image")
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(b"image")
+    other = tmp_path / "other.png"
+    other.write_bytes(b"other")
+
+    assert blob_key(str(first)) == blob_key(str(copy))
+    assert blob_key(str(first)) != blob_key(str(other))
+    assert blob_key("https://example.com/a.png") != blob_key(
+        "https://example.com/b.png"
+    )
+
+
+def test_blob_cache_expiration() -> None:
+    cache = BlobCache(ttl=60)
+    cache.set("key", {"blobId": "blob", "processedBlobId": "processed"})
+    assert cache.get("key") == {"blobId": "blob", "processedBlobId": "processed"}
+
+    cache._blobs["key"] = cache._blobs["key"][0], time() - 1
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_blob_cache_on_disk(tmp_path) -> None:
+    cache = BlobCache(path=str(tmp_path))
+    cache.set("key", {"blobId": "blob", "processedBlobId": "processed", "extra": 1})
+
+    # A new cache with the same directory finds the blob, like after a restart.
+    restarted = BlobCache(path=str(tmp_path))
+    assert restarted.get("key") == {"blobId": "blob", "processedBlobId": "processed"}
+
+    restarted.clear()
+    assert os.listdir(tmp_path) == []
+    assert BlobCache(path=str(tmp_path)).get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_blob_cache_single_flight() -> None:
+    cache = BlobCache()
+    uploads = 0
+
+    async def upload() -> dict:
+        nonlocal uploads
+        uploads += 1
+        await asyncio.sleep(0.01)
+        return {"blobId": "blob", "processedBlobId": "processed"}
+
+    blobs = await asyncio.gather(
+        *(cache.get_or_upload("key", upload) for _ in range(10))
+    )
+
+    assert uploads == 1
+    assert all(blob["blobId"] == "blob" for blob in blobs)
+    assert (cache.hits, cache.misses) == (9, 1)
+
+
+@pytest.mark.asyncio
+async def test_blob_cache_failed_upload() -> None:
+    cache = BlobCache()
+
+    async def upload() -> dict:
+        raise ValueError("Upload failed")
+
+    with pytest.raises(ValueError):
+        await cache.get_or_upload("key", upload)
+    assert cache.get("key") is None
+    assert not cache._uploads
+
+
+@pytest.mark.asyncio
+async def test_client_reuses_uploaded_image(tmp_path) -> None:
+    first = tmp_path / "first.png"
+    first.write_bytes(os.urandom(1024))
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(first.read_bytes())
+
+    cache = BlobCache()
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(blob_cache=cache) as sydney:
+                await asyncio.gather(
+                    sydney.ask("What is this?", attachment=str(first)),
+                    sydney.ask("What is this?", attachment=str(first)),
+                )
+                await sydney.ask("And this?", attachment=str(copy))
+
+        assert server.uploads == 1
+        assert server.prompts == 3
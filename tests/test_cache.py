@@ -0,0 +1,118 @@
+import pytest
+
+import sydney.cache
+from sydney import MemoryResponseCache, SydneyClient
+from sydney.cache import CachedResponse, ResponseCache, cache_key
+from sydney.testing import FakeCopilot
+
+
+def test_cache_key() -> None:
+    key = cache_key("Hello,  Copilot!\n", style="balanced", search=True)
+
+    assert key == cache_key("Hello, Copilot!", search=True, style="balanced")
+    assert key != cache_key("Hello, Copilot!", style="creative", search=True)
+    assert key != cache_key("Hello, Copilot!", style="balanced", search=False)
+    assert key != cache_key("hello, copilot!", style="balanced", search=True)
+
+
+def test_cache_abstract() -> None:
+    with pytest.raises(TypeError):
+        ResponseCache()  # type: ignore[abstract]
+
+
+def test_cached_response_replay() -> None:
+    response = CachedResponse("Hello! How can I help you today?", ["Hi"])
+
+    assert list(response.replay(stream=False)) == [
+        ("Hello! How can I help you today?", ["Hi"])
+    ]
+
+    chunks = list(response.replay(stream=True))
+    assert "".join(text for text, _ in chunks) == response.text
+    assert len(chunks) > 2
+    assert chunks[-1] == ("", ["Hi"])
+    assert all(suggestions is None for _, suggestions in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_lru() -> None:
+    cache = MemoryResponseCache(max_size=2)
+
+    await cache.set("a", "A")
+    await cache.set("b", "B")
+    assert (await cache.get("a")).text == "A"  # type: ignore
+
+    # Least recently used answer is evicted.
+    await cache.set("c", "C")
+    assert await cache.get("b") is None
+    assert (await cache.get("a")).text == "A"  # type: ignore
+    assert (await cache.get("c")).text == "C"  # type: ignore
+    assert len(cache) == 2
+
+    assert cache.hits == 3
+    assert cache.misses == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_ttl(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(sydney.cache, "time", lambda: now)
+
+    cache = MemoryResponseCache(ttl=10)
+    await cache.set("a", "A")
+
+    now += 9
+    assert await cache.get("a") is not None
+
+    now += 1
+    assert await cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_ask_from_cache() -> None:
+    cache = MemoryResponseCache()
+    sydney = SydneyClient(cache=cache)
+    # Cached answers are returned without contacting Copilot.
+    sydney.conversation_id = "conversation"
+    sydney.client_id = "client"
+    sydney.invocation_id = 0
+
+    key = sydney._cache_key(
+        "Hello, Copilot!", None, False, True, False, None, None, None
+    )
+    await cache.set(key, "Hello, this is Copilot!", ["Tell me a joke"])
+
+    assert await sydney.ask("Hello,  Copilot!") == "Hello, this is Copilot!"
+    assert await sydney.ask("Hello, Copilot!", suggestions=True) == (
+        "Hello, this is Copilot!",
+        ["Tell me a joke"],
+    )
+
+    response = ""
+    async for response_token in sydney.ask_stream("Hello, Copilot!"):
+        response += response_token
+    assert response == "Hello, this is Copilot!"
+
+    assert cache.hits == 3
+    assert sydney.invocation_id == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_after_style_reset() -> None:
+    cache = MemoryResponseCache()
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(style="balanced", cache=cache) as sydney:
+                await sydney.ask("Hello, Copilot!")
+                await sydney.reset_conversation(style="creative")
+                await sydney.ask("Hello, Copilot!")
+                await sydney.ask("Hello, Copilot!")
+                await sydney.compose("Hello, Copilot!", tone="funny")
+                await sydney.compose("Hello, Copilot!", tone="casual")
+
+    # Answers of other styles and compose options are not reused.
+    assert server.prompts == 4
+    assert cache.hits == 1
@@ -0,0 +1,124 @@
+import asyncio
+import sys
+
+import pytest
+from websockets.protocol import State
+
+from sydney import SydneyClient, SydneyPool
+from sydney.retry import RetryPolicy
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+async def wait_closed(server: FakeCopilot) -> None:
+    # The server notices closed connections asynchronously.
+    for _ in range(100):
+        if server.open_connections == 0:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"{server.open_connections} connections were left open")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("persistent", [False, True])
+async def test_aclose_cancels_answer(persistent: bool) -> None:
+    async with FakeCopilot(token_delay=0.01) as server:
+        with server.endpoints():
+            async with SydneyClient(persistent=persistent) as sydney:
+                stream = sydney.ask_stream("Hello, Copilot!")
+                async for _ in stream:
+                    break
+                await stream.aclose()
+
+                assert sydney.wss_client is not None
+                assert sydney.wss_client.state is State.CLOSED
+                await wait_closed(server)
+                assert server.cancelled == 1
+
+                # The next prompt uses a new connection.
+                assert await sydney.ask("Hello, Copilot!") == DEFAULT_ANSWER
+                assert server.connections == 2
+
+        await wait_closed(server)
+
+
+@pytest.mark.asyncio
+async def test_aclose_buffered_stream() -> None:
+    async with FakeCopilot(token_delay=0.01) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                stream = sydney.ask_stream("Hello, Copilot!", buffer_size=4)
+                async for _ in stream:
+                    break
+                await stream.aclose()
+
+                await wait_closed(server)
+                assert server.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_aclose_with_retries() -> None:
+    async with FakeCopilot(token_delay=0.01) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=RetryPolicy()) as sydney:
+                stream = sydney.compose_stream("Hello, Copilot!")
+                async for _ in stream:
+                    break
+                await stream.aclose()
+
+                await wait_closed(server)
+                assert server.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_wait_for_cancels_answer() -> None:
+    async with FakeCopilot(first_token_delay=10) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                with pytest.raises(asyncio.TimeoutError):
+                    await asyncio.wait_for(sydney.ask("Hello, Copilot!"), 0.1)
+
+                await wait_closed(server)
+                assert server.cancelled == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.skipif(sys.version_info < (3, 11), reason="requires asyncio.timeout")
+async def test_timeout_cancels_stream() -> None:
+    async with FakeCopilot(token_delay=0.05) as server:
+        with server.endpoints():
+            async with SydneyClient(persistent=True) as sydney:
+                tokens = []
+                with pytest.raises(TimeoutError):
+                    async with asyncio.timeout(0.1):  # type: ignore[attr-defined]
+                        async for token in sydney.ask_stream("Hello, Copilot!"):
+                            tokens.append(token)
+
+                assert 0 < len(tokens) < len(DEFAULT_ANSWER.split())
+                await wait_closed(server)
+                assert server.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_pool_streams_release_connections() -> None:
+    async with FakeCopilot(token_delay=0.01) as server:
+        with server.endpoints():
+            async with SydneyPool(size=4, persistent=True) as pool:
+
+                async def read() -> None:
+                    async for _ in pool.ask_stream("Hello, Copilot!"):
+                        pass
+
+                tasks = [asyncio.ensure_future(read()) for _ in range(8)]
+                await asyncio.sleep(0.1)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+                await wait_closed(server)
+                assert server.cancelled == 4
+
+                # Every conversation of the pool can be used again.
+                answers = await asyncio.gather(
+                    *(pool.ask("Hello, Copilot!") for _ in range(4))
+                )
+                assert answers == [DEFAULT_ANSWER] * 4
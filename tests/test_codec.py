@@ -0,0 +1,44 @@
+import pytest
+
+from sydney.codec import JSONCodec, StdlibJSONCodec, available_codecs, get_codec
+from sydney.utils import as_json
+
+MESSAGE = {
+    "type": 1,
+    "target": "update",
+    "arguments": [{"messages": [{"text": 'Hello! 😊 "quoted" \\ ünïcode'}]}],
+}
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_codec_round_trip(name: str) -> None:
+    codec = get_codec(name)
+
+    encoded = codec.encode(MESSAGE)
+
+    assert isinstance(encoded, bytes)
+    assert codec.decode(encoded) == MESSAGE
+    assert codec.decode(encoded.decode()) == MESSAGE
+
+
+def test_codec_default() -> None:
+    assert get_codec().name == available_codecs()[0]
+    assert get_codec("json") is get_codec("json")
+    assert isinstance(get_codec("json"), StdlibJSONCodec)
+
+
+def test_codec_unknown() -> None:
+    with pytest.raises(ValueError):
+        get_codec("unknown")
+
+
+def test_codec_abstract() -> None:
+    with pytest.raises(TypeError):
+        JSONCodec()  # type: ignore[abstract]
+
+
+def test_as_json() -> None:
+    message = as_json(MESSAGE, get_codec("json"))
+
+    assert message.endswith(b"\x1e")
+    assert get_codec("json").decode(message[:-1]) == MESSAGE
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from sydney import ConversationIndex, SydneyClient
+from sydney.testing import FakeCopilot
+
+
+def chat(conversation_id: str, name: str = "Chat") -> dict:
+    return {"conversationId": conversation_id, "chatName": name}
+
+
+def test_index_changes() -> None:
+    index = ConversationIndex()
+
+    index.update({"chats": [chat("a"), chat("b")]})
+    first = index.changes()
+    index.update({"chats": [chat("a", "Renamed"), chat("b"), chat("c")]})
+    second = index.changes(first.version)
+    index.update({"chats": [chat("a", "Renamed"), chat("c")]})
+    third = index.changes(second.version)
+
+    assert [c["conversationId"] for c in first.chats] == ["a", "b"]
+    assert sorted(c["conversationId"] for c in second.chats) == ["a", "c"]
+    assert not second.removed
+    assert third.chats == [] and third.removed == ["b"]
+    # Unchanged responses do not create a new version.
+    index.update({"chats": [chat("a", "Renamed"), chat("c")]})
+    assert not index.changes(third.version)
+    assert len(index) == 2 and "b" not in index
+
+
+@pytest.mark.asyncio
+async def test_get_conversation_changes() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                changes = await sydney.get_conversation_changes()
+
+                assert [c["conversationId"] for c in changes.chats] == [
+                    sydney.conversation_id
+                ]
+
+                changes = await sydney.get_conversation_changes()
+
+                assert not changes
+                assert sydney.conversation_index.not_modified == 1
+
+                await sydney.reset_conversation()
+                changes = await sydney.get_conversation_changes()
+
+                assert [c["conversationId"] for c in changes.chats] == [
+                    sydney.conversation_id
+                ]
+
+                response = await sydney.get_conversations()
+
+                assert len(response["chats"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_conversations_shares_requests() -> None:
+    index = ConversationIndex(max_age=60.0)
+
+    async with FakeCopilot(latency=0.05) as server:
+        with server.endpoints():
+            async with SydneyClient(conversation_index=index) as sydney:
+                responses = await asyncio.gather(
+                    *(sydney.get_conversations() for _ in range(10))
+                )
+                await sydney.get_conversations()
+
+    assert all(response == responses[0] for response in responses)
+    assert index.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_get_conversations_returns_copies() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response = await sydney.get_conversations()
+                response["chats"][0]["chatName"] = "Modified"
+                response["chats"].clear()
+
+                changes = await sydney.get_conversation_changes()
+
+                assert len(changes.chats) == 1
+                assert changes.chats[0].get("chatName") != "Modified"
+                assert len((await sydney.get_conversations())["chats"]) == 1
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from sydney import SydneyClient
+from sydney.enums import ResultValue
+from sydney.exceptions import (
+    CaptchaChallengeException,
+    ConversationLimitException,
+    ThrottledRequestException,
+)
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+@pytest.mark.asyncio
+async def test_fake_ask() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response, suggested_responses = await sydney.ask(
+                    "Hello, Copilot!", suggestions=True
+                )
+
+        assert response == DEFAULT_ANSWER
+        assert suggested_responses == ["Tell me a joke", "What can you do?"]
+
+
+@pytest.mark.asyncio
+async def test_fake_ask_stream() -> None:
+    async with FakeCopilot(frame_padding=1024) as server:
+        with server.endpoints():
+            async with SydneyClient(persistent=True) as sydney:
+                for _ in range(3):
+                    tokens = [
+                        token async for token in sydney.ask_stream("Hello, Copilot!")
+                    ]
+
+                    assert "".join(tokens) == DEFAULT_ANSWER
+                    assert len(tokens) > 10
+
+        assert server.connections == 1
+        assert server.prompts == 3
+
+
+@pytest.mark.asyncio
+async def test_fake_ask_stream_raw_bytes() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                records = [
+                    record
+                    async for record in sydney.ask_stream(
+                        "Hello, Copilot!", raw_bytes=True
+                    )
+                ]
+
+                assert sydney.number_of_messages == 1
+
+    assert all(isinstance(record, bytes) for record in records)
+    messages = [json.loads(record) for record in records]
+    assert {message["type"] for message in messages[:-1]} == {1}
+    assert messages[-1]["type"] == 2
+    assert messages[-1]["item"]["messages"][-1]["text"] == DEFAULT_ANSWER
+
+
+@pytest.mark.asyncio
+async def test_fake_ask_stream_raw_bytes_throttled() -> None:
+    async with FakeCopilot(result=ResultValue.THROTTLED.value) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                with pytest.raises(ThrottledRequestException):
+                    async for _ in sydney.ask_stream("Hello, Copilot!", raw_bytes=True):
+                        pass
+
+
+@pytest.mark.asyncio
+async def test_fake_compose() -> None:
+    async with FakeCopilot(answer=lambda prompt: prompt.upper()) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response = await sydney.compose("Why Python is a great language")
+
+        assert response == "WHY PYTHON IS A GREAT LANGUAGE"
+
+
+@pytest.mark.asyncio
+async def test_fake_attachment(tmp_path) -> None:
+    image = tmp_path / "image.png"
+    image.write_bytes(bytes(range(256)) * 64)
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response = await sydney.ask("What is this?", attachment=str(image))
+
+        assert response == DEFAULT_ANSWER
+        assert server.uploads == 1
+        assert server.upload_bytes > image.stat().st_size
+
+
+@pytest.mark.asyncio
+async def test_fake_get_conversations() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response = await sydney.get_conversations()
+
+                assert response["chats"][0]["conversationId"] == sydney.conversation_id
+        assert "result" in response
+        assert "clientId" in response
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "result, exception",
+    [
+        ("Throttled", ThrottledRequestException),
+        ("CaptchaChallenge", CaptchaChallengeException),
+    ],
+)
+async def test_fake_result(result: str, exception: type) -> None:
+    async with FakeCopilot(result=result) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                with pytest.raises(exception):
+                    await sydney.ask("Hello, Copilot!")
+
+
+@pytest.mark.asyncio
+async def test_fake_conversation_limit() -> None:
+    async with FakeCopilot(max_messages=2) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                _ = await sydney.ask("Hello, Copilot!")
+
+                with pytest.raises(ConversationLimitException):
+                    await sydney.ask("Hello, Copilot!")
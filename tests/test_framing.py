@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from sydney.framing import RecordParser, peek_record_type
+
+SEPARATOR = b"\x1e"
+
+
+def random_records(rng: random.Random) -> list[bytes]:
+    alphabet = 'abc{}":,\\ 😊'.encode() + bytes(range(0, 0x1E)) + bytes([0x1F])
+    return [
+        bytes(rng.choice(alphabet) for _ in range(rng.randint(1, 64)))
+        for _ in range(rng.randint(0, 20))
+    ]
+
+
+def random_fragments(rng: random.Random, data: bytes) -> list[bytes]:
+    cuts = sorted(rng.sample(range(len(data) + 1), rng.randint(0, len(data) // 2)))
+    return [data[start:end] for start, end in zip([0] + cuts, cuts + [len(data)])]
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_record_parser_any_fragmentation(seed: int) -> None:
+    rng = random.Random(seed)
+    records = random_records(rng)
+    data = b"".join(record + SEPARATOR for record in records)
+
+    parser = RecordParser()
+    parsed = []
+    for fragment in random_fragments(rng, data):
+        parser.feed(fragment)
+        parsed.extend(parser)
+
+    assert parsed == records
+    assert parser.pending == 0
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_record_parser_lazy_consumption(seed: int) -> None:
+    rng = random.Random(seed)
+    records = random_records(rng)
+    data = b"".join(record + SEPARATOR for record in records)
+
+    parser = RecordParser()
+    parsed = []
+    for fragment in random_fragments(rng, data):
+        parser.feed(fragment)
+        # Consume only some of the complete records before more data arrives.
+        for _ in range(rng.randint(0, 2)):
+            record = next(parser, None)
+            if record is not None:
+                parsed.append(record)
+    parsed.extend(parser)
+
+    assert parsed == records
+
+
+def test_record_parser_incomplete_record() -> None:
+    parser = RecordParser()
+
+    parser.feed(b'{"type":1}\x1e{"type"')
+
+    assert list(parser) == [b'{"type":1}']
+    assert parser.pending == len(b'{"type"')
+
+    parser.feed(':2}\x1e\x1e{"type":3}\x1e')
+
+    assert list(parser) == [b'{"type":2}', b'{"type":3}']
+
+
+def test_record_parser_many_fragments() -> None:
+    parser = RecordParser()
+    record = b"x" * 100_000
+
+    for i in range(0, len(record), 10):
+        parser.feed(record[i : i + 10])
+        assert list(parser) == []
+    parser.feed(SEPARATOR)
+
+    assert list(parser) == [record]
+
+
+@pytest.mark.parametrize(
+    "record, record_type",
+    [
+        (b'{"type":1,"target":"update"}', 1),
+        (b'{ "type" : 2 , "item": {}}', 2),
+        (b'{"type":6}', 6),
+        (b'{"target":"update","type":1}', None),
+        (b'{"type":"1"}', None),
+    ],
+)
+def test_peek_record_type(record: bytes, record_type: int | None) -> None:
+    assert peek_record_type(record) == record_type
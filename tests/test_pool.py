@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from sydney import SydneyPool
+
+
+@pytest.mark.asyncio
+async def test_pool_ask() -> None:
+    async with SydneyPool(size=2) as pool:
+        responses = await asyncio.gather(
+            *(pool.ask("Hello, Copilot!") for _ in range(4))
+        )
+
+        assert all(isinstance(response, str) for response in responses)
+        assert pool.idle == 2
+
+
+@pytest.mark.asyncio
+async def test_pool_ask_stream() -> None:
+    async with SydneyPool(size=1) as pool:
+        response = ""
+        async for response_token in pool.ask_stream("Hello, Copilot!"):
+            response += response_token
+
+        assert response
+
+
+@pytest.mark.asyncio
+async def test_pool_compose() -> None:
+    async with SydneyPool(size=1) as pool:
+        _ = await pool.compose("Why Python is a great language", format="ideas")
@@ -0,0 +1,117 @@
+import asyncio
+from time import monotonic
+
+import pytest
+
+from sydney import SydneyClient
+from sydney.exceptions import ThrottledRequestException
+from sydney.ratelimit import AdaptiveRateLimiter, TokenBucket
+from sydney.testing import FakeCopilot
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_burst() -> None:
+    bucket = TokenBucket(rate=50, capacity=3)
+
+    start = monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert monotonic() - start < 0.01
+
+    await asyncio.gather(*(bucket.acquire() for _ in range(5)))
+    assert monotonic() - start >= 0.09
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_set_rate() -> None:
+    bucket = TokenBucket(rate=0.01, capacity=1)
+    await bucket.acquire()
+
+    waiters = [asyncio.create_task(bucket.acquire()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert bucket.waiting == 3
+
+    # Waiting requests use the new rate.
+    bucket.set_rate(1000)
+    await asyncio.wait_for(asyncio.gather(*waiters), timeout=1)
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_cancel() -> None:
+    bucket = TokenBucket(rate=20, capacity=1)
+    await bucket.acquire()
+
+    first = asyncio.create_task(bucket.acquire())
+    second = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    first.cancel()
+
+    await asyncio.wait_for(second, timeout=1)
+    assert first.cancelled()
+    assert bucket.waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_cancel_before_release() -> None:
+    bucket = TokenBucket(rate=1, capacity=1)
+    await bucket.acquire()
+
+    first = asyncio.create_task(bucket.acquire())
+    second = asyncio.create_task(bucket.acquire())
+    await asyncio.sleep(0)
+    # The timer fires after the request was cancelled, but before it handles it.
+    first.cancel()
+    bucket.tokens = 1
+    bucket._release()
+
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    # The token went to the next request instead of being lost.
+    await asyncio.wait_for(second, timeout=0.1)
+    assert bucket.waiting == 0
+    assert bucket.tokens < 1
+
+
+def test_adaptive_rate() -> None:
+    limiter = AdaptiveRateLimiter(rate=1.0, min_rate=0.1, max_rate=1.2, increase=0.1)
+
+    limiter.on_success("a")
+    assert limiter.rate("a") == pytest.approx(1.1)
+    limiter.on_success("a")
+    limiter.on_success("a")
+    assert limiter.rate("a") == pytest.approx(1.2)
+    # Accounts have separate rates.
+    assert limiter.rate("b") == 1.0
+
+    sent = monotonic()
+    limiter.on_throttled("a", sent)
+    assert limiter.rate("a") == pytest.approx(0.6)
+    # Requests that were waiting before the rate was lowered do not lower it again.
+    limiter.on_throttled("a", sent)
+    assert limiter.rate("a") == pytest.approx(0.6)
+    limiter.on_throttled("a", monotonic())
+    assert limiter.rate("a") == pytest.approx(0.3)
+
+    for _ in range(5):
+        limiter.on_throttled("a")
+    assert limiter.rate("a") == 0.1
+    assert limiter.throttled == 8
+
+
+@pytest.mark.asyncio
+async def test_client_rate_limiter() -> None:
+    limiter = AdaptiveRateLimiter(rate=1.0)
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(rate_limiter=limiter) as sydney:
+                _ = await sydney.ask("Hello, Copilot!")
+                assert limiter.rate() > 1.0
+
+            server.result = "Throttled"
+            async with SydneyClient(rate_limiter=limiter) as sydney:
+                with pytest.raises(ThrottledRequestException):
+                    await sydney.ask("Hello, Copilot!")
+                assert limiter.rate() < 1.0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+import sydney.reservoir
+from sydney import SydneyClient
+from sydney.reservoir import Conversation, ConversationReservoir
+from sydney.testing import FakeCopilot
+
+
+class Factory:
+    def __init__(self) -> None:
+        self.created = 0
+        self.fail = False
+
+    async def __call__(self) -> Conversation:
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("Failed to create conversation")
+        self.created += 1
+        return Conversation(str(self.created), "client", "signature", "encrypted")
+
+
+@pytest.mark.asyncio
+async def test_reservoir_refill() -> None:
+    create = Factory()
+    reservoir = ConversationReservoir(create, size=2)
+
+    # Empty reservoir creates the conversation directly.
+    conversation = await reservoir.take()
+    assert conversation.conversation_id == "1"
+
+    await reservoir._refill_task  # type: ignore
+    assert reservoir.available == 2
+
+    conversation = await reservoir.take()
+    assert conversation.conversation_id == "2"
+    assert create.created == 3
+
+    await reservoir._refill_task  # type: ignore
+    assert reservoir.available == 2
+    assert create.created == 4
+
+    await reservoir.close()
+    assert reservoir.available == 0
+
+
+@pytest.mark.asyncio
+async def test_reservoir_max_age(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = 1000.0
+    monkeypatch.setattr(sydney.reservoir, "monotonic", lambda: now)
+
+    create = Factory()
+    reservoir = ConversationReservoir(create, size=1, max_age=60)
+    reservoir.refill()
+    await reservoir._refill_task  # type: ignore
+
+    now += 60
+    # Stale conversation is dropped and a new one is created instead.
+    conversation = await reservoir.take()
+    assert conversation.conversation_id == "2"
+
+    await reservoir.close()
+
+
+@pytest.mark.asyncio
+async def test_reservoir_failure() -> None:
+    create = Factory()
+    create.fail = True
+    reservoir = ConversationReservoir(create, size=2)
+
+    reservoir.refill()
+    await reservoir._refill_task  # type: ignore
+    assert reservoir.available == 0
+
+    with pytest.raises(RuntimeError):
+        await reservoir.take()
+
+    create.fail = False
+    assert (await reservoir.take()).conversation_id == "1"
+
+    await reservoir.close()
+
+
+@pytest.mark.asyncio
+async def test_reset_conversation_reservoir() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(reservoir_size=2) as sydney:
+                conversation_ids = {sydney.conversation_id}
+                for _ in range(3):
+                    await sydney._reservoir._refill_task  # type: ignore
+                    assert sydney._reservoir.available == 2  # type: ignore
+
+                    await sydney.reset_conversation()
+                    conversation_ids.add(sydney.conversation_id)
+
+                    _ = await sydney.ask("Hello, Copilot!")
+
+            assert len(conversation_ids) == 4
+            assert sydney._reservoir.available == 0  # type: ignore
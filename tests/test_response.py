@@ -0,0 +1,90 @@
+import pytest
+
+from sydney import SydneyClient, SydneyResponse
+from sydney.response import Source
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+ITEM = {
+    "messages": [
+        {"text": "What is Python?", "author": "user", "messageType": "Chat"},
+        {
+            "text": "Searching for: python",
+            "hiddenText": "python programming language",
+            "author": "bot",
+            "messageType": "InternalSearchQuery",
+        },
+        {
+            "text": "Python is a programming language.",
+            "author": "bot",
+            "adaptiveCards": [
+                {
+                    "type": "AdaptiveCard",
+                    "body": [
+                        {"type": "TextBlock", "altText": "Python"},
+                        {"type": "TextBlock", "text": "Python is a language.[^1^]"},
+                    ],
+                }
+            ],
+            "sourceAttributions": [
+                {"providerDisplayName": "Python", "seeMoreUrl": "https://python.org"}
+            ],
+            "suggestedResponses": [{"text": "Who created Python?"}],
+        },
+        {
+            "author": "bot",
+            "adaptiveCards": [
+                {"body": [{"type": "RichTextBlock", "inlines": [{"text": "x"}]}]}
+            ],
+        },
+    ],
+    "result": {"value": "Success"},
+    "throttling": {
+        "numUserMessagesInConversation": 1,
+        "maxNumUserMessagesInConversation": 30,
+    },
+}
+
+
+def test_response_fields() -> None:
+    response = SydneyResponse(ITEM)
+
+    assert response.text == "Python is a programming language."
+    assert response.search_queries == ["python programming language"]
+    assert response.result == "Success"
+    assert (response.number_of_messages, response.max_messages) == (1, 30)
+
+    assert response.cited_text == "Python is a language.[^1^]"
+    assert response.suggestions == ["Who created Python?"]
+    assert response.sources == [Source("Python", "https://python.org")]
+
+
+def test_response_compact() -> None:
+    response = SydneyResponse(ITEM)
+
+    assert response.compact() is response
+    assert response._message is None
+    assert response.cited_text == "Python is a language.[^1^]"
+
+
+def test_response_without_messages() -> None:
+    response = SydneyResponse({"result": {"value": "Success"}})
+
+    assert response.text == ""
+    assert response.cited_text is None
+    assert response.suggestions == []
+    assert response.sources == []
+    assert response.number_of_messages is None
+
+
+@pytest.mark.asyncio
+async def test_ask_typed() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                response = await sydney.ask("Hello, Copilot!", typed=True)
+
+    assert isinstance(response, SydneyResponse)
+    assert response.text == DEFAULT_ANSWER
+    assert response.cited_text == DEFAULT_ANSWER
+    assert response.suggestions == ["Tell me a joke", "What can you do?"]
+    assert response.number_of_messages == 1
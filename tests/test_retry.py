@@ -0,0 +1,173 @@
+from pathlib import Path
+from time import monotonic
+
+import pytest
+from websockets.exceptions import ConnectionClosed
+
+from sydney import RetryPolicy, SydneyClient
+from sydney.exceptions import (
+    AuthenticationException,
+    CreateConversationException,
+    ThrottledRequestException,
+)
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+def test_retry_policy_backoff() -> None:
+    policy = RetryPolicy(max_attempts=5, base_delay=0.5, max_delay=3.0, jitter=0)
+    started = monotonic()
+
+    assert [policy.delay(attempt, started) for attempt in range(1, 6)] == [
+        0.5,
+        1.0,
+        2.0,
+        3.0,
+        None,
+    ]
+
+
+def test_retry_policy_jitter() -> None:
+    policy = RetryPolicy(max_attempts=2, base_delay=1.0, jitter=0.5)
+
+    for _ in range(100):
+        delay = policy.delay(1, monotonic())
+        assert delay is not None and 0.5 <= delay <= 1.0
+
+
+def test_retry_policy_deadline() -> None:
+    policy = RetryPolicy(max_attempts=10, base_delay=1.0, jitter=0, deadline=2.5)
+    started = monotonic()
+
+    assert policy.delay(1, started) == 1.0
+    assert policy.delay(2, started) == 2.0
+    assert policy.delay(2, started - 1.0) is None
+
+
+@pytest.mark.asyncio
+async def test_retry_create_conversation() -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot(create_errors=2) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                assert sydney.conversation_id is not None
+                assert sydney.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_create_conversation_exhausted() -> None:
+    policy = RetryPolicy(max_attempts=2, base_delay=0.01, jitter=0)
+    async with FakeCopilot(create_errors=2) as server:
+        with server.endpoints():
+            sydney = SydneyClient(retry_policy=policy)
+            with pytest.raises(CreateConversationException):
+                await sydney.start_conversation()
+            assert sydney.retries == 1
+            await sydney.close_conversation()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", [401, 403])
+async def test_no_retry_when_unauthenticated(status: int) -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot(create_errors=2, create_error_status=status) as server:
+        with server.endpoints():
+            sydney = SydneyClient(retry_policy=policy)
+            # Still a CreateConversationException, for callers that already handle it.
+            with pytest.raises(AuthenticationException):
+                await sydney.start_conversation()
+            assert sydney.retries == 0
+            assert server.create_errors == 1
+            await sydney.close_conversation()
+
+
+def test_authentication_is_not_retryable() -> None:
+    policy = RetryPolicy()
+
+    assert isinstance(AuthenticationException(), CreateConversationException)
+    assert policy.is_retryable(CreateConversationException())
+    assert not policy.is_retryable(AuthenticationException())
+
+
+def test_local_errors_are_not_retryable() -> None:
+    policy = RetryPolicy()
+
+    assert policy.is_retryable(ConnectionResetError())
+    assert not policy.is_retryable(FileNotFoundError())
+    assert not policy.is_retryable(PermissionError())
+    assert not policy.is_retryable(IsADirectoryError())
+
+
+@pytest.mark.asyncio
+async def test_no_retry_when_attachment_is_missing(tmp_path: Path) -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                with pytest.raises(FileNotFoundError):
+                    await sydney.ask(
+                        "Hello, Copilot!", attachment=str(tmp_path / "missing.png")
+                    )
+                assert sydney.retries == 0
+                assert server.prompts == 0
+
+
+@pytest.mark.asyncio
+async def test_retry_ask() -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot(dropped_streams=1) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                assert await sydney.ask("Hello, Copilot!") == DEFAULT_ANSWER
+                assert sydney.retries == 1
+                assert server.prompts == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_ask_exhausted() -> None:
+    policy = RetryPolicy(max_attempts=2, base_delay=0.01, jitter=0)
+    async with FakeCopilot(dropped_streams=5) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                with pytest.raises(ConnectionClosed):
+                    await sydney.ask("Hello, Copilot!")
+                assert sydney.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_no_retry_when_throttled() -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot(result="Throttled") as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                with pytest.raises(ThrottledRequestException):
+                    await sydney.ask("Hello, Copilot!")
+                assert sydney.retries == 0
+                assert server.prompts == 1
+
+
+@pytest.mark.asyncio
+async def test_no_retry_after_streamed_tokens() -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0)
+    async with FakeCopilot(dropped_streams=1) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                tokens = []
+                with pytest.raises(ConnectionClosed):
+                    async for token in sydney.ask_stream("Hello, Copilot!"):
+                        tokens.append(token)
+                assert tokens == ["Hello, "]
+                assert sydney.retries == 0
+
+
+@pytest.mark.asyncio
+async def test_restart_stream() -> None:
+    policy = RetryPolicy(base_delay=0.01, jitter=0, restart_streams=True)
+    async with FakeCopilot(dropped_streams=1) as server:
+        with server.endpoints():
+            async with SydneyClient(retry_policy=policy) as sydney:
+                tokens = []
+                async for token in sydney.ask_stream("Hello, Copilot!"):
+                    tokens.append(token)
+                assert tokens[0] == "Hello, "
+                assert "".join(tokens[1:]) == DEFAULT_ANSWER
+                assert sydney.retries == 1
@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+import pytest
+
+from sydney import SydneyClient
+from sydney.streaming import StreamBuffer, TextDelta, buffered
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+def update_message(text: str, ensure_ascii: bool = True) -> bytes:
+    return json.dumps(
+        {
+            "type": 1,
+            "target": "update",
+            "arguments": [
+                {
+                    "messages": [
+                        {
+                            "text": text,
+                            "author": "bot",
+                            "adaptiveCards": [{"body": [{"text": text}]}],
+                        }
+                    ]
+                }
+            ],
+        },
+        separators=(",", ":"),
+        ensure_ascii=ensure_ascii,
+    ).encode()
+
+
+def stream(texts: list[str], ensure_ascii: bool = True) -> tuple[list[str], int]:
+    delta = TextDelta()
+    deltas = []
+    fast = 0
+    for text in texts:
+        message = update_message(text, ensure_ascii)
+        new_text = delta.update_raw(message)
+        if new_text is None:
+            new_text = delta.update(text, message)
+        else:
+            fast += 1
+        deltas.append(new_text)
+    return deltas, fast
+
+
+def test_text_delta_append() -> None:
+    texts = ["Hello", "Hello!", "Hello! How", "Hello! How can I help?"]
+
+    deltas, fast = stream(texts)
+
+    assert deltas == ["Hello", "!", " How", " can I help?"]
+    assert fast == 3
+
+
+def test_text_delta_escapes() -> None:
+    text = 'He said "hi" \\ back\n\ttab 😊 and ünïcode 🙌 end'
+    texts = [text[:i] for i in range(1, len(text) + 1)]
+
+    for ensure_ascii in (True, False):
+        deltas, fast = stream(texts, ensure_ascii)
+
+        assert "".join(deltas) == text
+        assert fast > 0
+
+
+def test_text_delta_rewrite() -> None:
+    texts = ["Hello world", "Hello", "Hello there, world!"]
+
+    deltas, _ = stream(texts)
+
+    assert deltas == ["Hello world", "", ", world!"]
+
+
+def test_text_delta_unknown_message_format() -> None:
+    delta = TextDelta()
+
+    assert delta.update("Hello", b'{"type":1,"text":"Hello"}') == "Hello"
+    assert delta.update_raw(b'{"type":1,"text":"Hello!"}') is None
+    assert delta.update("Hello!") == "!"
+
+
+def test_text_delta_split_surrogate_pair() -> None:
+    prefix = b'{"type":1,"target":"update","arguments":[{"messages":[{"text":"'
+    delta = TextDelta()
+
+    assert delta.update("Hi ", prefix + b'Hi "}]}]}') == "Hi "
+    assert delta.update_raw(prefix + b'Hi \\ud83d"}]}]}') == ""
+    assert delta.update_raw(prefix + b'Hi \\ud83d\\ude0a!"}]}]}') == "😊!"
+    assert delta.text == "Hi 😊!"
+
+
+@pytest.mark.asyncio
+async def test_stream_buffer_coalesces() -> None:
+    buffer = StreamBuffer(2)
+    snapshot = {"type": 1, "arguments": []}
+
+    for item in [("a", None), ("b", None), ("c", None), ("d", ["Suggestion"])]:
+        await buffer.put(item)
+    # Cannot be merged into the final text, so it waits until there is space.
+    put = asyncio.ensure_future(buffer.put((b'{"type":2}', None)))
+    await asyncio.sleep(0)
+
+    assert not put.done()
+    assert await buffer.get() == ("a", None)
+    await put
+    buffer.close()
+
+    assert await buffer.get() == ("bcd", ["Suggestion"])
+    assert await buffer.get() == (b'{"type":2}', None)
+    assert buffer.coalesced == 2
+    with pytest.raises(StopAsyncIteration):
+        await buffer.get()
+
+    buffer = StreamBuffer(1)
+    await buffer.put((snapshot, None))
+    await buffer.put(({**snapshot, "arguments": [1]}, None))
+
+    assert await buffer.get() == ({**snapshot, "arguments": [1]}, None)
+
+
+@pytest.mark.asyncio
+async def test_buffered_raises_after_items() -> None:
+    async def stream():
+        yield "a", None
+        raise ValueError("Failed")
+
+    items = []
+    with pytest.raises(ValueError):
+        async for item in buffered(stream(), 4):
+            items.append(item)
+
+    assert items == [("a", None)]
+
+
+@pytest.mark.asyncio
+async def test_ask_stream_slow_consumer() -> None:
+    async with FakeCopilot(token_delay=0.001) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                tokens = []
+                async for token in sydney.ask_stream("Hello, Copilot!", buffer_size=2):
+                    tokens.append(token)
+                    # Much slower than Copilot, so the answer is read while waiting.
+                    await asyncio.sleep(0.05)
+
+    assert "".join(tokens) == DEFAULT_ANSWER
+    assert 2 < len(tokens) < len(DEFAULT_ANSWER.split()) / 2
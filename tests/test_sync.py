@@ -0,0 +1,101 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from sydney import SyncSydneyClient
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+# The fake server runs on the loop of the test, so blocking calls are made from other
+# threads to keep it responsive.
+
+
+@pytest.mark.asyncio
+async def test_sync_ask_from_many_threads() -> None:
+    async with FakeCopilot(answer=lambda prompt: prompt.upper()) as server:
+        with server.endpoints():
+            sydney = SyncSydneyClient(size=2, timeout=10)
+
+            def ask(i: int) -> str:
+                return sydney.ask(f"prompt {i}")
+
+            def run() -> list[str]:
+                with ThreadPoolExecutor(8) as executor:
+                    return list(executor.map(ask, range(16)))
+
+            try:
+                responses = await asyncio.to_thread(run)
+            finally:
+                await asyncio.to_thread(sydney.close)
+
+    assert responses == [f"PROMPT {i}" for i in range(16)]
+    assert sydney.closed
+
+
+@pytest.mark.asyncio
+async def test_sync_ask_stream_and_compose() -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            sydney = SyncSydneyClient(size=1)
+
+            def run() -> tuple[list[str], str]:
+                with sydney:
+                    tokens = list(sydney.ask_stream("Hello, Copilot!"))
+                    # Stopping early gives the conversation back to the pool.
+                    for _ in sydney.ask_stream("Hello, Copilot!"):
+                        break
+                    return tokens, sydney.compose("Why Python is a great language")
+
+            tokens, response = await asyncio.to_thread(run)
+
+    assert "".join(tokens) == DEFAULT_ANSWER
+    assert len(tokens) > 10
+    assert response == DEFAULT_ANSWER
+
+
+@pytest.mark.asyncio
+async def test_sync_timeout() -> None:
+    async with FakeCopilot(first_token_delay=5) as server:
+        with server.endpoints():
+            sydney = SyncSydneyClient(size=1)
+
+            def run() -> None:
+                try:
+                    sydney.ask("Hello, Copilot!", timeout=0.2)
+                finally:
+                    sydney.close()
+
+            with pytest.raises(TimeoutError):
+                await asyncio.to_thread(run)
+
+    with pytest.raises(RuntimeError):
+        sydney.ask("Hello, Copilot!")
+
+
+@pytest.mark.asyncio
+async def test_sync_stream_timeout() -> None:
+    async with FakeCopilot(token_delay=0.1) as server:
+        with server.endpoints():
+            sydney = SyncSydneyClient(size=1)
+
+            def stream() -> list[str]:
+                tokens = []
+                for token in sydney.ask_stream("Hello, Copilot!", timeout=0.3):
+                    tokens.append(token)
+                return tokens
+
+            try:
+                with pytest.raises(TimeoutError):
+                    await asyncio.to_thread(stream)
+
+                # The stream was closed and its conversation can be used again.
+                for _ in range(100):
+                    if server.open_connections == 0:
+                        break
+                    await asyncio.sleep(0.01)
+                assert server.open_connections == 0
+                server.token_delay = 0.0
+                response = await asyncio.to_thread(sydney.ask, "Hello, Copilot!")
+                assert response == DEFAULT_ANSWER
+            finally:
+                await asyncio.to_thread(sydney.close)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+import sydney.sydney as sydney_module
+from sydney import SydneyClient
+from sydney.codec import available_codecs
+from sydney.enums import ComposeFormat, ComposeLength, ComposeTone, CustomComposeTone
+
+
+def client(codec: str, **kwargs) -> SydneyClient:
+    sydney = SydneyClient(json_codec=codec, **kwargs)
+    sydney.conversation_id = "51D|BingProdUnAuthenticatedUsers|0000"
+    sydney.client_id = "1000000000000000"
+    sydney.conversation_signature = 'signature with "quotes"'
+    sydney.invocation_id = 0
+    return sydney
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+@pytest.mark.parametrize("style", ["creative", "balanced", "precise"])
+@pytest.mark.parametrize("persona", ["copilot", "travel"])
+@pytest.mark.parametrize("search", [True, False])
+@pytest.mark.parametrize("bing_cookies", [None, "_U=cookie"])
+@pytest.mark.parametrize("context", [None, "<html>web page</html>"])
+@pytest.mark.parametrize("attachment_info", [None, {"blobId": "blob"}])
+def test_ask_request(
+    codec: str,
+    style: str,
+    persona: str,
+    search: bool,
+    bing_cookies: str | None,
+    context: str | None,
+    attachment_info: dict | None,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.delenv("BING_COOKIES", raising=False)
+    # Both requests must have the same timestamp, even if a second passes between them.
+    monkeypatch.setattr(
+        sydney_module, "get_iso_timestamp", lambda: "2024-01-01T00:00:00+00:00"
+    )
+    sydney = client(codec, style=style, persona=persona, bing_cookies=bing_cookies)
+
+    for invocation_id in (0, 1):
+        sydney.invocation_id = invocation_id
+        prompt = 'Hello, "Copilot"! 😊\n'
+
+        request = sydney._encode_ask_request(prompt, search, attachment_info, context)
+        arguments = sydney._build_ask_arguments(
+            prompt, search, attachment_info, context
+        )
+
+        assert request.endswith(b"\x1e")
+        assert sydney.codec.decode(request[:-1]) == arguments
+
+
+@pytest.mark.parametrize("codec", available_codecs())
+@pytest.mark.parametrize(
+    "tone", [ComposeTone.PROFESSIONAL, ComposeTone.FUNNY, CustomComposeTone("concise")]
+)
+@pytest.mark.parametrize("format", list(ComposeFormat))
+@pytest.mark.parametrize("length", list(ComposeLength))
+def test_compose_request(
+    codec: str,
+    tone: ComposeTone | CustomComposeTone,
+    format: ComposeFormat,
+    length: ComposeLength,
+) -> None:
+    sydney = client(codec)
+    prompt = "Why Python is a great language"
+
+    request = sydney._encode_compose_request(prompt, tone, format, length)
+    arguments = sydney._build_compose_arguments(prompt, tone, format, length)
+
+    assert sydney.codec.decode(request[:-1]) == arguments
@@ -0,0 +1,75 @@
+import pytest
+
+from sydney import RequestTrace, SydneyClient
+from sydney.enums import Phase
+from sydney.exceptions import ThrottledRequestException
+from sydney.testing import FakeCopilot
+
+
+@pytest.mark.asyncio
+async def test_trace_ask(tmp_path) -> None:
+    image = tmp_path / "image.png"
+    image.write_bytes(b"\x89PNG" * 256)
+    traces: list[RequestTrace] = []
+
+    async with FakeCopilot(first_token_delay=0.01) as server:
+        with server.endpoints():
+            async with SydneyClient(on_trace=traces.append) as sydney:
+                _ = await sydney.ask("Hello, Copilot!", attachment=str(image))
+
+    start_conversation, ask = traces
+    assert start_conversation.operation == "start_conversation"
+    assert list(start_conversation.phases) == [Phase.START_CONVERSATION]
+
+    assert ask.operation == "ask"
+    # The attachment is uploaded while connecting, so the order of these phases varies.
+    assert set(ask.phases) == {
+        Phase.CONNECT,
+        Phase.HANDSHAKE,
+        Phase.UPLOAD,
+        Phase.FIRST_FRAME,
+        Phase.FINAL_FRAME,
+    }
+    assert ask.duration(Phase.FIRST_FRAME) >= 0.01  # type: ignore
+    assert ask.duration(Phase.FINAL_FRAME) >= ask.duration(Phase.FIRST_FRAME)  # type: ignore
+    assert ask.start <= ask.phases[Phase.CONNECT][0]
+    assert ask.phases[Phase.FINAL_FRAME][1] <= ask.end  # type: ignore
+    assert ask.bytes_sent > 0
+    assert ask.bytes_received > 0
+    assert ask.frames_received > 2
+    assert ask.number_of_messages == 1
+    assert ask.max_messages == 30
+    assert ask.exception is None
+    assert not ask.cached
+
+
+@pytest.mark.asyncio
+async def test_trace_persistent_stream() -> None:
+    traces: list[RequestTrace] = []
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient(on_trace=traces.append, persistent=True) as sydney:
+                for _ in range(2):
+                    async for _ in sydney.ask_stream("Hello, Copilot!"):
+                        pass
+
+    first, second = traces[1:]
+    assert Phase.CONNECT in first.phases
+    # Reused connections skip the connection phases.
+    assert list(second.phases) == [Phase.FIRST_FRAME, Phase.FINAL_FRAME]
+    assert second.number_of_messages == 2
+
+
+@pytest.mark.asyncio
+async def test_trace_exception() -> None:
+    traces: list[RequestTrace] = []
+
+    async with FakeCopilot(result="Throttled") as server:
+        with server.endpoints():
+            async with SydneyClient(on_trace=traces.append) as sydney:
+                with pytest.raises(ThrottledRequestException):
+                    await sydney.ask("Hello, Copilot!")
+
+    assert traces[-1].exception is ThrottledRequestException
+    assert traces[-1].end is not None
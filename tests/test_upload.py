@@ -0,0 +1,178 @@
+import asyncio
+import os
+import tracemalloc
+from base64 import b64encode
+
+import pytest
+from websockets.protocol import State
+
+from sydney import RequestTrace, SydneyClient, constants
+from sydney.enums import Phase
+from sydney.payload import CHUNK_SIZE, Base64FilePayload
+from sydney.testing import DEFAULT_ANSWER, FakeCopilot
+
+
+class BufferWriter:
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    async def write(self, chunk: bytes) -> None:
+        self.chunks.append(chunk)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "size", [0, 1, 2, 3, CHUNK_SIZE, CHUNK_SIZE + 1, 3 * CHUNK_SIZE - 2]
+)
+async def test_base64_file_payload(tmp_path, size: int) -> None:
+    image = tmp_path / "image.png"
+    content = os.urandom(size)
+    image.write_bytes(content)
+
+    payload = Base64FilePayload(str(image))
+    writer = BufferWriter()
+    await payload.write(writer)  # type: ignore
+
+    assert b"".join(writer.chunks) == b64encode(content)
+    assert payload.size == len(b64encode(content))
+    assert all(len(chunk) <= CHUNK_SIZE // 3 * 4 for chunk in writer.chunks)
+
+
+async def upload_peak_memory(sydney: SydneyClient, path: str) -> int:
+    tracemalloc.start()
+    try:
+        await sydney.ask("What is this?", attachment=path)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.asyncio
+async def test_upload_memory_does_not_grow_with_file_size(tmp_path) -> None:
+    small = tmp_path / "small.png"
+    small.write_bytes(os.urandom(1024**2))
+    large = tmp_path / "large.png"
+    large.write_bytes(os.urandom(16 * 1024**2))
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                # Warm up, so that one-time allocations are not measured.
+                await sydney.ask("What is this?", attachment=str(small))
+
+                small_peak = await upload_peak_memory(sydney, str(small))
+                large_peak = await upload_peak_memory(sydney, str(large))
+
+        assert server.uploads == 3
+        assert server.upload_bytes > len(b64encode(large.read_bytes()))
+
+    # Reading the file in memory would take at least 16 MiB, plus its encoding.
+    assert large_peak < 4 * 1024**2
+    assert large_peak < small_peak + 1024**2
+
+
+@pytest.mark.asyncio
+async def test_upload_overlaps_connection(tmp_path) -> None:
+    image = tmp_path / "image.png"
+    image.write_bytes(os.urandom(1024))
+    traces: list[RequestTrace] = []
+
+    async with FakeCopilot(latency=0.05) as server:
+        with server.endpoints():
+            async with SydneyClient(on_trace=traces.append) as sydney:
+                await sydney.ask("What is this?", attachment=str(image))
+
+    upload_start, upload_end = traces[-1].phases[Phase.UPLOAD]
+    connect_start, _ = traces[-1].phases[Phase.CONNECT]
+    _, handshake_end = traces[-1].phases[Phase.HANDSHAKE]
+    assert upload_start < handshake_end
+    assert connect_start < upload_end
+    # Both take at least one round trip, so sequential requests would take twice as long.
+    assert max(upload_end, handshake_end) - min(upload_start, connect_start) < 0.1
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_releases_connection(tmp_path) -> None:
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                with pytest.raises(FileNotFoundError):
+                    await sydney.ask(
+                        "What is this?", attachment=str(tmp_path / "x.png")
+                    )
+                assert sydney.wss_client is not None
+                assert sydney.wss_client.state is State.CLOSED
+
+                assert await sydney.ask("Hello, Copilot!") == DEFAULT_ANSWER
+
+        assert server.prompts == 1
+
+
+@pytest.mark.asyncio
+async def test_unreadable_attachment_fails_before_upload(tmp_path) -> None:
+    with pytest.raises(IsADirectoryError):
+        Base64FilePayload(str(tmp_path))
+
+    async with FakeCopilot() as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                with pytest.raises(IsADirectoryError):
+                    await sydney.ask("What is this?", attachment=str(tmp_path))
+
+        assert server.uploads == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_connection_cancels_upload(tmp_path) -> None:
+    image = tmp_path / "image.png"
+    image.write_bytes(os.urandom(1024))
+
+    async with FakeCopilot(latency=0.05) as server:
+        with server.endpoints():
+            async with SydneyClient() as sydney:
+                # Nothing listens on this port, so connecting fails immediately.
+                constants.BING_CHATHUB_URL = "ws://127.0.0.1:1/sydney/ChatHub"
+                with pytest.raises(OSError):
+                    await sydney.ask("What is this?", attachment=str(image))
+
+            await asyncio.sleep(0.1)
+
+        assert server.uploads == 0
+
+
+async def multipart_headers(sydney: SydneyClient, attachment: str) -> list[str]:
+    writer = BufferWriter()
+    await sydney._build_upload_arguments(attachment)().write(writer)  # type: ignore
+    body = b"".join(bytes(chunk) for chunk in writer.chunks).decode()
+    return [line for line in body.split("\r\n") if line.startswith("Content-")]
+
+
+@pytest.mark.asyncio
+async def test_upload_part_headers() -> None:
+    sydney = SydneyClient()
+    sydney.conversation_id = "conversation"
+
+    headers = await multipart_headers(sydney, "https://www.bing.com/image.png")
+
+    assert headers == [
+        "Content-Type: application/json",
+        'Content-Disposition: form-data; name="knowledgeRequest"',
+    ]
+
+
+@pytest.mark.asyncio
+async def test_upload_file_part_headers(tmp_path) -> None:
+    image = tmp_path / "image.png"
+    image.write_bytes(os.urandom(1024))
+    sydney = SydneyClient()
+    sydney.conversation_id = "conversation"
+
+    headers = await multipart_headers(sydney, str(image))
+
+    # Same parts as when the encoded image was sent from memory.
+    assert headers == [
+        "Content-Type: application/json",
+        'Content-Disposition: form-data; name="knowledgeRequest"',
+        "Content-Type: application/octet-stream",
+        'Content-Disposition: form-data; name="imageBase64"; filename="imageBase64"',
+    ]